@@ -0,0 +1,577 @@
+# @name: benchmark.py
+# @description: Module for the benchmarks of the library functions on synthetic data
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""
+Module for the benchmarks of the library functions on synthetic data. Run a benchmark from the command line \
+with its name and options, e.g. 'python benchmarks/benchmark.py fetch 40'. Benchmarks comparing a function \
+with the code it replaced assert that both give the same output. Benchmarks run in a temporary directory, so \
+the files saved by the library functions do not overwrite the working directory data.
+"""
+
+import io
+import os
+import sys
+import time
+import tempfile
+import contextlib
+from collections import OrderedDict
+
+
+# FUNCTIONS
+
+def run(function, *args, **kwargs):
+    """
+    This function runs a function without printing its progress messages and bars, and measures its runtime.
+    :param function: function to run
+    :param args: positional arguments of the function
+    :param kwargs: keyword arguments of the function
+    :return: function result, seconds (float)
+    """
+
+    t = time.time()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        result = function(*args, **kwargs)
+
+    return result, time.time() - t
+
+
+@contextlib.contextmanager
+def settings(module, **values):
+    """
+    This function sets module variables, e.g. storage.table_format, for the duration of a with block and \
+    restores them afterwards.
+    :param module: module object
+    :param values: module variables values
+    :return: None object
+    """
+
+    previous = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(module, name, value)
+
+
+def benchmark_fetch(seeds=40, latency=0.01, workers_l=(1, 4, 16)):
+    """
+    This function benchmarks the concurrent Monarch retrieval, i.e. get_neighbours() of the seeds and \
+    get_connections() of their first shell, against the local BioLink stand-in with several numbers of workers.
+    :param seeds: number of seed nodes (integer). Default: 40.
+    :param latency: stand-in response latency in seconds (float). Default: 0.01.
+    :param workers_l: numbers of workers list. Default: (1, 4, 16).
+    :return: None object
+    """
+
+    import monarch
+    import scheduler
+    import biolink_server
+
+    seed_list = ['HGNC:{}'.format(i) for i in range(1, int(seeds) + 1)]
+    monarch.use_cache = False
+    scheduler.services['biolink'] = {'rate': 10000.0, 'max_concurrency': max(workers_l)}
+    networks = list()
+    with biolink_server.BioLinkServer(latency=float(latency)) as server:
+        monarch.biolink = server.url
+        for workers in workers_l:
+            (neighbours, relations), t_neighbours = run(monarch.get_neighbours, seed_list, workers=workers)
+            connections, t_connections = run(monarch.get_connections, neighbours, workers=workers)
+            networks.append((relations, connections))
+            print('workers: {}\tget_neighbours + get_connections: {:.2f} s\t{} + {} edges'
+                  .format(workers, t_neighbours + t_connections, len(relations), len(connections)))
+    assert all(network == networks[0] for network in networks), 'The edges differ with the number of workers.'
+
+
+def scan_attributes(sub_l, rel_l, obj_l, edges):
+    """
+    This function is the reference implementation of monarch.add_attributes() before the id triple index: \
+    every edge scans the associations of the node response until the first match.
+    :param sub_l: subjects (object) list
+    :param rel_l: relations (object) list
+    :param obj_l: objects (object) list
+    :param edges: edges set
+    :return: metaedges set
+    """
+
+    metaedges = set()
+    for (sub_id, rel_id, obj_id, refs) in edges:
+        for i in range(len(sub_l)):
+            if sub_l[i]['id'] == sub_id and rel_l[i]['id'] == rel_id and obj_l[i]['id'] == obj_id:
+                metaedges.add((sub_l[i]['id'], sub_l[i]['label'], rel_l[i]['id'], rel_l[i]['label'],
+                               obj_l[i]['id'], obj_l[i]['label'], refs))
+                break
+
+    return metaedges
+
+
+def benchmark_attributes(sizes=(100, 1000, 5000)):
+    """
+    This function benchmarks monarch.add_attributes() on synthetic node responses, with all the edges of the \
+    node, against the scan of the associations it replaced.
+    :param sizes: numbers of associations of the node list, or one number. Default: (100, 1000, 5000).
+    :return: None object
+    """
+
+    import monarch
+    import biolink_server
+
+    sizes = [int(sizes)] if isinstance(sizes, str) else sizes
+    for size in sizes:
+        associations = [biolink_server.get_association('HGNC:1', biolink_server.interaction, 'HGNC:{}'.format(i),
+                                                       ['PMID:{}'.format(i)]) for i in range(2, size // 2 + 2)]
+        associations += [biolink_server.get_association('HGNC:{}'.format(i), biolink_server.interaction, 'HGNC:1')
+                         for i in range(2, size - size // 2 + 2)]
+        sub_l, rel_l, obj_l, ref_l = monarch.get_edges_objects(associations[:size // 2], associations[size // 2:])
+        edges = monarch.get_edges(sub_l, rel_l, obj_l, ref_l)
+        metaedges, t_index = min((run(monarch.add_attributes, sub_l, rel_l, obj_l, edges) for i in range(3)),
+                                 key=lambda result: result[1])
+        reference, t_scan = min((run(scan_attributes, sub_l, rel_l, obj_l, edges) for i in range(3)),
+                                key=lambda result: result[1])
+        print('{} associations\tscan: {:.2f} ms\tindex: {:.2f} ms'.format(size, t_scan * 1000, t_index * 1000))
+        assert metaedges == reference, 'The metaedges differ from the scan reference.'
+
+
+def build_edges_reference(edges_df, filepath):
+    """
+    This function is the reference implementation of monarch.build_edges() before the references were expanded \
+    once per distinct list, copied from it without the progress messages: every edge is expanded and built as a \
+    record in an itertuples loop, then saved as CSV.
+    :param edges_df: network dataframe from the extract_edges() function
+    :param filepath: path to the CSV file string
+    :return: graph edges object as a list of dictionaries, where every dictionary is a record
+    """
+
+    import pandas as pd
+
+    ## variables
+    # if edges_df is not a df, it is a set of tuples, then convert to a df
+    if isinstance(edges_df, set):
+        connections_l = list()
+        for tuple in edges_df:
+            record = dict()
+            record['subject_id'] = tuple[0]
+            record['subject_label'] = tuple[1]
+            record['relation_id'] = tuple[2]
+            record['relation_label'] = tuple[3]
+            record['object_id'] = tuple[4]
+            record['object_label'] = tuple[5]
+            record['reference_id_list'] = tuple[6]
+            connections_l.append(record)
+
+        edges_df = pd.DataFrame(connections_l)
+
+
+    # generate static variable: uriPrefixes_dct (url references)
+    uriPrefixes_dct = {
+        'pmid': 'https://www.ncbi.nlm.nih.gov/pubmed/',  # 'http://identifiers.org/pubmed/',
+        'react': 'http://reactome.org/content/detail/',  # 'http://identifiers.org/reactome/',
+        'zfin': 'http://zfin.org/',
+        'go_ref': 'http://purl.obolibrary.org/obo/go/references/',  # 'http://identifiers.org/go.ref/GO_REF:',
+        'mgi': 'http://www.informatics.jax.org/accession/MGI:',  # 'http://identifiers.org/mgi/MGI:'
+        'flybase': 'http://flybase.org/reports/',
+        'wormbase': 'http://www.wormbase.org/resources/paper/',
+        'hpo': 'http://compbio.charite.de/hpoweb/showterm?id=HP:',
+        'isbn-10': 'ISBN-10:',
+        'isbn-13': 'ISBN-13:',
+        #'isbn-10': 'https://www.wikidata.org/wiki/Special:BookSources/',
+        #'isbn-13': 'https://www.wikidata.org/wiki/Special:BookSources/'
+        'mondo': 'http://purl.obolibrary.org/obo/MONDO_',  # http://purl.obolibrary.org/obo/MONDO_0009026
+        'rgd': 'https://rgd.mcw.edu/rgdweb/report/reference/main.html?id=', \
+        # https://rgd.mcw.edu/rgdweb/report/reference/main.html?id=1600115
+        'omim': 'http://omim.org/entry/',  # http://omim.org/entry/61527
+        'sgd_ref': 'https://db.yeastgenome.org/reference/',  # https://db.yeastgenome.org/reference/S000124036
+        'genereviews': 'https://www.ncbi.nlm.nih.gov/books/',  # https://www.ncbi.nlm.nih.gov/books/NBK1526/
+        'omia': 'http://omia.angis.org.au/',  # http://omia.angis.org.au/000214/9913
+        'hgnc': 'https://www.genenames.org/data/gene-symbol-report/#!/hgnc_id/HGNC:', \
+        # https://www.genenames.org/data/gene-symbol-report/#!/hgnc_id/HGNC:7132
+        'orpha': 'Go to ORPHANET web site (https://www.orpha.net/) and in the search field introduce the Orpha number: '
+                 'ORPHA:' # no entry in monarch for that edge
+    }
+
+    # generate static variable: dbPrefixes_dct (source/database references)
+    dbPrefixes_dct = {
+        'na': 'NA',
+        'nan': 'NA',
+        'mgi': 'http://www.informatics.jax.org/',
+        'fb': 'http://flybase.org/',
+        'rgd': 'http://rgd.mcw.edu/',
+        'zfin': 'http://zfin.org/',
+        'sgd': 'https://www.yeastgenome.org/',
+        'hgnc': 'https://www.genenames.org/',
+        'xenbase': 'http://www.xenbase.org/'
+    }
+
+    # provenance variables
+    ref_text = 'This edge comes from the Monarch Knowledge Graph 2019.'  # 'NA'
+    ref_date = 'NA'
+
+
+    ## build graph schema network edges data structure and save edges file
+    # prepare dataframe = [ {} ... {} ], where every row = {} = concept
+    edges_l = list()
+    for edge in edges_df.itertuples():
+        # edge or row is a tuple (named and ordered attributes)
+        #print("edge_tuple:", edge)
+        # edge.reference_id_list >> can be 1) np.nan (float type) or 2) str without "|" 3) str with "|"
+        ref_s = str(edge.reference_id_list)
+
+        # prepare reference_uri_list attribute
+        ref_uri_l = list()
+        # expand to uri or NA
+        pmid_l = list()
+        # reference_id list iteration
+        for ref in ref_s.strip().split('|'):
+            # NA or database
+            if ':' not in ref:
+                try:
+                    ref_uri = dbPrefixes_dct[ref.lower()]
+                except KeyError:
+                    print("Warning:")
+                    print('Detected a new reference database in Monarch not yet implemented in this module. '
+                          'The new source should be added to the dictionary of databases.'
+                          'Otherwise, the source CURIE cannot be translated to the corresponding URI.')
+                    print("In the build_edges() method, update 'dbPrefixes_dct' dictionary with '{}'".format(ref))
+                    print('The edge that includes this new reference database is {}'.format(edge))
+                    print('The method will continue to run without problem, writing the CURIE instead of the URI,'
+                          'until the dictionary is updated.')
+                ref_uri_l.append(ref_uri)
+            # publication uri: pubmed_id or url
+            else:
+                pref, uriId = ref.split(':')
+                # separate pmid from non pmid and detect:
+                # pubmed_id
+                if ref.startswith('PMID'):
+                    pmid_l.append(uriId)
+                # url
+                elif ref.lower().startswith('http'):
+                    ref_uri_l.append(ref)
+                else:
+                    try:
+                        ref_uri = uriPrefixes_dct[pref.lower()] + uriId
+                    except KeyError:
+                        print("Warning:")
+                        print('Detected a new reference source in Monarch not yet implemented in this module. '
+                              'The new source should be added to the dictionary of sources.'
+                              'Otherwise, the source CURIE cannot be translated to the corresponding URI.')
+                        print("In the build_edges() method, update 'uriPrefixes_dct' dictionary with '{}'".format(pref))
+                        print('The edge that includes this new reference source is {}'.format(edge))
+                        print('The method will continue to run without problem, writing the CURIE instead of the URI,'
+                              'until the dictionary is updated.')
+                    ref_uri_l.append(ref_uri)
+        # create multi-term pubmed url
+        if len(pmid_l):
+            pmid_s = ','.join(pmid_l)
+            ref_uri = uriPrefixes_dct['pmid'] + pmid_s
+            ref_uri_l.append(ref_uri)
+        ref_uri_list = '|'.join(ref_uri_l)
+
+        # prepare edge attributes: sub_id, obj_id, rel_id, rel_label, rel_def, rel_iri
+        sub_id = 'NA' if edge.subject_id is None or str(edge.subject_id) == 'nan' else edge.subject_id
+        rel_id = 'NA' if edge.relation_id is None or str(edge.relation_id) == 'nan' else edge.relation_id
+        obj_id = 'NA' if edge.object_id is None or str(edge.object_id) == 'nan' else edge.object_id
+        rel_label = 'NA' if edge.relation_label is None or str(edge.relation_label) == 'nan' else edge.relation_label
+        rel_def = 'NA'
+        if ':' in rel_id:
+            rel_iri = 'http://purl.obolibrary.org/obo/' + rel_id.replace(':', '_')
+        else:
+            rel_iri = rel_id
+
+        # build the data structure = list of edges as list of dict, where a dict is an edge
+        edge = dict()
+        edge['subject_id'] = sub_id
+        edge['object_id'] = obj_id
+        edge['property_id'] = rel_id
+        edge['property_label'] = rel_label
+        edge['property_description'] = rel_def
+        edge['property_uri'] = rel_iri
+        edge['reference_uri'] = ref_uri_list
+        edge['reference_supporting_text'] = ref_text
+        edge['reference_date'] = ref_date
+        edges_l.append(edge)
+
+    # save edges file
+    #TODO: abstract this function
+    df = pd.DataFrame(edges_l)
+    df = df[['subject_id', 'property_id', 'object_id', 'reference_uri', 'reference_supporting_text', 'reference_date', \
+             'property_label', 'property_description', 'property_uri']]
+    df.fillna('NA').to_csv(filepath, index=False)
+
+    return edges_l
+
+
+def benchmark_references(edges=1000000, distinct=20000):
+    """
+    This function benchmarks monarch.build_edges() on a synthetic Monarch network, with the reference lists \
+    expanded once per distinct list, against the expansion of every edge it replaced. Both save the edges as CSV \
+    in a temporary directory, and the files must be the same byte for byte.
+    :param edges: number of edges (integer). Default: 1000000.
+    :param distinct: number of distinct reference lists (integer), or 0 for unique lists. Default: 20000.
+    :return: None object
+    """
+
+    import random
+    import hashlib
+    import monarch
+    import storage
+    import pandas as pd
+
+    edges, distinct = int(float(edges)), int(float(distinct))
+    rng = random.Random(0)
+    references = list()
+    for i in range(distinct or edges):
+        refs = ['PMID:{}'.format(rng.randrange(10 ** 7)) for j in range(rng.randrange(4))]
+        refs += rng.choice([[], ['MGI:{}'.format(i)], ['ZFIN:ZDB-PUB-{}'.format(i)], ['MGI'], ['ZFIN']])
+        references.append('|'.join(refs) if refs else float('nan'))
+    network = pd.DataFrame({
+        'subject_id': ['HGNC:{}'.format(rng.randrange(20000)) for i in range(edges)],
+        'subject_label': 'label',
+        'relation_id': [rng.choice(['RO:0002434', 'RO:HOM0000017', 'RO:0002200', None]) for i in range(edges)],
+        'relation_label': 'relation',
+        'object_id': ['MP:{}'.format(rng.randrange(20000)) for i in range(edges)],
+        'object_label': 'label',
+        'reference_id_list': [references[rng.randrange(len(references))] for i in range(edges)] if distinct
+        else references
+    })
+
+    directory = tempfile.mkdtemp()
+    reference_path = '{}/monarch_edges_reference.csv'.format(directory)
+    with settings(storage, table_format='csv'), settings(monarch, path=directory):
+        reference, t_edge = run(build_edges_reference, network, reference_path)
+        edges_l, t_distinct = run(monarch.build_edges, network)
+    keys = list()
+    for filepath in [reference_path, '{}/monarch_edges_v{}.csv'.format(directory, monarch.today)]:
+        with open(filepath, 'rb') as f:
+            keys.append(hashlib.sha1(f.read()).hexdigest())
+    print('{} edges, {} distinct reference lists\tper edge: {:.1f} s\tper distinct list: {:.1f} s'
+          .format(edges, network.reference_id_list.nunique(), t_edge, t_distinct))
+    assert edges_l == reference, 'The edges differ from the per edge reference.'
+    assert keys[0] == keys[1], 'The edges CSV file differs from the per edge reference.'
+
+
+def get_gene_hits(qterms, scopes=None, fields=None, as_dataframe=False, **kwargs):
+    """
+    This function is a local stand-in of idmapping.querymany() for the benchmarks: symbols are annotated with \
+    synthetic names, aliases and summaries, and retired entrez IDs are mapped to synthetic symbols.
+    :param qterms: query terms list
+    :param scopes: comma separated scopes string. Default: None.
+    :param fields: comma separated fields string. Default: None.
+    :param as_dataframe: whether to return a dataframe indexed by query term (boolean). Default: False.
+    :param kwargs: other querymany() options, ignored
+    :return: hits (dictionaries) list, or hits dataframe
+    """
+
+    import idmapping
+
+    hits = list()
+    for q in qterms:
+        values = {'symbol': 'RETIRED{}'.format(q), 'name': '{} name'.format(q), 'alias': ['{}-1'.format(q)],
+                  'summary': '{} summary'.format(q)}
+        hits.append(dict({'query': q, '_id': q}, **{field: values[field] for field in fields.split(',')}))
+
+    return idmapping.get_dataframe(hits) if as_dataframe else hits
+
+
+def scan_annotations(concept_dct, df):
+    """
+    This function is the reference implementation of the regulation.build_nodes() annotation before the symbol \
+    index: every BioThings hit scans all the concepts for its symbol.
+    :param concept_dct: concepts dictionary {id: {preflabel:, name:, synonyms:, description:}}, updated in place
+    :param df: BioThings hits dataframe indexed by symbol
+    :return: None object
+    """
+
+    for symbol, row in df.iterrows():
+        for concept in concept_dct:
+            if concept_dct[concept]['preflabel'] == symbol:
+                concept_dct[concept]['name'] = row['name']
+                concept_dct[concept]['synonyms'] = row['alias']
+                concept_dct[concept]['description'] = row['summary']
+
+
+def benchmark_annotations(genes=10000):
+    """
+    This function benchmarks regulation.build_nodes() on a synthetic regulation network, with pairs of genes \
+    sharing a symbol and BioThings answered by a local stand-in, and the nested scan of the node annotation it \
+    replaced on the same concepts and hits.
+    :param genes: number of genes (integer). Default: 10000.
+    :return: None object
+    """
+
+    import random
+    import idmapping
+    import regulation
+    import storage
+    import pandas as pd
+
+    genes = int(float(genes))
+    rng = random.Random(0)
+    # NCBIGene and HGNC concepts of the same gene share its symbol, one gene in a hundred has a retired entrez ID
+    ids = ['{}:{}'.format(['NCBIGene', 'HGNC'][i % 2], i // 2) for i in range(genes)]
+    symbols = [None if i // 2 % 100 == 0 else 'G{}'.format(i // 2) for i in range(genes)]
+    subjects = [rng.randrange(genes) for i in range(genes)]
+    edges = pd.DataFrame({'subject_id': [ids[i] for i in subjects], 's_symbol': [symbols[i] for i in subjects],
+                          'object_id': ids, 'o_symbol': symbols})
+
+    with settings(storage, table_format='csv'), settings(idmapping, querymany=get_gene_hits):
+        nodes_l, t_index = run(regulation.build_nodes, edges)
+
+    # the same concepts and hits, annotated by the nested scan
+    concept_dct = {node['id']: {'preflabel': node['preflabel'], 'name': None, 'synonyms': None, 'description': None}
+                   for node in nodes_l}
+    hits = [node['preflabel'] for node in nodes_l if str(node['preflabel']) != 'nan']
+    df = get_gene_hits(list(set(hits)), fields='alias,name,summary', as_dataframe=True)
+    _, t_scan = run(scan_annotations, concept_dct, df)
+    scanned = [str([concept['name'], '|'.join(concept['synonyms']) if isinstance(concept['synonyms'], list)
+                    else concept['synonyms'], concept['description']]) for concept in concept_dct.values()]
+    indexed = [str([node['name'], node['synonyms'], node['description']]) for node in nodes_l]
+    print('{} genes, {} nodes\tbuild_nodes() with the symbol index: {:.1f} s\tnested scan annotation alone: '
+          '{:.1f} s'.format(genes, len(nodes_l), t_index, t_scan))
+    assert scanned == indexed, 'The node annotations differ from the nested scan reference.'
+
+
+def benchmark_msigdb(tfs=3, genesets=1000, genes=100, universe=2000):
+    """
+    This function benchmarks regulation.prepare_msigdb_data() on a synthetic C3:TFT GMT file, where every TF has \
+    several gene sets, and the merge of their targets with regulation.add_gene() one gene at a time it replaced.
+    :param tfs: number of TFs (integer). Default: 3.
+    :param genesets: number of gene sets per TF (integer). Default: 1000.
+    :param genes: number of genes per gene set (integer). Default: 100.
+    :param universe: number of distinct genes of the gene sets (integer). Default: 2000.
+    :return: None object
+    """
+
+    import json
+    import random
+    import regulation
+
+    tfs, genesets, genes, universe = int(tfs), int(genesets), int(genes), int(universe)
+    rng = random.Random(0)
+    gmt_path = 'synthetic_c3.tft.gmt'
+    with open(gmt_path, 'w') as f:
+        for tf in range(tfs):
+            for geneset in range(genesets):
+                genelist = [str(rng.randrange(1, universe + 1)) for i in range(genes)]
+                f.write('\t'.join(['GATTGGY_TF{}_Q{}_01'.format(tf, geneset),
+                                    'http://www.broadinstitute.org/gsea/msigdb/cards/TF{}'.format(tf)] + genelist))
+                f.write('\n')
+
+    _, t_ordered = run(regulation.prepare_msigdb_data, gmt_path)
+    with open('regulation/msigdb/out/tf_genelist_entrez_msigdb.json') as f:
+        msigdb = json.load(f)
+
+    def merge_targets():
+        targets = dict()
+        for geneset_name, tf, ref_uri, genelist in regulation.read_gmt(gmt_path):
+            if tf not in targets:
+                targets[tf] = genelist
+            else:
+                for gene in genelist:
+                    targets = regulation.add_gene(targets, tf, gene)
+        return targets
+
+    targets, t_add_gene = run(merge_targets)
+    print('{} TFs x {} gene sets x {} genes\tprepare_msigdb_data() with ordered sets: {:.2f} s\t'
+          'add_gene() merge alone: {:.2f} s'.format(tfs, genesets, genes, t_ordered, t_add_gene))
+    assert {tf: set(genelist) for tf, genelist in targets.items()} == \
+           {tf: set(genelist) for tf, genelist in msigdb.items()}, 'The TF targets differ from the add_gene() merge.'
+
+
+def resolve_property_uris(statements, curie_dct):
+    """
+    This function is the reference implementation of the graph.build_edges() property URIs before they were \
+    resolved once per property id: every statement is resolved in an iterrows loop.
+    :param statements: graph statements dataframe, updated in place
+    :param curie_dct: CURIE prefixes dictionary
+    :return: statements dataframe
+    """
+
+    for i, row in statements.iterrows():
+        if ':' in str(row['property_uri']):
+            property_uri = row['property_uri']
+        elif ':' in str(row['property_id']) and str(row['property_id']).split(':')[0].lower() == 'skos':
+            property_uri = curie_dct[row['property_id'].split(':')[0].lower()] + row['property_id'].split(':')[1]
+        elif ':' in str(row['property_id']):
+            try:
+                property_uri = curie_dct[row['property_id'].split(':')[0].lower()] + \
+                               row['property_id'].replace(':', '_')
+            except KeyError:
+                property_uri = None
+        else:
+            property_uri = None
+        statements.at[i, 'property_uri'] = property_uri
+
+    return statements
+
+
+def benchmark_property_uris(statements=100000):
+    """
+    This function benchmarks graph.build_edges() on synthetic networks with mixed RO, skos, BFO, GENO and \
+    unknown property prefixes, missing property ids and pre-filled URIs, and the resolution of the property \
+    URIs of every statement it replaced on the same statements.
+    :param statements: number of statements (integer). Default: 100000.
+    :return: None object
+    """
+
+    import random
+    import graph
+    import storage
+    import pandas as pd
+
+    statements = int(float(statements))
+    rng = random.Random(0)
+    property_ids = ['RO:0002200', 'RO:0002434', 'skos:exactMatch', 'BFO:0000050', 'GENO:0000840', 'xyz:123',
+                    'subClassOf', None]
+    property_uris = ['http://purl.obolibrary.org/obo/RO_0002200', None, 'NA']
+    networks = list()
+    for network in range(4):
+        size = statements // 4
+        networks.append(pd.DataFrame({
+            'subject_id': ['HGNC:{}'.format(rng.randrange(50000)) for i in range(size)],
+            'property_id': [rng.choice(property_ids) for i in range(size)],
+            'object_id': ['HGNC:{}'.format(rng.randrange(50000)) for i in range(size)],
+            'reference_uri': ['PMID:{}'.format(rng.randrange(5000)) for i in range(size)],
+            'reference_supporting_text': 'text', 'reference_date': '2019', 'property_label': 'label',
+            'property_description': 'NA',
+            'property_uri': [rng.choice(property_uris) for i in range(size)]}))
+    curie_dct = {'ro': 'http://purl.obolibrary.org/obo/', 'bfo': 'http://purl.obolibrary.org/obo/',
+                 'geno': 'http://purl.obolibrary.org/obo/', 'skos': 'http://www.w3.org/2004/02/skos/core#'}
+
+    with settings(storage, table_format='csv'):
+        edges, t_unique = run(graph.build_edges, *networks)
+    reference = pd.concat(networks, ignore_index=True, join='inner').drop_duplicates()
+    reference, t_row = run(resolve_property_uris, reference, curie_dct)
+    print('{} statements\tbuild_edges() with one resolution per property id: {:.2f} s\t'
+          'iterrows resolution alone: {:.2f} s'.format(statements, t_unique, t_row))
+    assert reference['property_uri'].astype(object).fillna('NA').tolist() == \
+           edges['property_uri'].astype(object).fillna('NA').tolist(), \
+        'The property URIs differ from the iterrows reference.'
+
+
+# benchmarks by command line name
+benchmarks = OrderedDict([
+    ('fetch', benchmark_fetch),
+    ('attributes', benchmark_attributes),
+    ('references', benchmark_references),
+    ('annotations', benchmark_annotations),
+    ('msigdb', benchmark_msigdb),
+    ('property_uris', benchmark_property_uris)
+])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in benchmarks:
+        print('Usage: python benchmarks/benchmark.py <benchmark> [options]')
+        for name, function in benchmarks.items():
+            print('  {}: {}'.format(name, ' '.join(function.__doc__.split(':param')[0].replace('\\', '').split())))
+        sys.exit(1)
+    # library modules set their data paths from the working directory when they are imported
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'bioknowledge_reviewer'))
+    os.chdir(tempfile.mkdtemp())
+    benchmarks[sys.argv[1]](*sys.argv[2:])
@@ -0,0 +1,271 @@
+# @name: biolink_server.py
+# @description: Module for a local stand-in of the BioLink API association service
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Module for the local BioLink API stand-in"""
+
+import sys
+import json
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+# VARIABLES
+# synthetic graph relations: (id, label)
+orthology = ('RO:HOM0000017', 'in orthology relationship with')
+phenotype = ('RO:0002200', 'has phenotype')
+disease = ('RO:0002607', 'is marker for')
+interaction = ('RO:0002434', 'interacts with')
+subclass = (None, None)
+
+# synthetic graph model organisms: (gene prefix, phenotype prefix)
+organisms = [('MGI', 'MP'), ('ZFIN', 'ZP'), ('FlyBase', 'FBcv'), ('WormBase', 'WBPhenotype')]
+
+
+# FUNCTIONS
+
+def get_association(sub, rel, obj, publications=None):
+    """
+    This function returns a BioLink association with the attributes read by the monarch module.
+    :param sub: subject node id string
+    :param rel: relation (id, label) tuple
+    :param obj: object node id string
+    :param publications: publication ids list. Default: None.
+    :return: association dictionary
+    """
+
+    return {
+        'subject': {'id': sub, 'label': '{} label'.format(sub)},
+        'relation': {'id': rel[0], 'label': rel[1]},
+        'object': {'id': obj, 'label': '{} label'.format(obj)},
+        'publications': [{'id': publication} for publication in publications] if publications else None
+    }
+
+
+def generate_graph(genes=1000, phenotypes=5000, degree=10, seed=0):
+    """
+    This function generates a reproducible synthetic Monarch graph. Human genes have model organism \
+    orthologs, phenotypes, diseases and interactions, orthologs have phenotypes, and diseases have phenotypes \
+    and subclasses. Node degrees follow a heavy-tailed distribution, so some hubs need several pages.
+    :param genes: number of human genes (integer). Default: 1000.
+    :param phenotypes: number of phenotypes per vocabulary (integer). Default: 5000.
+    :param degree: mean number of associations per node and association type (integer). Default: 10.
+    :param seed: random generator seed (integer). Default: 0.
+    :return: associations list
+    """
+
+    rnd = random.Random(seed)
+
+    def sample(population):
+        k = min(len(population), max(1, int(rnd.paretovariate(2.0) * degree / 2)))
+        return rnd.sample(population, k)
+
+    def publications():
+        if rnd.random() < 0.2:
+            return None
+        return ['PMID:{}'.format(rnd.randint(1, 30000000)) for _ in range(rnd.randint(1, 3))]
+
+    human_genes = ['HGNC:{}'.format(i) for i in range(1, genes + 1)]
+    hp = ['HP:{:07d}'.format(i) for i in range(1, phenotypes + 1)]
+    diseases = ['MONDO:{:07d}'.format(i) for i in range(1, genes // 2 + 1)]
+    associations = list()
+    for gene in human_genes:
+        for gene_prefix, phenotype_prefix in organisms:
+            if rnd.random() < 0.7:
+                ortholog = '{}:{}'.format(gene_prefix, gene.split(':')[1])
+                associations.append(get_association(gene, orthology, ortholog, publications()))
+                pheno = ['{}:{:07d}'.format(phenotype_prefix, rnd.randint(1, phenotypes)) for _ in range(degree)]
+                for node in sample(pheno):
+                    associations.append(get_association(ortholog, phenotype, node, publications()))
+        for node in sample(hp):
+            associations.append(get_association(gene, phenotype, node, publications()))
+        for node in sample(diseases):
+            associations.append(get_association(gene, disease, node, publications()))
+        for node in sample(human_genes):
+            if node != gene:
+                associations.append(get_association(gene, interaction, node, publications()))
+    for node in diseases:
+        for pheno in sample(hp):
+            associations.append(get_association(node, phenotype, pheno, publications()))
+        associations.append(get_association(node, subclass, rnd.choice(diseases), None))
+
+    return associations
+
+
+def read_associations(filepath):
+    """
+    This function reads recorded BioLink associations from a JSON file. The file holds a BioLink response, \
+    i.e. a dictionary with an 'associations' list, or a list of responses or associations.
+    :param filepath: path to the JSON file string
+    :return: associations list
+    """
+
+    with open(filepath) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    associations = list()
+    for item in data:
+        if 'associations' in item:
+            associations.extend(item['associations'])
+        else:
+            associations.append(item)
+
+    return associations
+
+
+class BioLinkServer(object):
+    """
+    Local HTTP server answering the BioLink 'association/from' and 'association/to' endpoints from a list \
+    of associations, with paging, latency and failure injection. Point the monarch module to it with \
+    monarch.biolink = server.url.
+    """
+
+    def __init__(self, associations=None, latency=0.0, error_rate=0.0, seed=0, host='127.0.0.1', port=0):
+        """
+        Constructor
+        :param associations: associations list from generate_graph() or read_associations(). Default: None, \
+        i.e. a synthetic graph generated with the seed.
+        :param latency: seconds to wait before answering each request (float). Default: 0.0.
+        :param error_rate: fraction of requests answered with an HTTP 500 error (float). Default: 0.0.
+        :param seed: random generator seed for the graph and the errors (integer). Default: 0.
+        :param host: host address string. Default: '127.0.0.1'.
+        :param port: port number (integer). Default: 0, i.e. any free port.
+        """
+
+        if associations is None:
+            associations = generate_graph(seed=seed)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.associations = {'from': dict(), 'to': dict()}
+        for association in associations:
+            self.associations['from'].setdefault(association['subject']['id'], []).append(association)
+            self.associations['to'].setdefault(association['object']['id'], []).append(association)
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._get_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+        self.url = 'http://{}:{}/api/association'.format(host, self._server.server_address[1])
+
+    def _get_handler(self):
+        """
+        This method returns the request handler class bound to this server.
+        :return: request handler class
+        """
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, body = server.answer(self.path)
+                body = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def answer(self, request_path):
+        """
+        This method answers a request to the association endpoints.
+        :param request_path: request path with the query string, e.g. '/api/association/from/HGNC:1?rows=100'
+        :return: HTTP status code (integer), response body string
+        """
+
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            return 500, json.dumps({'error': 'injected failure'})
+
+        url = urlparse(request_path)
+        parts = url.path.rstrip('/').split('/')
+        endpoint, node = parts[-2], parts[-1]
+        if endpoint not in self.associations:
+            return 404, json.dumps({'error': 'unknown endpoint: {}'.format(endpoint)})
+        parameters = parse_qs(url.query)
+        rows = int(parameters.get('rows', ['100'])[0])
+        start = int(parameters.get('start', ['0'])[0])
+        associations = self.associations[endpoint].get(node, [])
+
+        return 200, json.dumps({'numFound': len(associations), 'associations': associations[start:start + rows]})
+
+    def start(self):
+        """
+        This method starts serving requests in a background thread.
+        :return: server object
+        """
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+
+        return self
+
+    def stop(self):
+        """
+        This method stops serving requests and releases the port.
+        :return: None object
+        """
+
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    # benchmark the monarch module retrieval functions against the stand-in server without network
+    import monarch
+    import scheduler
+
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+    seed_list = ['HGNC:{}'.format(i) for i in range(1, 51)]
+    monarch.use_cache = False
+    scheduler.services['biolink'] = {'rate': 10000.0, 'max_concurrency': 16}
+    with BioLinkServer(latency=latency) as server:
+        monarch.biolink = server.url
+        print('BioLink stand-in at {} with {} s latency'.format(server.url, latency))
+        for workers in [1, 2, 4, 8, 16]:
+            monarch.max_workers = workers
+            t = time.time()
+            neighbours, relations = monarch.get_neighbours(seed_list)
+            t_neighbours = time.time() - t
+            t = time.time()
+            connections = monarch.get_connections(neighbours)
+            t_connections = time.time() - t
+            t = time.time()
+            network = monarch.orthopheno_expand_edges(seed_list)
+            t_orthopheno = time.time() - t
+            print('workers: {}\tget_neighbours: {:.2f} s ({} edges)\tget_connections: {:.2f} s ({} edges)\t'
+                  'orthopheno_expand_edges: {:.2f} s ({} edges)'.format(workers, t_neighbours, len(relations),
+                                                                       t_connections, len(connections),
+                                                                       t_orthopheno, len(network)))
+        print('requests: {}'.format(server.requests))
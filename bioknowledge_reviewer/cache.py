@@ -0,0 +1,179 @@
+# @name: cache.py
+# @description: Module for the persistent cache of web service responses
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Module for the persistent cache"""
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import threading
+
+
+# VARIABLES
+# seconds in a day
+day = 24 * 60 * 60
+
+
+# FUNCTIONS
+
+def get_key(*parts):
+    """
+    This function returns the content address of a cache entry, i.e. the SHA-1 digest of the JSON \
+    serialization of the key parts.
+    :param parts: key parts, e.g. endpoint, node and rows
+    :return: key string
+    """
+
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def get_file_key(filepath, chunk_size=2 ** 20):
+    """
+    This function returns the content address of a file, i.e. the SHA-1 digest of its bytes.
+    :param filepath: path to the file string
+    :param chunk_size: bytes read at a time (integer). Default: 1 MB.
+    :return: key string
+    """
+
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class Cache(object):
+    """
+    Persistent key-value cache stored in a SQLite database. Values are strings stored compressed. \
+    Entries older than the time to live (ttl) are not served, and the least recently used entries are \
+    evicted when the size of the stored values exceeds the maximum size.
+    """
+
+    def __init__(self, db_path, ttl=None, max_size=None):
+        """
+        Constructor
+        :param db_path: path to the SQLite database file string
+        :param ttl: time to live in seconds (integer). Default: None, i.e. entries never expire.
+        :param max_size: maximum size of the stored values in bytes (integer). Default: None, i.e. no limit.
+        """
+
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.isdir(directory): os.makedirs(directory)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS cache '
+                         '(key TEXT PRIMARY KEY, value BLOB, size INTEGER, created REAL, accessed REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+        self._db.commit()
+        self.size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+
+    def get(self, key):
+        """
+        This method returns the value stored for a key.
+        :param key: key string from the get_key() function
+        :return: value string or None if the key is not cached or it is expired
+        """
+
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT value, size, created FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[2] > self.ttl:
+                self._db.execute('DELETE FROM cache WHERE key = ?', (key,))
+                self._db.commit()
+                self.size -= row[1]
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute('UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+            self._db.commit()
+            self.hits += 1
+
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def set(self, key, value):
+        """
+        This method stores the value of a key and evicts the least recently used entries if the cache is full.
+        :param key: key string from the get_key() function
+        :param value: value string
+        :return: None object
+        """
+
+        now = time.time()
+        blob = zlib.compress(value.encode('utf-8'))
+        with self._lock:
+            row = self._db.execute('SELECT size FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                self.size -= row[0]
+            self._db.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)',
+                             (key, sqlite3.Binary(blob), len(blob), now, now))
+            self.size += len(blob)
+            if self.max_size is not None and self.size > self.max_size:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """
+        This method deletes the least recently used entries until the cache fits in its maximum size. \
+        The caller holds the lock.
+        :return: None object
+        """
+
+        cursor = self._db.execute('SELECT key, size FROM cache ORDER BY accessed')
+        evicted = list()
+        for key, size in cursor:
+            if self.size <= self.max_size:
+                break
+            evicted.append((key,))
+            self.size -= size
+        self._db.executemany('DELETE FROM cache WHERE key = ?', evicted)
+        self.evictions += len(evicted)
+
+    def clear(self):
+        """
+        This method deletes all the cache entries.
+        :return: None object
+        """
+
+        with self._lock:
+            self._db.execute('DELETE FROM cache')
+            self._db.commit()
+            self.size = 0
+
+    def stats(self):
+        """
+        This method returns the cache counters.
+        :return: counters dictionary: hits, misses, evictions, entries and size in bytes
+        """
+
+        with self._lock:
+            entries = self._db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': entries, 'size': self.size}
+
+    def close(self):
+        """
+        This method closes the cache database.
+        :return: None object
+        """
+
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,120 @@
+# @name: checkpoint.py
+# @description: Module for checkpoint journals of long-running retrievals
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Module for checkpoint journals"""
+
+import os
+import json
+import time
+
+
+class Journal(object):
+    """
+    Append-only JSONL journal of processed nodes. Every line records a node and its edges, so that an \
+    interrupted retrieval can be restarted skipping the nodes already processed. Lines are flushed as they \
+    are written, and synced to disk in batches to bound the write overhead.
+    """
+
+    def __init__(self, journal_path, batch_size=100, interval=10.0):
+        """
+        Constructor
+        :param journal_path: path to the JSONL journal file string
+        :param batch_size: number of records written between disk syncs (integer). Default: 100.
+        :param interval: maximum number of seconds between disk syncs (float). Default: 10.0.
+        """
+
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.records = dict()
+
+        directory = os.path.dirname(os.path.abspath(journal_path))
+        if not os.path.isdir(directory): os.makedirs(directory)
+        self._load()
+        self._f = open(journal_path, 'a')
+        self._pending = 0
+        self._synced = time.time()
+
+    def _load(self):
+        """
+        This method reads the records of an existing journal. A last line left incomplete by an interruption \
+        is discarded.
+        :return: None object
+        """
+
+        if not os.path.isfile(self.journal_path):
+            return
+        with open(self.journal_path, 'r+') as f:
+            valid = 0
+            for line in iter(f.readline, ''):
+                if not line.endswith('\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.records[record['node']] = [tuple(edge) for edge in record['edges']]
+                valid = f.tell()
+            f.truncate(valid)
+
+    def __contains__(self, node):
+        return node in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, node):
+        """
+        This method returns the edges recorded for a node.
+        :param node: node id string
+        :return: edges (as tuples) set
+        """
+
+        return set(self.records.get(node, []))
+
+    def record(self, node, edges):
+        """
+        This method appends a processed node and its edges to the journal.
+        :param node: node id string
+        :param edges: edges (as tuples) set
+        :return: None object
+        """
+
+        edges = [list(edge) for edge in edges]
+        self._f.write('{}\n'.format(json.dumps({'node': node, 'edges': edges})))
+        self._f.flush()
+        self.records[node] = [tuple(edge) for edge in edges]
+        self._pending += 1
+        if self._pending >= self.batch_size or time.time() - self._synced >= self.interval:
+            self.sync()
+
+    def sync(self):
+        """
+        This method syncs the journal to disk.
+        :return: None object
+        """
+
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._pending = 0
+        self._synced = time.time()
+
+    def close(self):
+        """
+        This method syncs and closes the journal.
+        :return: None object
+        """
+
+        if not self._f.closed:
+            self.sync()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
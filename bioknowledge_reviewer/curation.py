@@ -11,7 +11,8 @@
 import os,glob
 import pandas as pd
 from gsheets import Sheets
-from biothings_client import get_client
+import idmapping
+import storage
 #sys.path.insert(0,'/home/nuria/soft/utils3/lib/')
 #import abravo_lib as utils
 import utils
@@ -203,8 +204,7 @@ def normalize_genes_to_graph(edges_df):
     entrez = list(set(entrez))
 
     # api call
-    mg = get_client('gene')
-    df = mg.querymany(entrez, scopes='entrezgene', fields='HGNC', size=1, as_dataframe=True)
+    df = idmapping.querymany(entrez, scopes='entrezgene', fields='HGNC', size=1, as_dataframe=True)
 
     # build dictionary
     ids = df.reset_index().rename(columns={'query': 'entrez'}).copy()
@@ -298,8 +298,7 @@ def normalize_genes_to_proteins_to_graph(curated_df,concept_dct):
     uniprot = list(set(uniprot))
 
     # api call
-    mg = get_client('gene')
-    df = mg.querymany(uniprot, scopes='uniprot', fields='HGNC', size=1, as_dataframe=True)
+    df = idmapping.querymany(uniprot, scopes='uniprot', fields='HGNC', size=1, as_dataframe=True)
 
     # build dictionary
     ids = df.reset_index().rename(columns={'query': 'uniprot'}).copy()
@@ -387,8 +386,7 @@ def prepare_curated_nodes(curated_df):
 
     # api call
     print('\n* Querying BioThings to map Entrez gene IDs to HGNC IDs...')
-    mg = get_client('gene')
-    df = mg.querymany(entrez, scopes='entrezgene', fields='HGNC', size=1, as_dataframe=True)
+    df = idmapping.querymany(entrez, scopes='entrezgene', fields='HGNC', size=1, as_dataframe=True)
 
     # build dictionary
     ids = df.reset_index().rename(columns={'query': 'entrez'}).copy()
@@ -445,8 +443,7 @@ def prepare_curated_nodes(curated_df):
 
     # query biothings
     print('\n* Querying BioThings to map gene symbols to name...')
-    mg = get_client('gene')
-    df = mg.querymany(symbols, scopes='symbol,alias', fields='name', size=1, as_dataframe=True)
+    df = idmapping.querymany(symbols, scopes='symbol,alias', fields='name', size=1, as_dataframe=True)
 
     # dictionary: {symbol:name}
     ids = (df.reset_index().rename(columns={'query': 'symbol'}))
@@ -469,8 +466,7 @@ def prepare_curated_nodes(curated_df):
 
     # api call
     print('\n* Querying BioThings to map UniProt IDs to HGNC IDs, gene symbol, name, aliases, and description...')
-    mg = get_client('gene')
-    df = mg.querymany(uniprot, scopes='uniprot', fields='HGNC,symbol,name,alias,summary', size=1, as_dataframe=True)
+    df = idmapping.querymany(uniprot, scopes='uniprot', fields='HGNC,symbol,name,alias,summary', size=1, as_dataframe=True)
 
     # build a list of nodes as list of dict, i.e a df, where a dict is a node
     nodes_l = list()
@@ -534,13 +530,13 @@ def build_edges(edges_df):
     df = pd.DataFrame(edges_l)
     df = df[['subject_id','property_id','object_id','reference_uri','reference_supporting_text','reference_date', \
              'property_label','property_description','property_uri','g2p_mark']]
-    df.fillna('NA').to_csv('{}/curated_graph_edges_v{}.csv'.format(path, today), index=False)
+    table_path = storage.save_table(df, '{}/curated_graph_edges_v{}'.format(path, today))
 
     # print info
     print('\n* This is the size of the edges file data structure: {}'.format(pd.DataFrame(edges_l).shape))
     print('* These are the edges attributes: {}'.format(pd.DataFrame(edges_l).columns))
     print('* This is the first record:\n{}'.format(pd.DataFrame(edges_l).head(1)))
-    print('\nThe curation network edges are built and saved at: {}/curated_graph_edges_v{}.csv\n'.format(path, today))
+    print('\nThe curation network edges are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_edges().\n')
 
     return edges_l
@@ -573,13 +569,13 @@ def build_nodes(nodes_df):
     if not os.path.isdir(path): os.makedirs(path)
     df = pd.DataFrame(nodes_l)
     df = df[['id','semantic_groups','preflabel','synonyms','description','name']]
-    df.fillna('NA').to_csv('{}/curated_graph_nodes_v{}.csv'.format(path, today), index=False)
+    table_path = storage.save_table(df, '{}/curated_graph_nodes_v{}'.format(path, today))
 
     # print nodes info
     print('\n* This is the size of the nodes file data structure: {}'.format(pd.DataFrame(nodes_l).shape))
     print('* These are the nodes attributes: {}'.format(pd.DataFrame(nodes_l).columns))
     print('* This is the first record:\n{}'.format(pd.DataFrame(nodes_l).head(1)))
-    print('\nThe curation network nodes are built and saved at: {}/curated_graph_nodes_v{}.csv\n'.format(path, today))
+    print('\nThe curation network nodes are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_nodes().\n')
 
     return nodes_l
@@ -782,8 +778,7 @@ def _get_uniprot2geneid_dict(uniprot_list):
     :return: UniProt to Entrez ID dictionary
     """
 
-    mg = get_client('gene')
-    r_df = mg.querymany(uniprot_list, scopes='uniprot', fields='entrezgene', as_dataframe=True)
+    r_df = idmapping.querymany(uniprot_list, scopes='uniprot', fields='entrezgene', as_dataframe=True)
     #print(r_df.head(2))
 
     # get the dictionary from the dataframe
@@ -29,14 +29,20 @@
 # TODO: improve provenance, e.g.: adding to ref_supporting_text for monarch year, msigdb version, mondo version...
 """Module for functions to build the graph"""
 
+import numpy as np
 import pandas as pd
 import os
 import datetime
+import storage
 from utils import *
 
 # VARIABLES
 today = datetime.date.today()
 
+# edge attributes stored once per distinct predicate in the GraphIndex() predicates side table. \
+# The other attributes, e.g. references, are stored in the provenances side table.
+predicate_columns = ['property_id', 'property_label', 'property_description', 'property_uri']
+
 # path to write data
 path = os.getcwd() + "/graph"
 if not os.path.isdir(path): os.makedirs(path)
@@ -45,6 +51,234 @@ if not os.path.isdir(path): os.makedirs(path)
 # CHECK NETWORK SCHEMA AND NORMALIZE TO GRAPH SCHEMA
 
 
+# INTEGER-ENCODED GRAPH
+
+def factorize(values):
+    """
+    This function encodes values as int32 codes in order of appearance, where null values get the code -1.
+    :param values: values series
+    :return: codes numpy array, dictionary array with the value of every code at its position
+    """
+
+    codes, uniques = pd.factorize(values)
+
+    return codes.astype(np.int32), uniques.values
+
+
+def decode(dictionary, codes):
+    """
+    This function materializes codes as the values of their dictionary, where the code -1 is a null value.
+    :param dictionary: dictionary array from the factorize() function
+    :param codes: codes numpy array
+    :return: values array
+    """
+
+    return pd.api.extensions.take(dictionary, codes, allow_fill=True)
+
+
+def intern(values_l):
+    """
+    This function encodes several values series with one shared dictionary, as the factorize() function of \
+    their concatenation, without concatenating them. Every series is factorized on its own, and only its distinct \
+    values are looked up in the dictionary.
+    :param values_l: list of values series
+    :return: list of codes numpy arrays, dictionary array with the value of every code at its position
+    """
+
+    codes_l = list()
+    dictionary = None
+    for values in values_l:
+        codes, uniques = pd.factorize(values)
+        if dictionary is None:
+            positions = np.arange(len(uniques))
+            dictionary = uniques
+        else:
+            positions = dictionary.get_indexer(uniques)
+            new = positions == -1
+            positions[new] = len(dictionary) + np.arange(new.sum())
+            dictionary = dictionary.append(uniques[new])
+        codes_l.append(pd.api.extensions.take(positions, codes, allow_fill=True, fill_value=-1).astype(np.int32))
+
+    return codes_l, dictionary.values
+
+
+def get_columns(networks):
+    """
+    This function returns the columns that all the networks have, in the order of the first network, as the \
+    pandas concat() function with join="inner".
+    :param networks: list of dataframes
+    :return: columns list
+    """
+
+    columns = networks[0].columns.tolist()
+    for network in networks[1:]:
+        columns = [column for column in columns if column in network.columns]
+
+    return columns
+
+
+def get_categorical(dictionary, codes):
+    """
+    This function returns codes as a categorical of the distinct values of their dictionary, so the values are \
+    not materialized row by row.
+    :param dictionary: dictionary array, possibly with repeated or null values
+    :param codes: codes numpy array
+    :return: categorical
+    """
+
+    dictionary_codes, categories = factorize(pd.Series(dictionary))
+
+    return pd.Categorical.from_codes(pd.api.extensions.take(dictionary_codes, codes, allow_fill=True, fill_value=-1),
+                                     categories)
+
+
+def combine_codes(codes_l):
+    """
+    This function encodes the combinations of several code arrays as int32 codes in order of appearance. The \
+    combined key is factorized after adding every array, so it never grows beyond the number of rows.
+    :param codes_l: list of code arrays of the same length
+    :return: codes numpy array, positions of the first row with every code numpy array
+    """
+
+    key = np.zeros(len(codes_l[0]), dtype=np.int64)
+    for codes in codes_l:
+        key = key * (int(codes.max()) + 2 if len(codes) else 1) + codes + 1
+        key = pd.factorize(key)[0]
+    first = np.flatnonzero(~pd.Series(key).duplicated().values)
+
+    return key.astype(np.int32), first
+
+
+class GraphIndex(object):
+    """
+    Integer-encoded graph edges. Node CURIEs are interned in a node dictionary, and edges are held as int32 \
+    arrays of subject, predicate and object codes and a provenance code. The predicate attributes (property_*) \
+    and the provenance attributes (reference_* and any other column) are stored once per distinct value in the \
+    predicates and provenances side tables. Deduplication runs on packed integer keys, and string values are \
+    only materialized by the get_statements() method. A list of networks is encoded network by network, so \
+    their concatenation is never built as a dataframe of strings.
+    """
+
+    def __init__(self, statements):
+        """
+        Constructor
+        :param statements: graph edges dataframe with 'subject_id' and 'object_id' columns, or list of graph edges \
+        dataframes, encoded as their concatenation with pd.concat(ignore_index=True, join="inner")
+        """
+
+        if isinstance(statements, pd.DataFrame):
+            networks = [statements]
+            self.index = statements.index.values
+        else:
+            networks = list(statements)
+            self.index = np.arange(sum(len(network) for network in networks))
+        self.columns = get_columns(networks)
+        self.predicate_columns = [column for column in predicate_columns if column in self.columns]
+        self.provenance_columns = [column for column in self.columns
+                                   if column not in ['subject_id', 'object_id'] + self.predicate_columns]
+
+        # node dictionary: {code: CURIE} as array positions, shared by subjects and objects
+        codes_l, self.nodes = intern([network['subject_id'] for network in networks] +
+                                     [network['object_id'] for network in networks])
+        self.subject = np.concatenate(codes_l[:len(networks)])
+        self.object = np.concatenate(codes_l[len(networks):])
+
+        # side tables: {attribute: values array} with a row per predicate or provenance code
+        self.predicate, self.predicates = self._intern(networks, self.predicate_columns)
+        self.provenance, self.provenances = self._intern(networks, self.provenance_columns)
+
+    @staticmethod
+    def _intern(networks, columns):
+        """
+        This method encodes the combinations of values of a group of attributes.
+        :param networks: list of graph edges dataframes
+        :param columns: attributes list
+        :return: codes numpy array, side table dictionary {attribute: values array}
+        """
+
+        if not columns:
+            return np.zeros(sum(len(network) for network in networks), dtype=np.int32), dict()
+        encoded = list()
+        for column in columns:
+            codes_l, dictionary = intern([network[column] for network in networks])
+            encoded.append((np.concatenate(codes_l), dictionary))
+        codes, first = combine_codes([column_codes for column_codes, dictionary in encoded])
+        table = {column: decode(dictionary, column_codes[first])
+                 for column, (column_codes, dictionary) in zip(columns, encoded)}
+
+        return codes, table
+
+    def __len__(self):
+        return len(self.subject)
+
+    @property
+    def shape(self):
+        return len(self), len(self.columns)
+
+    def get_keys(self):
+        """
+        This method packs the subject, predicate, object and provenance codes of every edge into one int64 key. \
+        The key is factorized before adding a code whenever the packed value could overflow.
+        :return: keys numpy array
+        """
+
+        key = (self.subject.astype(np.int64) + 1) * (len(self.nodes) + 1) + self.object + 1
+        for codes in [self.predicate, self.provenance]:
+            size = int(codes.max()) + 1 if len(codes) else 1
+            if len(key) and int(key.max()) * size + size >= 2 ** 63:
+                key = pd.factorize(key)[0].astype(np.int64)
+            key = key * size + codes
+
+        return key
+
+    def take(self, positions):
+        """
+        This method keeps the edges at the given positions.
+        :param positions: edge positions numpy array
+        :return: None object
+        """
+
+        self.index = self.index[positions]
+        self.subject = self.subject[positions]
+        self.object = self.object[positions]
+        self.predicate = self.predicate[positions]
+        self.provenance = self.provenance[positions]
+
+    def drop_duplicates(self):
+        """
+        This method removes the duplicated edges, keeping the first one, as the dataframe drop_duplicates() method.
+        :return: None object
+        """
+
+        self.take(np.flatnonzero(~pd.Series(self.get_keys()).duplicated().values))
+
+    def get_nodes(self):
+        """
+        This method returns the nodes of the edges in order of appearance, subjects before objects.
+        :return: node CURIEs array
+        """
+
+        return decode(self.nodes, pd.unique(np.concatenate([self.subject, self.object])))
+
+    def get_statements(self, categorical=False):
+        """
+        This method materializes the graph edges as a dataframe with the original columns and index.
+        :param categorical: whether to return the columns as categoricals of the dictionary and side tables values \
+        instead of materializing the values (boolean). Default: False.
+        :return: edges dataframe
+        """
+
+        get_column = get_categorical if categorical else decode
+        statements = {'subject_id': get_column(self.nodes, self.subject),
+                      'object_id': get_column(self.nodes, self.object)}
+        for column in self.predicate_columns:
+            statements[column] = get_column(self.predicates[column], self.predicate)
+        for column in self.provenance_columns:
+            statements[column] = get_column(self.provenances[column], self.provenance)
+
+        return pd.DataFrame(statements, index=self.index, columns=self.columns)
+
+
 # NETWORK MANAGEMENT FUNCTIONS
 
 def print_graph(graph, filename):
@@ -94,8 +328,8 @@ def graph_nodes(curation,monarch,transcriptomics,regulation,input_from_file=Fals
             rna = get_dataframe_from_file(transcriptomics)
             tf = get_dataframe_from_file(regulation)
         else:
-            print("Please, if you are providing the input from file then introduce the file path to the CSV file \
-            , e.g. curation=str(/home/../file_name.csv). Otherwise, provide the objects and set the 'input_from_file' \
+            print("Please, if you are providing the input from file then introduce the file path to the CSV or parquet \
+            file, e.g. curation=str(/home/../file_name.csv). Otherwise, provide the objects and set the 'input_from_file' \
             argument to 'False'. Thanks!")
             raise
     else:
@@ -117,136 +351,44 @@ def graph_nodes(curation,monarch,transcriptomics,regulation,input_from_file=Fals
     print(tf.shape)
     print(tf.columns)
 
-    # concat 1) curated 2) monarch 3) RNA-seq edges
+    # concat 1) curated 2) monarch 3) RNA-seq edges, only their node ids are interned
     print('\nConcatenating into a graph...')
-    statements = pd.concat([curated_df, monarch_df, rna], ignore_index=True, join="inner")
-    print(statements.shape)
-
-    # drop row duplicates
-    print('\nDrop duplicated rows...')
-    statements.drop_duplicates(keep='first', inplace=True)
-    print(statements.shape)
+    networks = [curated_df, monarch_df, rna]
+    print((sum(len(network) for network in networks), len(get_columns(networks))))
 
     ## merge graph & tf
-    # merge: 4 merges
+    # select the tf edges with a graph node as subject or object
     print('\nMerging tf-gene network to the graph...')
-    # merge1: L_sub  &  tf_sub
-    merge1 = pd.merge(statements, tf, how='inner', left_on='subject_id', right_on='subject_id',
-                      suffixes=('_graph', '_tf'))
-
-    # merge2: L_obj  &  tf_sub
-    merge2 = pd.merge(statements, tf, how='inner', left_on='object_id', right_on='subject_id',
-                      suffixes=('_graph', '_tf'))
-
-    # merge3: L_sub  &  tf_obj
-    merge3 = pd.merge(statements, tf, how='inner', left_on='subject_id', right_on='object_id',
-                      suffixes=('_graph', '_tf'))
-
-    # merge4: L_obj  &  tf_obj
-    merge4 = pd.merge(statements, tf, how='inner', left_on='object_id', right_on='object_id',
-                      suffixes=('_graph', '_tf'))
-
-    # prepare merged edges: slice tf edges from merge
-    # merge1
-    merge1_clean = (merge1
-    [['subject_id', 'property_id_tf', 'object_id_tf', 'reference_uri_tf',
-      'reference_supporting_text_tf', 'reference_date_tf', 'property_label_tf',
-      'property_description_tf', 'property_uri_tf']]
-        .rename(columns={
-        'property_id_tf': 'property_id',
-        'object_id_tf': 'object_id',
-        'reference_uri_tf': 'reference_uri',
-        'reference_supporting_text_tf': 'reference_supporting_text',
-        'reference_date_tf': 'reference_date',
-        'property_label_tf': 'property_label',
-        'property_description_tf': 'property_description',
-        'property_uri_tf': 'property_uri'
-    })
-    )
-
-    # merge2
-    merge2_clean = (merge2
-    [['subject_id_tf', 'property_id_tf', 'object_id_tf', 'reference_uri_tf',
-      'reference_supporting_text_tf', 'reference_date_tf', 'property_label_tf',
-      'property_description_tf', 'property_uri_tf']]
-        .rename(columns={
-        'subject_id_tf': 'subject_id',
-        'property_id_tf': 'property_id',
-        'object_id_tf': 'object_id',
-        'reference_uri_tf': 'reference_uri',
-        'reference_supporting_text_tf': 'reference_supporting_text',
-        'reference_date_tf': 'reference_date',
-        'property_label_tf': 'property_label',
-        'property_description_tf': 'property_description',
-        'property_uri_tf': 'property_uri'
-    })
-    )
-
-    # merge3
-    merge3_clean = (merge3
-    [['subject_id_tf', 'property_id_tf', 'object_id_tf', 'reference_uri_tf',
-      'reference_supporting_text_tf', 'reference_date_tf', 'property_label_tf',
-      'property_description_tf', 'property_uri_tf']]
-        .rename(columns={
-        'subject_id_tf': 'subject_id',
-        'property_id_tf': 'property_id',
-        'object_id_tf': 'object_id',
-        'reference_uri_tf': 'reference_uri',
-        'reference_supporting_text_tf': 'reference_supporting_text',
-        'reference_date_tf': 'reference_date',
-        'property_label_tf': 'property_label',
-        'property_description_tf': 'property_description',
-        'property_uri_tf': 'property_uri'
-    })
-    )
-
-    # merge4
-    merge4_clean = (merge4
-    [['subject_id_tf', 'property_id_tf', 'object_id', 'reference_uri_tf',
-      'reference_supporting_text_tf', 'reference_date_tf', 'property_label_tf',
-      'property_description_tf', 'property_uri_tf']]
-        .rename(columns={
-        'subject_id_tf': 'subject_id',
-        'property_id_tf': 'property_id',
-        'reference_uri_tf': 'reference_uri',
-        'reference_supporting_text_tf': 'reference_supporting_text',
-        'reference_date_tf': 'reference_date',
-        'property_label_tf': 'property_label',
-        'property_description_tf': 'property_description',
-        'property_uri_tf': 'property_uri'
-    })
-    )
-
-    ## concat merged edges to statements (<= curated+monarch+rna)
-    # concat all 4 merges to merged edges
-    merged = pd.concat([merge1_clean, merge2_clean, merge3_clean, merge4_clean], ignore_index=True, join="inner")
+    nodes = intern([network[column] for column in ['subject_id', 'object_id'] for network in networks])[1]
+    merged = tf.loc[tf.subject_id.isin(nodes) | tf.object_id.isin(nodes),
+                    ['subject_id', 'property_id', 'object_id', 'reference_uri', 'reference_supporting_text',
+                     'reference_date', 'property_label', 'property_description', 'property_uri']]
 
     # drop duplicates
-    merged.drop_duplicates(inplace=True)
+    merged = merged.drop_duplicates()
     print(merged.shape)
 
     # save graph
     print('\nSaving tf merged edges...')
     path = os.getcwd() + "/graph"
-    merged.fillna('NA').to_csv('{}/regulation_graph_edges_v{}.csv'.format(path, today), index=False)
-    print('\nThe regulation graph merged edges are saved at: {}/regulation_graph_edges_v{}.csv\n'.format(path, today))
+    table_path = storage.save_table(merged, '{}/regulation_graph_edges_v{}'.format(path, today))
+    print('\nThe regulation graph merged edges are saved at: {}\n'.format(table_path))
 
-    # concat merged to statements
-    statements = pd.concat([statements, merged], ignore_index=True, join="inner")
-    print(statements.shape)
+    # concat merged to statements, networks are encoded one by one and duplicated rows are dropped from the \
+    # integer-encoded edges
+    index = GraphIndex(networks + [merged])
+    print(index.shape)
 
     # drop duplicates
     print('\nDrop duplicated rows...')
-    statements.drop_duplicates(keep='first', inplace=True)
-    print(statements.shape)
+    index.drop_duplicates()
+    print(index.shape)
 
     ## Nodes
     # extracting nodes in the graph
     print('\nGenerating graph nodes...')
-    st_nodes_l = pd.concat([statements.subject_id, statements.object_id], ignore_index=True)
-    st_nodes_l.drop_duplicates(inplace=True)
-    st_nodes_df = pd.DataFrame({'id': st_nodes_l})
-    print(st_nodes_df.shape)
+    st_nodes_l = pd.Series(index.get_nodes())
+    print(st_nodes_l.shape)
     print('\nFinished graph_nodes().\n')
 
     return st_nodes_l, merged
@@ -279,8 +421,8 @@ def build_edges(curation,monarch,transcriptomics,regulation,input_from_file=Fals
             rna = get_dataframe_from_file(transcriptomics)
             tf_merged = get_dataframe_from_file(regulation)
         else:
-            print("Please, if you are providing the input from file then introduce the file path to the CSV file \
-            , e.g. curation=str(/home/../file_name.csv). Otherwise, provide the objects and set the 'input_from_file' \
+            print("Please, if you are providing the input from file then introduce the file path to the CSV or parquet \
+            file, e.g. curation=str(/home/../file_name.csv). Otherwise, provide the objects and set the 'input_from_file' \
             argument to 'False'. Thanks!")
             raise
     else:
@@ -304,14 +446,15 @@ def build_edges(curation,monarch,transcriptomics,regulation,input_from_file=Fals
 
     # concat 1) curated 2) monarch 3) RNA-seq edges
     #TODO: check format
+    # nodes, predicates and provenances are interned network by network, without a concatenated dataframe
     print('\nConcatenating into a graph...')
-    statements = pd.concat([curated_df, monarch_df, rna, tf_merged], ignore_index=True, join="inner")
-    print(statements.shape)
+    index = GraphIndex([curated_df, monarch_df, rna, tf_merged])
+    print(index.shape)
 
     # drop row duplicates
     print('\nDrop duplicated rows...')
-    statements.drop_duplicates(keep='first', inplace=True)
-    print(statements.shape)
+    index.drop_duplicates()
+    print(index.shape)
 
     # add property_uri for those without but with a curie property_id annotated
     curie_dct = {
@@ -327,38 +470,43 @@ def build_edges(curation,monarch,transcriptomics,regulation,input_from_file=Fals
         'pmid': 'https://www.ncbi.nlm.nih.gov/pubmed/',
         'encode': 'https://www.encodeproject.org/search/?searchTerm='
     }
-    for i, row in statements.iterrows():
-        if ':' in str(row['property_uri']):
-            property_uri = row['property_uri']
-        elif ':' in str(row['property_id']) and str(row['property_id']).split(':')[0].lower() == 'skos':
-            property_uri = curie_dct[row['property_id'].split(':')[0].lower()] + row['property_id'].split(':')[1]
-        elif ':' in str(row['property_id']):
+    # resolved once per predicate in the predicates side table
+    predicates = index.predicates
+    property_uri_l = set(uri for uri in predicates['property_uri'].tolist() if pd.notna(uri) and ':' in str(uri))
+    property_uri_dct = dict()
+    for property_id in pd.unique(predicates['property_id']).tolist():
+        if pd.isna(property_id):
+            continue
+        property_uri = None
+        if ':' in str(property_id) and str(property_id).split(':')[0].lower() == 'skos':
+            property_uri = curie_dct[property_id.split(':')[0].lower()] + property_id.split(':')[1]
+        elif ':' in str(property_id):
             try:
-                property_uri = curie_dct[row['property_id'].split(':')[0].lower()] + row['property_id'].replace(':',
-                                                                                                                '_')
+                property_uri = curie_dct[property_id.split(':')[0].lower()] + property_id.replace(':', '_')
             except KeyError:
-                property_uri = None
-                print('There is a reference curie with and unrecognized namespace:', row['property_id'])
-        else:
-            property_uri = None
-        statements.at[i, 'property_uri'] = property_uri
+                print('There is a reference curie with and unrecognized namespace:', property_id)
+        property_uri_dct[property_id] = property_uri
+    predicates['property_uri'] = np.array([
+        property_uri if property_uri in property_uri_l else property_uri_dct.get(property_id, np.nan)
+        for property_id, property_uri in zip(predicates['property_id'].tolist(), predicates['property_uri'].tolist())],
+        dtype=object)
 
     # save graph
     print('\nSaving final graph...')
     path = os.getcwd() + "/graph"
-    statements = statements[['subject_id', 'property_id', 'object_id', 'reference_uri',
-                             'reference_supporting_text', 'reference_date', 'property_label',
-                             'property_description', 'property_uri']]
+    statements = index.get_statements(categorical=True)[['subject_id', 'property_id', 'object_id', 'reference_uri',
+                                                         'reference_supporting_text', 'reference_date',
+                                                         'property_label', 'property_description', 'property_uri']]
     print(statements.shape)
     print(statements.columns)
-    statements.fillna('NA').to_csv('{}/graph_edges_v{}.csv'.format(path, today), index=False)
+    table_path = storage.save_table(statements, '{}/graph_edges_v{}'.format(path, today))
+    statements = storage.decode_categories(statements)
 
     # print info
     print('\n* This is the size of the edges file data structure: {}'.format(statements.shape))
     print('* These are the edges attributes: {}'.format(statements.columns))
     print('* This is the first record:\n{}'.format(statements.head(1)))
-    print('\nThe NGLY1 Deficiency knowledge graph edges are built and saved at:'
-          ' {}/graph_edges_v{}.csv\n'.format(path, today))
+    print('\nThe NGLY1 Deficiency knowledge graph edges are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_edges().\n')
 
     return statements
@@ -388,8 +536,8 @@ def build_nodes(statements,curation,monarch,transcriptomics,regulation,input_fro
             rna_df = get_dataframe_from_file(transcriptomics)
             tf_df = get_dataframe_from_file(regulation)
         else:
-            print("Please, if you are providing the input from file then introduce the file path to the CSV file \
-            , e.g. curation=str(/home/../file_name.csv). Otherwise, provide the objects and set the 'input_from_file' \
+            print("Please, if you are providing the input from file then introduce the file path to the CSV or parquet \
+            file, e.g. curation=str(/home/../file_name.csv). Otherwise, provide the objects and set the 'input_from_file' \
             argument to 'False'. Thanks!")
             raise
     else:
@@ -475,14 +623,13 @@ def build_nodes(statements,curation,monarch,transcriptomics,regulation,input_fro
     nodes['synonyms'] = nodes.synonyms.apply(lambda x: str('|'.join(x)) if isinstance(x, list) else x)
     print(nodes.shape)
     print(nodes.columns)
-    nodes.fillna('NA').to_csv('{}/graph_nodes_v{}.csv'.format(path, today), index=False)
+    table_path = storage.save_table(nodes, '{}/graph_nodes_v{}'.format(path, today))
 
     # print info
     print('\n* This is the size of the edges file data structure: {}'.format(nodes.shape))
     print('* These are the edges attributes: {}'.format(nodes.columns))
     print('* This is the first record:\n{}'.format(nodes.head(1)))
-    print('\nThe NGLY1 Deficiency knowledge graph nodes are built and saved at: '
-          '{}/graph_nodes_v{}.csv\n'.format(path, today))
+    print('\nThe NGLY1 Deficiency knowledge graph nodes are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_nodes().\n')
 
     return nodes
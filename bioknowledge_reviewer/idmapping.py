@@ -0,0 +1,315 @@
+# @name: idmapping.py
+# @description: Module for identifier mapping with BioThings services and a persistent cache
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Module for identifier mapping"""
+
+import os
+import json
+import threading
+import pandas as pd
+import cache
+import scheduler
+
+
+# VARIABLES
+# path to write data
+path = os.getcwd() + '/idmapping'
+if not os.path.isdir(path): os.makedirs(path)
+
+# BioThings query results cache: set use_cache to False to always query the service
+use_cache = True
+cache_path = path + '/biothings_cache.sqlite'
+cache_ttl = 30 * cache.day
+cache_max_size = 1024 ** 3
+_cache = None
+_cache_lock = threading.Lock()
+
+# query terms per BioThings request: the client sends up to 1000 terms in one POST request
+batch_size = 1000
+
+# local gene index answering the gene lookups offline instead of BioThings, e.g. \
+# idmapping.local_index = idmapping.GeneIndex('Homo_sapiens.gene_info.gz', 'hgnc_complete_set.txt', 'gene_history.gz')
+local_index = None
+
+# number of rows read at a time from the NCBI dumps, which hold all the taxa
+chunksize = 10 ** 6
+
+
+# FUNCTIONS
+
+def get_cache():
+    """
+    This function returns the BioThings query results cache, creating it at the 'cache_path' module variable \
+    the first time it is used.
+    :return: cache object or None if the 'use_cache' module variable is False
+    """
+
+    global _cache
+    if not use_cache:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = cache.Cache(cache_path, ttl=cache_ttl, max_size=cache_max_size)
+
+    return _cache
+
+
+def get_dataframe(hits):
+    """
+    This function converts BioThings hits to a dataframe indexed by query term, as the BioThings client \
+    does with as_dataframe=True.
+    :param hits: hits (dictionaries) list
+    :return: hits dataframe
+    """
+
+    if not hits:
+        return pd.DataFrame(index=pd.Index([], name='query'))
+
+    return pd.json_normalize(hits).set_index('query')
+
+
+def querymany(qterms, scopes=None, fields=None, as_dataframe=False, entity='gene', **kwargs):
+    """
+    This function maps a list of query terms with a BioThings service, as the querymany() method of the \
+    BioThings client. Results are cached per (entity, scopes, query term, fields and query options), so only \
+    the query terms not mapped before are sent to the service, in batches of the 'batch_size' module variable \
+    scheduled as one request each. Gene lookups are answered by the 'local_index' module variable instead, when \
+    it is set and it supports the scopes and fields.
+    :param qterms: query terms list, e.g. gene symbols or entrez ids
+    :param scopes: fields to match the query terms against string, e.g. 'symbol,alias'. Default: None.
+    :param fields: fields to return string, e.g. 'entrezgene,HGNC'. Default: None.
+    :param as_dataframe: whether to return a dataframe indexed by query term (boolean). Default: False.
+    :param entity: BioThings entity string. Default: 'gene'.
+    :param kwargs: other querymany() options, e.g. size=1
+    :return: hits (dictionaries) list in the order of the query terms, or hits dataframe
+    """
+
+    qterms = list(qterms)
+    if entity == 'gene' and local_index is not None and local_index.supports(scopes, fields):
+        hits = local_index.querymany(qterms, scopes, fields, **kwargs)
+        print('* Gene index {} query terms: {} not found'.format(len(hits), sum('notfound' in hit for hit in hits)))
+        return get_dataframe(hits) if as_dataframe else hits
+
+    responses = get_cache()
+    keys = {str(q): cache.get_key(entity, scopes, str(q), fields, kwargs) for q in qterms}
+
+    # cached query terms
+    hits_dct = dict()
+    if responses is not None:
+        for q, key in keys.items():
+            text = responses.get(key)
+            if text is not None:
+                hits_dct[q] = json.loads(text)
+
+    # query BioThings with the rest
+    # one scheduled call per batch, so a retried request only sends its batch again and the batches already \
+    # mapped are cached
+    misses = [q for q in keys if q not in hits_dct]
+    if misses:
+        mg = scheduler.get_client(entity)
+        for i in range(0, len(misses), batch_size):
+            batch = misses[i:i + batch_size]
+            new_dct = dict()
+            for hit in mg.querymany(batch, scopes=scopes, fields=fields, **kwargs):
+                new_dct.setdefault(str(hit['query']), []).append(hit)
+            for q in batch:
+                hits = new_dct.get(q, [{'query': q, 'notfound': True}])
+                hits_dct[q] = hits
+                if responses is not None:
+                    responses.set(keys[q], json.dumps(hits))
+    print('* BioThings {} query terms: {} cached, {} queried'.format(len(keys), len(keys) - len(misses),
+                                                                      len(misses)))
+
+    hits = [hit for q in qterms for hit in hits_dct[str(q)]]
+    if as_dataframe:
+        return get_dataframe(hits)
+
+    return hits
+
+
+class GeneIndex(object):
+    """
+    Local gene identifier index built from NCBI and HGNC dump files, answering the gene querymany() lookups \
+    of this package offline: symbol, alias, entrezgene, retired and HGNC scopes, and entrezgene, HGNC, symbol, \
+    name and alias fields. Gene summaries are not part of the dumps, so lookups asking for them, i.e. the nodes \
+    annotation of the build_nodes() functions, are still sent to BioThings.
+    """
+
+    # scopes in matching priority order, and fields answered
+    scopes = ['entrezgene', 'symbol', 'HGNC', 'retired', 'alias']
+    fields = ['entrezgene', 'HGNC', 'symbol', 'name', 'alias']
+
+    def __init__(self, gene_info_path, hgnc_path=None, gene_history_path=None, tax_id='9606'):
+        """
+        Constructor
+        :param gene_info_path: path to the NCBI gene_info file string, e.g. 'Homo_sapiens.gene_info.gz'
+        :param hgnc_path: path to the HGNC complete set file string, e.g. 'hgnc_complete_set.txt'. Default: None.
+        :param gene_history_path: path to the NCBI gene_history file string, for the retired entrez IDs. \
+        Default: None.
+        :param tax_id: NCBI taxonomy id of the genes to index string. Default: '9606', i.e. human.
+        """
+
+        # gene records: {entrez: [symbol, name, aliases list, hgnc]}
+        self.genes = dict()
+        # lookup indexes: {uppercase symbol/alias or hgnc or retired entrez: entrez}
+        self.symbols = dict()
+        self.aliases = dict()
+        self.hgnc = dict()
+        self.retired = dict()
+
+        self._read_gene_info(gene_info_path, tax_id)
+        if hgnc_path is not None:
+            self._read_hgnc(hgnc_path)
+        if gene_history_path is not None:
+            self._read_gene_history(gene_history_path, tax_id)
+        print('* Gene index: {} genes, {} symbols, {} aliases, {} HGNC IDs, {} retired IDs'
+              .format(len(self.genes), len(self.symbols), len(self.aliases), len(self.hgnc), len(self.retired)))
+
+    @staticmethod
+    def _split(value):
+        """
+        This method splits a '|' separated dump field, where '-' or empty means no value.
+        :param value: field string
+        :return: values list
+        """
+
+        if not isinstance(value, str) or value in ('', '-'):
+            return []
+
+        return [v.strip('"') for v in value.split('|') if v]
+
+    def _read_gene_info(self, gene_info_path, tax_id):
+        """
+        This method reads the genes of a taxon from the NCBI gene_info file.
+        :param gene_info_path: path to the NCBI gene_info file string
+        :param tax_id: NCBI taxonomy id string
+        :return: None object
+        """
+
+        chunks = pd.read_csv(gene_info_path, sep='\t', dtype=str, chunksize=chunksize,
+                             usecols=['#tax_id', 'GeneID', 'Symbol', 'Synonyms', 'dbXrefs', 'description',
+                                      'Full_name_from_nomenclature_authority'])
+        df = pd.concat(chunk[chunk['#tax_id'] == tax_id] for chunk in chunks)
+        for entrez, symbol, synonyms, xrefs, description, full_name in zip(
+                df.GeneID, df.Symbol, df.Synonyms, df.dbXrefs, df.description,
+                df.Full_name_from_nomenclature_authority):
+            hgnc = None
+            for xref in self._split(xrefs):
+                if xref.startswith('HGNC:'):
+                    hgnc = xref.split(':')[-1]
+            name = full_name if isinstance(full_name, str) and full_name != '-' else description
+            self.genes[entrez] = [symbol, name if isinstance(name, str) and name != '-' else None,
+                                  self._split(synonyms), hgnc]
+            self.symbols.setdefault(symbol.upper(), entrez)
+            for alias in self._split(synonyms):
+                self.aliases.setdefault(alias.upper(), entrez)
+            if hgnc is not None:
+                self.hgnc.setdefault(hgnc, entrez)
+
+    def _read_hgnc(self, hgnc_path):
+        """
+        This method completes the genes with the HGNC complete set: approved names, HGNC IDs, and alias and \
+        previous symbols.
+        :param hgnc_path: path to the HGNC complete set file string
+        :return: None object
+        """
+
+        df = pd.read_csv(hgnc_path, sep='\t', dtype=str,
+                         usecols=['hgnc_id', 'symbol', 'name', 'alias_symbol', 'prev_symbol', 'entrez_id'])
+        for hgnc_id, symbol, name, alias_symbol, prev_symbol, entrez in zip(
+                df.hgnc_id, df.symbol, df.name, df.alias_symbol, df.prev_symbol, df.entrez_id):
+            if not isinstance(entrez, str) or entrez not in self.genes:
+                continue
+            hgnc = hgnc_id.split(':')[-1]
+            gene = self.genes[entrez]
+            gene[1] = name if isinstance(name, str) else gene[1]
+            gene[3] = hgnc
+            self.hgnc[hgnc] = entrez
+            self.symbols.setdefault(symbol.upper(), entrez)
+            for alias in self._split(alias_symbol) + self._split(prev_symbol):
+                if alias not in gene[2]:
+                    gene[2].append(alias)
+                self.aliases.setdefault(alias.upper(), entrez)
+
+    def _read_gene_history(self, gene_history_path, tax_id):
+        """
+        This method reads the retired entrez IDs of a taxon and their current IDs from the NCBI gene_history file.
+        :param gene_history_path: path to the NCBI gene_history file string
+        :param tax_id: NCBI taxonomy id string
+        :return: None object
+        """
+
+        chunks = pd.read_csv(gene_history_path, sep='\t', dtype=str, chunksize=chunksize,
+                             usecols=['#tax_id', 'GeneID', 'Discontinued_GeneID'])
+        for df in chunks:
+            df = df[(df['#tax_id'] == tax_id) & (df.GeneID != '-')]
+            self.retired.update(zip(df.Discontinued_GeneID, df.GeneID))
+
+    def supports(self, scopes, fields):
+        """
+        This method checks whether a query can be answered by the index.
+        :param scopes: comma separated scopes string
+        :param fields: comma separated fields string
+        :return: boolean
+        """
+
+        return (scopes is not None and fields is not None
+                and all(scope in self.scopes for scope in scopes.split(','))
+                and all(field in self.fields for field in fields.split(',')))
+
+    def search(self, q, scopes):
+        """
+        This method returns the entrez ID of the gene matching a query term in any of the scopes.
+        :param q: query term string
+        :param scopes: scopes list
+        :return: entrez ID string or None
+        """
+
+        for scope in self.scopes:
+            if scope not in scopes:
+                continue
+            if scope == 'entrezgene' and q in self.genes:
+                return q
+            if scope == 'symbol' and q.upper() in self.symbols:
+                return self.symbols[q.upper()]
+            if scope == 'HGNC' and q.split(':')[-1] in self.hgnc:
+                return self.hgnc[q.split(':')[-1]]
+            if scope == 'retired' and q in self.retired:
+                return self.retired[q]
+            if scope == 'alias' and q.upper() in self.aliases:
+                return self.aliases[q.upper()]
+
+        return None
+
+    def querymany(self, qterms, scopes, fields, **kwargs):
+        """
+        This method maps a list of query terms as the querymany() method of the BioThings client.
+        :param qterms: query terms list
+        :param scopes: comma separated scopes string
+        :param fields: comma separated fields string
+        :param kwargs: other querymany() options, ignored
+        :return: hits (dictionaries) list in the order of the query terms
+        """
+
+        scopes = scopes.split(',')
+        fields = fields.split(',')
+        hits = list()
+        for q in qterms:
+            q = str(q)
+            entrez = self.search(q, scopes)
+            if entrez is None:
+                hits.append({'query': q, 'notfound': True})
+                continue
+            symbol, name, aliases, hgnc = self.genes[entrez]
+            values = {'entrezgene': entrez, 'HGNC': hgnc, 'symbol': symbol, 'name': name,
+                      'alias': (aliases[0] if len(aliases) == 1 else list(aliases)) if aliases else None}
+            # missing values as NaN, so the dataframe has a column for every field as BioThings has
+            hit = {'query': q, '_id': entrez, '_score': 1.0}
+            hit.update({field: float('nan') if values.get(field) is None else values[field] for field in fields})
+            hits.append(hit)
+
+        return hits
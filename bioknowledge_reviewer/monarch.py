@@ -13,9 +13,16 @@ import requests
 import sys,os
 import json
 import datetime
+import threading
+import numpy as np
 import pandas as pd
-from biothings_client import get_client
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
+import cache
+import checkpoint
+import idmapping
+import scheduler
+import storage
 
 
 # VARIABLES
@@ -37,6 +44,46 @@ if not os.path.isdir(path): os.makedirs(path)
 #graph = os.getcwd() + '/graph'
 #if not os.path.isdir(graph): os.makedirs(graph)
 
+# BioLink API address
+biolink = 'https://api.monarchinitiative.org/api/association'
+
+# number of concurrent workers querying the BioLink API
+max_workers = 8
+
+# number of associations retrieved per BioLink API request
+page_size = 1000
+
+# worker thread storage: one pooled HTTP session per worker
+_local = threading.local()
+
+# BioLink responses cache: set use_cache to False to always query the API
+use_cache = True
+cache_path = path + '/biolink_cache.sqlite'
+cache_ttl = 30 * cache.day
+cache_max_size = 2 * 1024 ** 3
+_cache = None
+_cache_lock = threading.Lock()
+
+# hop filters of expand_frontier(): orthologs of the seed and their phenotypes, as get_orthopheno_list()
+orthopheno_hops = [
+    {'predicates': ['RO:HOM0000017', 'RO:HOM0000020']},
+    {'predicates': ['RO:0002200', 'RO:0002607', 'RO:0002326', 'GENO:0000840']}
+]
+
+# semantic groups of node CURIE prefixes: ordered (semantic group, keywords) rules, the first rule with a keyword \
+# contained in the lowercased prefix classifies the prefix. The empty keyword of GENO matches any prefix left
+semantic_groups = [
+    ('VARI', ['variant']),
+    ('DISO', ['phenotype', 'mondo', 'omim', 'doid', 'mesh', 'hp', 'mp', 'fbcv', 'fbbt', 'zp', 'apo', 'trait']),
+    ('GENE', ['gene', 'hgnc', 'ensembl', 'mgi', 'flybase', 'wormbase', 'xenbase', 'zfin', 'rgd', 'sgd']),
+    ('PHYS', ['react', 'kegg-path', 'go']),
+    ('ANAT', ['uberon', 'cl']),
+    ('GENO', ['geno', 'coriell', 'monarch', 'mmrrc', '', 'bnode'])
+]
+
+# memo table of classified prefixes: {prefix: semantic group}
+_prefix2semantic_dct = dict()
+
 
 # CHECK NETWORK SCHEMA AND NORMALIZE TO GRAPH SCHEMA
 # check network schema
@@ -68,34 +115,157 @@ def read_connections(filename):
 
 # retrieve subnetwork from Monarch knowledge graph
 
-def hit_monarch_api(node = 'HGNC:17646', rows = 2000):
+def get_session():
+    """
+    This function returns the HTTP session of the running worker thread. Every worker keeps its own pooled \
+    session, so connections to the BioLink API are reused across the nodes the worker queries.
+    :return: requests session object
+    """
+
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+
+    return session
+
+
+class CachedResponse(object):
+    """
+    BioLink API response served from the cache.
+    """
+
+    def __init__(self, text):
+        """
+        Constructor
+        :param text: response body string
+        """
+
+        self.text = text
+        self.status_code = 200
+
+    def json(self):
+        """
+        This method returns the JSON-decoded response body.
+        :return: response dictionary
+        """
+
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        """
+        This method does nothing, only successful responses are cached.
+        :return: None object
+        """
+
+        pass
+
+
+def get_cache():
+    """
+    This function returns the BioLink responses cache, creating it at the 'cache_path' module variable the \
+    first time it is used.
+    :return: cache object or None if the 'use_cache' module variable is False
+    """
+
+    global _cache
+    if not use_cache:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = cache.Cache(cache_path, ttl=cache_ttl, max_size=cache_max_size)
+
+    return _cache
+
+
+def get_biolink_response(endpoint, node, parameters, http=requests):
+    """
+    This function returns the response of a BioLink association endpoint for a node. The response is served \
+    from the cache when it was retrieved before, otherwise it is requested to the API through the 'biolink' \
+    scheduler, which throttles and retries the request, and successful responses are cached.
+    :param endpoint: BioLink association endpoint string: 'from' or 'to'
+    :param node: node id to query string
+    :param parameters: query parameters dictionary
+    :param http: requests module or session object. Default: requests module.
+    :return: api response object
+    """
+
+    requests_scheduler = scheduler.get_scheduler('biolink')
+    responses = get_cache()
+    if responses is None:
+        return requests_scheduler.call(http.get, '{}/{}/{}'.format(biolink, endpoint, node), params=parameters)
+
+    key = cache.get_key(biolink, endpoint, node, parameters)
+    text = responses.get(key)
+    if text is not None:
+        return CachedResponse(text)
+    r = requests_scheduler.call(http.get, '{}/{}/{}'.format(biolink, endpoint, node), params=parameters)
+    if r.status_code == 200:
+        responses.set(key, r.text)
+
+    return r
+
+
+def hit_monarch_api(node = 'HGNC:17646', rows = 2000, session = None):
     """
     This function performs api calls to Monarch to retrieve out and in edges from a query node.
     It retrieves entities plus associations via the BioLink API service.
     It hits two endpoints:
         * association/from - for out edges
         * association/to - for in edges
-    It returns out and in edges.
+    It returns out and in edges. Responses retrieved before are served from the cache.
+    It returns the first page of results only, use get_associations() to retrieve all of them.
 
     :param node: node id to query (string). Default: 'HGNC:17646'.
     :param rows: the maximum number of results to return (integer). Default: 2000.
+    :param session: requests session object to reuse connections. Default: None, i.e. one connection per call.
     :return: two api response objects: 'out' and 'in' response objects, in this order.
     """
-    
-    # api address
-    biolink = 'https://api.monarchinitiative.org/api/association'
-    
+
+    # http client
+    http = requests if session is None else session
+
     # parameters
     parameters = {'fl_excludes_evidence': False, 'rows': rows}
     # out edges: from/
-    r_out = requests.get('{}/from/{}'.format(biolink,node),params=parameters)
+    r_out = get_biolink_response('from', node, parameters, http)
 
     # in edges: to/
-    r_in = requests.get('{}/to/{}'.format(biolink,node),params=parameters)
+    r_in = get_biolink_response('to', node, parameters, http)
 
     return r_out, r_in
 
 
+def get_associations(node, endpoint, rows=None, session=None):
+    """
+    This function retrieves all the associations of a node from a BioLink association endpoint. It pages \
+    through the results with the 'start' and 'rows' parameters and yields associations one page at a time, \
+    so high-degree nodes are retrieved complete without holding all their responses in memory.
+    :param node: node id to query string
+    :param endpoint: BioLink association endpoint string: 'from' for out edges or 'to' for in edges
+    :param rows: the number of results per page (integer). Default: None, i.e. the 'page_size' module variable.
+    :param session: requests session object to reuse connections. Default: None, i.e. one connection per call.
+    :return: associations (dictionaries) generator
+    """
+
+    # http client
+    http = requests if session is None else session
+    rows = rows or page_size
+
+    start = 0
+    while True:
+        parameters = {'fl_excludes_evidence': False, 'rows': rows, 'start': start}
+        r = get_biolink_response(endpoint, node, parameters, http)
+        r.raise_for_status()
+        page = r.json()
+        associations = page['associations']
+        for association in associations:
+            yield association
+        start += len(associations)
+        if len(associations) < rows or start >= page.get('numFound', start):
+            break
+
+
 def get_edges_objects(r_out, r_in):
     """
     This function prepares the api object responses from Monarch.
@@ -103,8 +273,8 @@ def get_edges_objects(r_out, r_in):
     Subjects, relations and objects are lists of dictionaries, where each dictionary is a node.
     References list lists strings, where each string is a chain of references for each edge.
 
-    :param r_out: BioLink API 'out' response object
-    :param r_in: BioLink API 'in' response object
+    :param r_out: BioLink API 'out' response object, or 'out' associations generator from get_associations()
+    :param r_in: BioLink API 'in' response object, or 'in' associations generator from get_associations()
     :return: subjects, relations, objects and references lists (in this order)
     """
 
@@ -115,7 +285,9 @@ def get_edges_objects(r_out, r_in):
     ref_l = list()
 
     # compose list of dictionaries
-    for associations in [r_out.json()['associations'], r_in.json()['associations']]:
+    for associations in [r_out, r_in]:
+        if hasattr(associations, 'json'):
+            associations = associations.json()['associations']
         for association in associations:
             pub_l = list()
             sub_l.append(association['subject'])
@@ -196,15 +368,7 @@ def keep_nodes(keep, edges, seed):
         #    continue
         # if 'MONARCH' in (sub or obj):
         #    continue
-        if 'PMID' in sub or 'PMID' in obj:
-            continue
-        if rel == None:
-            rel = 'None'
-        if 'dc:source' in rel:
-            continue
-        if 'IAO:0000136' in rel:  # is about
-            continue
-        if 'IAO:0000142' in rel:  # mentions
+        if not is_biological_edge(sub, rel, obj):
             continue
         if sub not in seed:
             keep.add(sub)
@@ -214,33 +378,184 @@ def keep_nodes(keep, edges, seed):
     return keep
 
 
-def get_neighbours(seed):
+def is_biological_edge(sub, rel, obj):
     """
-    This function gets the first layer of neighbours and relations.
-    :param seed: query nodes list
-    :return: nodes set, edges set (in this order)
+    This function checks whether an edge is a biological relation, i.e. it does not link PMID nodes and it is \
+    not a provenance relation: None, 'dc:source', 'IAO:0000136' (is about) or 'IAO:0000142' (mentions).
+    :param sub: subject node id string
+    :param rel: relation id string or None
+    :param obj: object node id string
+    :return: boolean
     """
 
-    keepNodes = set()
-    keepEdges = set()
-    seedNodes = set(seed)
-    for node in tqdm(seedNodes):
+    if 'PMID' in sub or 'PMID' in obj:
+        return False
+    if rel == None:
+        rel = 'None'
+    if 'dc:source' in rel:
+        return False
+    if 'IAO:0000136' in rel:  # is about
+        return False
+    if 'IAO:0000142' in rel:  # mentions
+        return False
+
+    return True
+
+
+def _get_node_objects(node, rows):
+    """
+    This function retrieves the edges objects of a query node. It runs inside a worker thread, using the \
+    pooled session of the worker.
+    :param node: node id to query string
+    :param rows: the number of results per page (integer)
+    :return: subjects, relations, objects and references lists (in this order)
+    """
+
+    session = get_session()
+
+    return get_edges_objects(get_associations(node, 'from', rows, session),
+                             get_associations(node, 'to', rows, session))
+
+
+def fetch_edges_objects(nodes, rows=None, workers=None):
+    """
+    This function retrieves the edges objects of a list of query nodes concurrently. The BioLink API is hit \
+    by a pool of worker threads, and nodes are yielded as soon as they are retrieved, so the order of the \
+    results is not the order of the query nodes. Nodes without data are skipped, and nodes raising any other \
+    error, e.g. an HTTP error persisting after the scheduler retries, are printed and skipped.
+    :param nodes: query nodes list
+    :param rows: the number of results per page (integer). Default: None, i.e. the 'page_size' module variable.
+    :param workers: number of worker threads (integer). Default: None, i.e. the 'max_workers' module variable.
+    :return: generator of (node, (sub_l, rel_l, obj_l, ref_l)) tuples
+    """
+
+    workers = workers or max_workers
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_get_node_objects, node, rows): node for node in nodes}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            node = futures[future]
+            try:
+                objects = future.result()
+            except (ValueError, KeyError):
+                continue
+            except:
+                print('error: {}'.format(sys.exc_info()[0]))
+                print(node)
+                continue
+            yield node, objects
+
+    responses = get_cache()
+    if responses is not None:
+        print('* BioLink cache: {hits} hits, {misses} misses, {entries} entries'.format(**responses.stats()))
+    scheduler.print_stats('biolink')
+
+
+def fetch_edges(nodes, workers=None, journal=None):
+    """
+    This function retrieves the edges of a list of query nodes. Nodes recorded in the checkpoint journal are \
+    restored from it, the rest are retrieved concurrently and recorded.
+    :param nodes: query nodes set
+    :param workers: number of concurrent workers (integer). Default: None, i.e. the 'max_workers' module variable.
+    :param journal: checkpoint journal object to restore and record processed nodes. Default: None.
+    :return: generator of (node, edges set) tuples
+    """
+
+    # restore nodes processed in a previous run
+    queryNodes = nodes
+    if journal is not None:
+        restored = {node for node in nodes if node in journal}
+        for node in restored:
+            yield node, journal.get(node)
+        queryNodes = set(nodes) - restored
+        print('* Nodes restored from the checkpoint: {}'.format(len(restored)))
+
+    for node, (sub_l, rel_l, obj_l, ref_l) in fetch_edges_objects(queryNodes, workers=workers):
         try:
-            r_out, r_in = hit_monarch_api(node)
-            sub_l, rel_l, obj_l, ref_l = get_edges_objects(r_out, r_in)
             edges = get_edges(sub_l, rel_l, obj_l, ref_l, 'id')
-            keepEdges = keep_edges(keepEdges, edges)
-            keepNodes = keep_nodes(keepNodes, edges, seedNodes)
+            if journal is not None:
+                journal.record(node, edges)
 
         except (ValueError, KeyError):
-            pass
+            continue
         except:
             print('error: {}'.format(sys.exc_info()[0]))
             print(node)
+            continue
+        yield node, edges
+
+
+def get_neighbours(seed, workers=None, journal=None):
+    """
+    This function gets the first layer of neighbours and relations.
+    :param seed: query nodes list
+    :param workers: number of concurrent workers (integer). Default: None, i.e. the 'max_workers' module variable.
+    :param journal: checkpoint journal object to restore and record processed nodes. Default: None.
+    :return: nodes set, edges set (in this order)
+    """
+
+    keepNodes = set()
+    keepEdges = set()
+    seedNodes = set(seed)
+
+    for node, edges in fetch_edges(seedNodes, workers, journal):
+        keepEdges = keep_edges(keepEdges, edges)
+        keepNodes = keep_nodes(keepNodes, edges, seedNodes)
 
     return keepNodes, keepEdges
 
 
+def expand_frontier(seed, hops, max_frontier=None, workers=None, journal=None):
+    """
+    This function expands a subgraph from a list of query nodes hop by hop (breadth-first). At every hop the \
+    frontier nodes are retrieved and their biological edges are filtered by the hop filters. The nodes \
+    reached through the kept edges form the frontier of the next hop. Every node is retrieved once at most \
+    across hops, and the edges of every hop are yielded as soon as the hop is completed.
+    :param seed: query nodes list
+    :param hops: hop filters list, where a hop filter is a dictionary with the optional keys 'predicates', the \
+    relation ids to follow, and 'prefixes', the CURIE prefixes of the nodes to reach, e.g. the 'orthopheno_hops' \
+    module variable; or the number of hops without filters (integer)
+    :param max_frontier: maximum number of nodes to retrieve per hop (integer). Default: None, i.e. no limit. \
+    Capped frontiers keep the first nodes in id order.
+    :param workers: number of concurrent workers (integer). Default: None, i.e. the 'max_workers' module variable.
+    :param journal: checkpoint journal object to restore and record processed nodes. Default: None.
+    :return: generator of (hop number, reached nodes set, edges set) tuples
+    """
+
+    if isinstance(hops, int):
+        hops = [dict() for hop in range(hops)]
+
+    frontier = set(seed)
+    visited = set(frontier)
+    for hop, filters in enumerate(hops, 1):
+        predicates = filters.get('predicates')
+        prefixes = filters.get('prefixes')
+        if prefixes is not None:
+            prefixes = {prefix.lower() for prefix in prefixes}
+        print('\nHop {}: {} frontier nodes'.format(hop, len(frontier)))
+
+        reached = set()
+        hop_edges = set()
+        for node, edges in fetch_edges(frontier, workers, journal):
+            for (sub, rel, obj, ref) in edges:
+                if not is_biological_edge(sub, rel, obj):
+                    continue
+                if predicates is not None and rel not in predicates:
+                    continue
+                new = [n for n in (sub, obj) if n not in visited]
+                if prefixes is not None and any(n.split(':')[0].lower() not in prefixes for n in new):
+                    continue
+                hop_edges.add((sub, rel, obj, ref))
+                reached.update(new)
+        visited.update(reached)
+        yield hop, reached, hop_edges
+
+        # next frontier
+        frontier = reached
+        if max_frontier is not None and len(frontier) > max_frontier:
+            print('* Frontier capped from {} to {} nodes'.format(len(frontier), max_frontier))
+            frontier = set(sorted(frontier)[:max_frontier])
+
+
 def filter_edges(nodes, edges):
     """
     This function filters down edges with both nodes in a nodes list.
@@ -268,19 +583,24 @@ def add_attributes(sub_l, rel_l, obj_l, edges):
     :return: metaedges set
     """
 
+    # index: {(sub_id, rel_id, obj_id): first association position}
+    index = dict()
+    for i in range(len(sub_l)):
+        index.setdefault((sub_l[i]['id'], rel_l[i]['id'], obj_l[i]['id']), i)
+
     metaedges = set()
     for (sub_id, rel_id, obj_id, refs) in edges:
-        for i in range(len(sub_l)):
-            if sub_l[i]['id'] == sub_id and rel_l[i]['id'] == rel_id and obj_l[i]['id'] == obj_id:
-                metaedges.add((sub_l[i]['id'],
-                               sub_l[i]['label'],
-                               rel_l[i]['id'],
-                               rel_l[i]['label'],
-                               obj_l[i]['id'],
-                               obj_l[i]['label'],
-                               refs)
-                              )
-                break
+        i = index.get((sub_id, rel_id, obj_id))
+        if i is None:
+            continue
+        metaedges.add((sub_l[i]['id'],
+                       sub_l[i]['label'],
+                       rel_l[i]['id'],
+                       rel_l[i]['label'],
+                       obj_l[i]['id'],
+                       obj_l[i]['label'],
+                       refs)
+                      )
     return metaedges
 
 
@@ -312,22 +632,34 @@ def keep_node_type(edges, seed, nodeType='ortho'):
     return keep
 
 
-def get_connections(nodes):
+def get_connections(nodes, workers=None, journal=None):
     """
     This function returns associations retrieved from Monarch among a list of query nodes."
     :param nodes: the query nodes list
+    :param workers: number of concurrent workers (integer). Default: None, i.e. the 'max_workers' module variable.
+    :param journal: checkpoint journal object to restore and record processed nodes. Default: None.
     :return: edges set
     """""
 
     keep = set()
-    for node in tqdm(nodes):
+
+    # restore nodes processed in a previous run
+    queryNodes = nodes
+    if journal is not None:
+        restored = {node for node in nodes if node in journal}
+        for node in restored:
+            keep = keep_edges(keep, journal.get(node))
+        queryNodes = [node for node in nodes if node not in restored]
+        print('* Nodes restored from the checkpoint: {}'.format(len(restored)))
+
+    for node, (sub_l, rel_l, obj_l, ref_l) in fetch_edges_objects(queryNodes, workers=workers):
         try:
-            r_out, r_in = hit_monarch_api(node, 1000)
-            sub_l, rel_l, obj_l, ref_l = get_edges_objects(r_out, r_in)
             edges = get_edges(sub_l, rel_l, obj_l, ref_l, 'id')
             filteredEdges = filter_edges(nodes, edges)
             metaFilteredEdges = add_attributes(sub_l, rel_l, obj_l, filteredEdges)
             keep = keep_edges(keep, metaFilteredEdges)
+            if journal is not None:
+                journal.record(node, metaFilteredEdges)
 
         except (ValueError, KeyError):
             pass
@@ -340,45 +672,111 @@ def get_connections(nodes):
 
 # NETWORK MANAGEMENT FUNCTIONS
 
-def get_neighbours_list(seed_list):
+def open_journal(checkpoint_name):
+    """
+    This function opens the checkpoint journal of a retrieval run at the monarch/ directory.
+    :param checkpoint_name: checkpoint file name without extension string, e.g. 'neighbours', or None
+    :return: checkpoint journal object, or None if no checkpoint name is provided
+    """
+
+    if checkpoint_name is None:
+        return None
+    journal_path = '{}/{}.jsonl'.format(path, checkpoint_name)
+    print('\nCheckpoint journal at: {}'.format(journal_path))
+
+    return checkpoint.Journal(journal_path)
+
+
+def get_neighbours_list(seed_list, checkpoint_name=None):
     """
     This function returns the first explicit layer of neighbours from a list of query nodes.
     :param seed_list: biomedical entities list, where each entity is the identifier string like 'HGNC:17646'
+    :param checkpoint_name: checkpoint file name without extension string, e.g. 'neighbours'. Default: None, \
+    i.e. no checkpoint.
     :return: neighbours list
     """
 
     # print executing function
     print('\nThe function "get_neighbours_list()" is running. Its runtime may take some minutes. '
           'If you interrupt the process, you will lose all the nodes retrieved '
-          'and you should start over the execution of this function.')
+          'and you should start over the execution of this function, '
+          'unless you set a checkpoint with the "checkpoint_name" argument.')
 
     # get first layer of neighbour nodes
-    neighbours, relations = get_neighbours(seed_list)
+    journal = open_journal(checkpoint_name)
+    try:
+        neighbours, relations = get_neighbours(seed_list, journal=journal)
+    finally:
+        if journal is not None: journal.close()
     print('\nFinished get_neighbours_list().\n')
 
     return list(neighbours)
 
 
-def get_orthopheno_list(seed_list):
+def get_frontier_edges(seed_list, hops, max_frontier=None, checkpoint_name=None):
+    """
+    This function returns the subgraph expanded from a list of query nodes by the hops of the frontier \
+    expansion, e.g. monarch.get_frontier_edges(seed_list, monarch.orthopheno_hops).
+    :param seed_list: biomedical entities list, where each entity is the identifier string like 'HGNC:17646'
+    :param hops: hop filters list or number of hops (integer), see expand_frontier()
+    :param max_frontier: maximum number of nodes to retrieve per hop (integer). Default: None, i.e. no limit.
+    :param checkpoint_name: checkpoint file name without extension string, e.g. 'frontier'. Default: None, \
+    i.e. no checkpoint.
+    :return: nodes list, edges set (in this order)
+    """
+
+    # print executing function
+    print('\nThe function "get_frontier_edges()" is running. Its runtime may take some hours. '
+          'If you interrupt the process, you will lose all the nodes retrieved '
+          'and you should start over the execution of this function, '
+          'unless you set a checkpoint with the "checkpoint_name" argument.')
+
+    nodes = set(seed_list)
+    edges = set()
+    journal = open_journal(checkpoint_name)
+    try:
+        for hop, reached, hop_edges in expand_frontier(seed_list, hops, max_frontier, journal=journal):
+            print('* Hop {}: {} nodes reached, {} edges'.format(hop, len(reached), len(hop_edges)))
+            nodes.update(reached)
+            edges.update(hop_edges)
+    finally:
+        if journal is not None: journal.close()
+    print('\nFinished get_frontier_edges().\n')
+
+    return list(nodes), edges
+
+
+def get_orthopheno_list(seed_list, checkpoint_name=None):
     """
     This function returns orthologs-phenotypes nodes in ortho-pheno relationships for a list of query genes.
     :param seed_list: gene list, where each gene is the identifier string like 'HGNC:17646'
+    :param checkpoint_name: checkpoint file name without extension string, e.g. 'orthopheno'. Default: None, \
+    i.e. no checkpoint. Each layer is journaled in its own file with the '_orthologs' and '_phenotypes' suffixes.
     :return: orthopheno list
     """
 
     # print executing function
     print('\nThe function "get_orthopheno_list()" is running. Its runtime may take some hours. '
           'If you interrupt the process, you will lose all the nodes retrieved '
-          'and you should start over the execution of this function.')
+          'and you should start over the execution of this function, '
+          'unless you set a checkpoint with the "checkpoint_name" argument.')
 
     # get first layer of neighbour nodes
-    neighbours, relations = get_neighbours(seed_list)
+    journal = open_journal(None if checkpoint_name is None else checkpoint_name + '_orthologs')
+    try:
+        neighbours, relations = get_neighbours(seed_list, journal=journal)
+    finally:
+        if journal is not None: journal.close()
 
     # keep orthologs in the first layer
     orthologs = keep_node_type(relations, seed_list)
 
     # get second layer from orthologs
-    neighbours, relations = get_neighbours(orthologs)
+    journal = open_journal(None if checkpoint_name is None else checkpoint_name + '_phenotypes')
+    try:
+        neighbours, relations = get_neighbours(orthologs, journal=journal)
+    finally:
+        if journal is not None: journal.close()
 
     # keep phenotypes in the second layer
     phenotypes = keep_node_type(relations, orthologs, 'pheno')
@@ -390,24 +788,31 @@ def get_orthopheno_list(seed_list):
     return list(nodes)
 
 
-def extract_edges(gene_list):
+def extract_edges(gene_list, checkpoint_name=None):
     """
     This function returns the Monarch network from a list of query nodes. It retrieves connectivity from Monarch, i.e. \
     edges from Monarch between query nodes.
     :param gene_list: gene list
+    :param checkpoint_name: checkpoint file name without extension string, e.g. 'connections'. Default: None, \
+    i.e. no checkpoint.
     :return: edges (as tuples) set
     """
 
     # print executing function
     print('\nThe function "extract_edges()" is running. Its runtime may take some hours. '
           'If you interrupt the process, you will lose all the edges retrieved '
-          'and you should start over the execution of this function.')
+          'and you should start over the execution of this function, '
+          'unless you set a checkpoint with the "checkpoint_name" argument.')
 
     # set network nodes: gene list provided by the user
     nodes = set(gene_list)
 
     # get connections
-    network = get_connections(nodes)
+    journal = open_journal(checkpoint_name)
+    try:
+        network = get_connections(nodes, journal=journal)
+    finally:
+        if journal is not None: journal.close()
     print('\nFinished extract_edges(). To save the retrieved Monarch edges use the function "print_network()".\n')
 
     return network
@@ -525,6 +930,84 @@ def orthopheno_expand_edges(seed_list):
 
 # BUILD NETWORK
 
+def fill_na(column):
+    """
+    This function replaces null values, i.e. None, NaN or 'nan' strings, with 'NA' in a dataframe column.
+    :param column: pandas series
+    :return: pandas series
+    """
+
+    return column.where(column.notna() & (column.astype(object) != 'nan'), 'NA')
+
+
+def expand_references(ref_s, uriPrefixes_dct, dbPrefixes_dct, warned=None):
+    """
+    This function expands a Monarch reference_id_list string, i.e. references separated by '|', into a \
+    reference_uri_list string. Database references are translated through the database prefixes dictionary, \
+    CURIEs through the URI prefixes dictionary, and PubMed IDs are joined into one multi-term PubMed URL. \
+    Unknown prefixes are reported once and kept as they are.
+    :param ref_s: reference_id_list string
+    :param uriPrefixes_dct: URI prefixes dictionary
+    :param dbPrefixes_dct: database prefixes dictionary
+    :param warned: set of unknown prefixes already reported, updated in place. Default: None.
+    :return: reference_uri_list string
+    """
+
+    warned = set() if warned is None else warned
+    ref_uri_l = list()
+    pmid_l = list()
+    # reference_id list iteration
+    for ref in ref_s.strip().split('|'):
+        # NA or database
+        if ':' not in ref:
+            ref_uri = dbPrefixes_dct.get(ref.lower())
+            if ref_uri is None:
+                ref_uri = ref
+                if ref not in warned:
+                    warned.add(ref)
+                    print("Warning:")
+                    print('Detected a new reference database in Monarch not yet implemented in this module. '
+                          'The new source should be added to the dictionary of databases.'
+                          'Otherwise, the source CURIE cannot be translated to the corresponding URI.')
+                    print("In the build_edges() method, update 'dbPrefixes_dct' dictionary with '{}'".format(ref))
+                    print('The method will continue to run without problem, writing the CURIE instead of the URI,'
+                          'until the dictionary is updated.')
+            ref_uri_l.append(ref_uri)
+        # publication uri: pubmed_id or url
+        else:
+            pref, uriId = ref.split(':', 1)
+            # separate pmid from non pmid and detect:
+            # pubmed_id
+            if ref.startswith('PMID'):
+                pmid_l.append(uriId)
+            # url
+            elif ref.lower().startswith('http'):
+                ref_uri_l.append(ref)
+            else:
+                ref_uri = uriPrefixes_dct.get(pref.lower())
+                if ref_uri is None:
+                    ref_uri = ref
+                    if pref not in warned:
+                        warned.add(pref)
+                        print("Warning:")
+                        print('Detected a new reference source in Monarch not yet implemented in this module. '
+                              'The new source should be added to the dictionary of sources.'
+                              'Otherwise, the source CURIE cannot be translated to the corresponding URI.')
+                        print("In the build_edges() method, update 'uriPrefixes_dct' dictionary with '{}'".format(pref))
+                        print('The method will continue to run without problem, writing the CURIE instead of the URI,'
+                              'until the dictionary is updated.')
+                else:
+                    ref_uri = ref_uri + uriId
+                ref_uri_l.append(ref_uri)
+    # create multi-term pubmed url
+    if len(pmid_l):
+        pmid_s = ','.join(pmid_l)
+        ref_uri = uriPrefixes_dct['pmid'] + pmid_s
+        ref_uri_l.append(ref_uri)
+
+    return '|'.join(ref_uri_l)
+
+
 def build_edges(edges_df):
     """
     This function builds the edges network with the graph schema.
@@ -536,20 +1019,9 @@ def build_edges(edges_df):
     ## variables
     # if edges_df is not a df, it is a set of tuples, then convert to a df
     if isinstance(edges_df, set):
-        connections_l = list()
-        for tuple in edges_df:
-            record = dict()
-            record['subject_id'] = tuple[0]
-            record['subject_label'] = tuple[1]
-            record['relation_id'] = tuple[2]
-            record['relation_label'] = tuple[3]
-            record['object_id'] = tuple[4]
-            record['object_label'] = tuple[5]
-            record['reference_id_list'] = tuple[6]
-            connections_l.append(record)
-
-        edges_df = pd.DataFrame(connections_l)
-
+        edges_df = pd.DataFrame(list(edges_df), columns=['subject_id', 'subject_label', 'relation_id',
+                                                         'relation_label', 'object_id', 'object_label',
+                                                         'reference_id_list'])
 
     # generate static variable: uriPrefixes_dct (url references)
     uriPrefixes_dct = {
@@ -597,109 +1069,74 @@ def build_edges(edges_df):
 
 
     ## build graph schema network edges data structure and save edges file
-    #csv_path = '/home/nuria/workspace/ngly1-graph/regulation/graph/monarch_connections_regulation_graph.tsv'
-    #csv_path = '/home/nuria/workspace/ngly1-graph/monarch/1shell-animal/get-monarch-connections/monarch_connections.tsv'
-    # edges_df = pd.read_table('./get-monarch-connections/monarch_connections.tsv')
-    # prepare dataframe = [ {} ... {} ], where every row = {} = concept
-    edges_l = list()
-    for edge in edges_df.itertuples():
-        # edge or row is a tuple (named and ordered attributes)
-        #print("edge_tuple:", edge)
-        # edge.reference_id_list >> can be 1) np.nan (float type) or 2) str without "|" 3) str with "|"
-        ref_s = str(edge.reference_id_list)
-
-        # prepare reference_uri_list attribute
-        ref_uri_l = list()
-        # expand to uri or NA
-        pmid_l = list()
-        # reference_id list iteration
-        for ref in ref_s.strip().split('|'):
-            # NA or database
-            if ':' not in ref:
-                try:
-                    ref_uri = dbPrefixes_dct[ref.lower()]
-                except KeyError:
-                    print("Warning:")
-                    print('Detected a new reference database in Monarch not yet implemented in this module. '
-                          'The new source should be added to the dictionary of databases.'
-                          'Otherwise, the source CURIE cannot be translated to the corresponding URI.')
-                    print("In the build_edges() method, update 'dbPrefixes_dct' dictionary with '{}'".format(ref))
-                    print('The edge that includes this new reference database is {}'.format(edge))
-                    print('The method will continue to run without problem, writing the CURIE instead of the URI,'
-                          'until the dictionary is updated.')
-                ref_uri_l.append(ref_uri)
-            # publication uri: pubmed_id or url
-            else:
-                pref, uriId = ref.split(':')
-                # separate pmid from non pmid and detect:
-                # pubmed_id
-                if ref.startswith('PMID'):
-                    pmid_l.append(uriId)
-                # url
-                elif ref.lower().startswith('http'):
-                    ref_uri_l.append(ref)
-                else:
-                    try:
-                        ref_uri = uriPrefixes_dct[pref.lower()] + uriId
-                    except KeyError:
-                        print("Warning:")
-                        print('Detected a new reference source in Monarch not yet implemented in this module. '
-                              'The new source should be added to the dictionary of sources.'
-                              'Otherwise, the source CURIE cannot be translated to the corresponding URI.')
-                        print("In the build_edges() method, update 'uriPrefixes_dct' dictionary with '{}'".format(pref))
-                        print('The edge that includes this new reference source is {}'.format(edge))
-                        print('The method will continue to run without problem, writing the CURIE instead of the URI,'
-                              'until the dictionary is updated.')
-                    ref_uri_l.append(ref_uri)
-        # create multi-term pubmed url
-        if len(pmid_l):
-            pmid_s = ','.join(pmid_l)
-            ref_uri = uriPrefixes_dct['pmid'] + pmid_s
-            ref_uri_l.append(ref_uri)
-        ref_uri_list = '|'.join(ref_uri_l)
-
-        # prepare edge attributes: sub_id, obj_id, rel_id, rel_label, rel_def, rel_iri
-        sub_id = 'NA' if edge.subject_id is None or str(edge.subject_id) == 'nan' else edge.subject_id
-        rel_id = 'NA' if edge.relation_id is None or str(edge.relation_id) == 'nan' else edge.relation_id
-        obj_id = 'NA' if edge.object_id is None or str(edge.object_id) == 'nan' else edge.object_id
-        rel_label = 'NA' if edge.relation_label is None or str(edge.relation_label) == 'nan' else edge.relation_label
-        rel_def = 'NA'
-        if ':' in rel_id:
-            rel_iri = 'http://purl.obolibrary.org/obo/' + rel_id.replace(':', '_')
-        else:
-            rel_iri = rel_id
-
-        # build the data structure = list of edges as list of dict, where a dict is an edge
-        edge = dict()
-        edge['subject_id'] = sub_id
-        edge['object_id'] = obj_id
-        edge['property_id'] = rel_id
-        edge['property_label'] = rel_label
-        edge['property_description'] = rel_def
-        edge['property_uri'] = rel_iri
-        edge['reference_uri'] = ref_uri_list
-        edge['reference_supporting_text'] = ref_text
-        edge['reference_date'] = ref_date
-        edges_l.append(edge)
+    # expand reference_id_list to reference_uri_list: once per distinct reference_id_list
+    # reference_id_list >> can be 1) np.nan (float type) or 2) str without "|" 3) str with "|"
+    ref_s = edges_df.reference_id_list.map(str)
+    warned = set()
+    ref_uri_dct = {refs: expand_references(refs, uriPrefixes_dct, dbPrefixes_dct, warned) for refs in ref_s.unique()}
+
+    # prepare edge attributes: sub_id, obj_id, rel_id, rel_label, rel_def, rel_iri
+    rel_id = fill_na(edges_df.relation_id)
+    has_curie = rel_id.str.contains(':', regex=False)
+    rel_iri = rel_id.where(~has_curie, 'http://purl.obolibrary.org/obo/' + rel_id.str.replace(':', '_', regex=False))
+
+    # build the data structure = dataframe of edges, where a row is an edge
+    edges = pd.DataFrame({
+        'subject_id': fill_na(edges_df.subject_id),
+        'object_id': fill_na(edges_df.object_id),
+        'property_id': rel_id,
+        'property_label': fill_na(edges_df.relation_label),
+        'property_description': 'NA',
+        'property_uri': rel_iri,
+        'reference_uri': ref_s.map(ref_uri_dct),
+        'reference_supporting_text': ref_text,
+        'reference_date': ref_date
+    }, index=edges_df.index)
+    # list of edges as list of dict, where a dict is an edge
+    attributes = edges.columns.tolist()
+    edges_l = [dict(zip(attributes, edge)) for edge in zip(*(edges[col].tolist() for col in attributes))]
 
     # save edges file
     #TODO: abstract this function
-    df = pd.DataFrame(edges_l)
+    df = edges
     print('df',df.shape)
     df = df[['subject_id', 'property_id', 'object_id', 'reference_uri', 'reference_supporting_text', 'reference_date', \
              'property_label', 'property_description', 'property_uri']]
-    df.fillna('NA').to_csv('{}/monarch_edges_v{}.csv'.format(path,today), index=False)
+    table_path = storage.save_table(df, '{}/monarch_edges_v{}'.format(path,today))
 
     # print info
-    print('\n* This is the size of the edges file data structure: {}'.format(pd.DataFrame(edges_l).shape))
-    print('* These are the edges attributes: {}'.format(pd.DataFrame(edges_l).columns))
-    print('* This is the first record:\n{}'.format(pd.DataFrame(edges_l).head(1)))
-    print('\nThe Monarch network edges are built and saved at: {}/monarch_edges_v{}.csv\n'.format(path,today))
+    print('\n* This is the size of the edges file data structure: {}'.format(edges.shape))
+    print('* These are the edges attributes: {}'.format(edges.columns))
+    print('* This is the first record:\n{}'.format(edges.head(1)))
+    print('\nThe Monarch network edges are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_edges().\n')
 
     return edges_l
 
 
+def get_semantic_group(prefix):
+    """
+    This function classifies a node CURIE prefix into a semantic group following the 'semantic_groups' rules. \
+    Classified prefixes are memoized.
+    :param prefix: CURIE prefix string, e.g. 'HGNC'
+    :return: semantic group string
+    """
+
+    prefix = prefix.lower()
+    try:
+        return _prefix2semantic_dct[prefix]
+    except KeyError:
+        pass
+    semantic_group = 'CONC'
+    for group, keywords in semantic_groups:
+        if any(keyword in prefix for keyword in keywords):
+            semantic_group = group
+            break
+    _prefix2semantic_dct[prefix] = semantic_group
+
+    return semantic_group
+
+
 def build_nodes(edges_df):
     """
     This function builds the nodes network with the graph schema.
@@ -708,115 +1145,42 @@ def build_nodes(edges_df):
     """
 
     print('\nThe function "build_nodes()" is running...')
-    # build semantic groups dictionary
-    # collide concepts in a concept dict
-    concept_dct = dict()
-    # read edges from input file
-    #header = 1
-    ##for row in open('../monarch/1shell-animal-hgnc/get-monarch-connections/monarch_connections.tsv').readlines():
-    ##csv_path = '/home/nuria/workspace/ngly1-graph/regulation/graph/monarch_connections_regulation_graph.tsv'
-    #csv_path = '/home/nuria/workspace/ngly1-graph/monarch/1shell-animal/get-monarch-connections/monarch_connections.tsv'
-    #for row in open('{}'.format(csv_path)).readlines():
-    #    if header:
-    #        header = 0
-    #        continue
     # read edges from variable
     # if edges_df is not a df, it is a set of tuples, then convert to a df
     if isinstance(edges_df, set):
-        connections_l = list()
-        for tuple in edges_df:
-            record = dict()
-            record['subject_id'] = tuple[0]
-            record['subject_label'] = tuple[1]
-            record['relation_id'] = tuple[2]
-            record['relation_label'] = tuple[3]
-            record['object_id'] = tuple[4]
-            record['object_label'] = tuple[5]
-            record['reference_id_list'] = tuple[6]
-            connections_l.append(record)
-
-        edges_df = pd.DataFrame(connections_l)
-
-    for edge in edges_df.itertuples():
-        #fields = row.strip('\n').split('\t')
-        #fields = list(edge_tuple)
-        sid = edge.subject_id #fields[0]
-        oid = edge.object_id #fields[4]
-        concept_dct[sid] = {}
-        concept_dct[oid] = {}
-    print('Number of concepts: {}'.format(len(concept_dct.keys())))
-
-    # list of concept prefixes with dict
-    conceptPrefix_dct = dict()
-    for concept in concept_dct:
-        conceptPrefix_dct[concept.split(':')[0]] = 1
-    print('Number of nodes CURIEs: {}'.format(len(conceptPrefix_dct.keys())))
-    print('List of nodes CURIEs: {}'.format(conceptPrefix_dct.keys()))
+        edges_df = pd.DataFrame(list(edges_df), columns=['subject_id', 'subject_label', 'relation_id',
+                                                         'relation_label', 'object_id', 'object_label',
+                                                         'reference_id_list'])
+
+    # build concept attributes: id integration of sub and obj IDs in a common data structure
+    # concepts are ordered by first appearance, sub before obj in every edge, and labelled by their last appearance
+    concepts = pd.DataFrame({
+        'id': np.column_stack((edges_df.subject_id.to_numpy(dtype=object),
+                               edges_df.object_id.to_numpy(dtype=object))).ravel(),
+        'preflabel': np.column_stack((edges_df.subject_label.to_numpy(dtype=object),
+                                      edges_df.object_label.to_numpy(dtype=object))).ravel()
+    })
+    id_l = pd.unique(concepts.id).tolist()
+    id2label = concepts.drop_duplicates('id', keep='last').set_index('id').preflabel
+    preflabel_l = id2label.reindex(id_l).tolist()
+    print('Number of concepts: {}'.format(len(id_l)))
 
     # build conceptPrefix2semantic dict
-    conceptPrefix2semantic_dct = dict()
-    for prefix in conceptPrefix_dct:
-        prefix = prefix.lower()
-        if 'variant' in prefix:
-            conceptPrefix2semantic_dct[prefix] = 'VARI'
-        elif 'phenotype' in prefix or 'mondo' in prefix or 'omim' in prefix or 'doid' in prefix or 'mesh' in prefix or 'hp' in prefix or 'mp' in prefix or 'fbcv' in prefix or 'fbbt' in prefix or 'zp' in prefix or 'apo' in prefix or 'trait' in prefix:
-            conceptPrefix2semantic_dct[prefix] = 'DISO'
-        elif 'gene' in prefix or 'hgnc' in prefix or 'ensembl' in prefix or 'mgi' in prefix or 'flybase' in prefix or 'wormbase' in prefix or 'xenbase' in prefix or 'zfin' in prefix or 'rgd' in prefix or 'sgd' in prefix:
-            conceptPrefix2semantic_dct[prefix] = 'GENE'
-        elif 'react' in prefix or 'kegg-path' in prefix or 'go' in prefix:
-            conceptPrefix2semantic_dct[prefix] = 'PHYS'
-        elif 'uberon' in prefix or 'cl' in prefix:
-            conceptPrefix2semantic_dct[prefix] = 'ANAT'
-        elif 'geno' in prefix or 'coriell' in prefix or 'monarch' in prefix or 'mmrrc' in prefix or '' in prefix \
-                or 'bnode' in prefix:
-            conceptPrefix2semantic_dct[prefix] = 'GENO'
-        else:
-            conceptPrefix2semantic_dct[prefix] = 'CONC'
-
-    # build concept attributes dict: id integration of sub and obj IDs in a common data structure
-    concept_dct = dict()
-    # read edges from file
-    #header = 1
-    ##for row in open('../monarch/1shell-animal-hgnc/get-monarch-connections/monarch_connections.tsv').readlines():
-    #for row in open('{}'.format(csv_path)).readlines():
-    #    if header:
-    #        header = 0
-    #        continue
-    #    fields = row.strip('\n').split('\t')
-    # read edges from variable
-    for edge in edges_df.itertuples():
-        #fields = list(edge_tuple)
-        # id: integration of sub and obj IDs in a unique data structure
-        sid = edge.subject_id #fields[0]
-        slab = edge.subject_label #fields[1]
-        oid = edge.object_id #fields[4]
-        olab = edge.object_label #fields[5]
-        # build the concept data structure
-        concept_dct[sid] = {'preflabel': slab,
-                            'semantic_groups': conceptPrefix2semantic_dct.get(sid.split(':')[0].lower(), 'CONC'),
-                            'synonyms': 'NA', 'description': 'NA'}
-        concept_dct[oid] = {'preflabel': olab,
-                            'semantic_groups': conceptPrefix2semantic_dct.get(oid.split(':')[0].lower(), 'CONC'),
-                            'synonyms': 'NA', 'description': 'NA'}
+    prefix_l = [concept.split(':')[0] for concept in id_l]
+    conceptPrefix2semantic_dct = {prefix: get_semantic_group(prefix) for prefix in dict.fromkeys(prefix_l)}
+    print('Number of nodes CURIEs: {}'.format(len(conceptPrefix2semantic_dct.keys())))
+    print('List of nodes CURIEs: {}'.format(conceptPrefix2semantic_dct.keys()))
+    semantic_l = [conceptPrefix2semantic_dct[prefix] for prefix in prefix_l]
 
     # build graph schema network nodes data structure and save nodes file
     # biothings: annotate name,synonyms,description to genes
     print('\nAdding BioThings annotation: gene name, synonyms, description...')
     # input: (preflabel) symbol,alias
-    symbols = list()
-    for concept in concept_dct:
-        if isinstance(concept_dct[concept]['semantic_groups'], list):
-            for label in concept_dct[concept]['semantic_groups']:
-                if 'GENE' in label:
-                    symbols.append(concept_dct[concept]['preflabel'])
-        else:
-            if 'GENE' in concept_dct[concept]['semantic_groups']:
-                symbols.append(concept_dct[concept]['preflabel'])
+    symbols = [preflabel for preflabel, semantic in zip(preflabel_l, semantic_l) if 'GENE' in semantic]
     print('symbols:', len(symbols))
 
     # query biothings
-    mg = get_client('gene')
-    df = mg.querymany(symbols, scopes='symbol,alias', fields='name,alias,summary', size=1, as_dataframe=True)
+    df = idmapping.querymany(symbols, scopes='symbol,alias', fields='name,alias,summary', size=1, as_dataframe=True)
 
     # dictionary: {symbol:name}
     ids = (df.reset_index().rename(columns={'query': 'symbol'}))
@@ -827,33 +1191,29 @@ def build_nodes(edges_df):
     monarch_s2d = dict(zip(ids.symbol, ids.description))
 
     # prepare data structure = [ {} ... {} ], where every {} = concept = row
-    nodes_l = list()
-    for concept in concept_dct:
-        # define nodes (rows) for the data structure
-        preflabel = concept_dct[concept]['preflabel']
-        concept_dct[concept]['synonyms'] = monarch_s2s[preflabel] if preflabel in monarch_s2s.keys() else 'NA'
-        node = dict()
-        node['id'] = concept
-        node['semantic_groups'] = concept_dct[concept]['semantic_groups']
-        node['preflabel'] = preflabel
-        node['name'] = monarch_s2n[preflabel] if preflabel in monarch_s2n.keys() else preflabel
-        node['synonyms'] = '|'.join(list(concept_dct[concept]['synonyms'])) if isinstance(
-            concept_dct[concept]['synonyms'], list) else concept_dct[concept]['synonyms']
-        node['description'] = monarch_s2d[preflabel] if preflabel in monarch_s2d.keys() else 'NA'
-        nodes_l.append(node)
+    synonyms_l = [monarch_s2s.get(preflabel, 'NA') for preflabel in preflabel_l]
+    nodes = {
+        'id': id_l,
+        'semantic_groups': semantic_l,
+        'preflabel': preflabel_l,
+        'name': [monarch_s2n.get(preflabel, preflabel) for preflabel in preflabel_l],
+        'synonyms': ['|'.join(synonyms) if isinstance(synonyms, list) else synonyms for synonyms in synonyms_l],
+        'description': [monarch_s2d.get(preflabel, 'NA') for preflabel in preflabel_l]
+    }
+    nodes_l = [dict(zip(nodes.keys(), node)) for node in zip(*nodes.values())]
 
     # save nodes file
     #TODO: abstract the print function
-    df = pd.DataFrame(nodes_l)
-    df = df[['id', 'semantic_groups', 'preflabel', 'synonyms', 'description', 'name']]
+    nodes = pd.DataFrame(nodes)
+    df = nodes[['id', 'semantic_groups', 'preflabel', 'synonyms', 'description', 'name']]
     #TODO: check why i am saving as csv but naming the file tsv
-    df.fillna('NA').to_csv('{}/monarch_nodes_v{}.csv'.format(path,today), index=False)
+    table_path = storage.save_table(df, '{}/monarch_nodes_v{}'.format(path,today))
 
     # print info
-    print('\n* This is the size of the nodes file data structure: {}'.format(pd.DataFrame(nodes_l).shape))
-    print('* These are the nodes attributes: {}'.format(pd.DataFrame(nodes_l).columns))
-    print('* This is the first record:\n{}'.format(pd.DataFrame(nodes_l).head(1)))
-    print('\nThe Monarch network nodes are built and saved at: {}/monarch_nodes_v{}.csv\n'.format(path,today))
+    print('\n* This is the size of the nodes file data structure: {}'.format(nodes.shape))
+    print('* These are the nodes attributes: {}'.format(nodes.columns))
+    print('* This is the first record:\n{}'.format(nodes.head(1)))
+    print('\nThe Monarch network nodes are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_nodes().\n')
 
     return nodes_l
@@ -30,9 +30,11 @@
 
 import datetime
 import os, sys
+import shutil
 import subprocess
 import re
 import time
+import storage
 from utils import *
 
 # VARIABLES
@@ -60,19 +62,17 @@ def save_neo4j_files(object, neo4j_path, file_type = 'statements'):
     path_to_version = neo4j_path + '/import/ngly1/' + graph_version
     for dir in path_to_import, path_to_version:
         if not os.path.isdir(dir): os.makedirs(dir)
-    # save filling null and with sep=','
+    # save filling null and with sep=',', once and copied to the version directory
     if file_type == 'statements':
-        object.to_csv('{}/ngly1_statements.csv'.format(path_to_import),
-                          index=False, na_rep='NA')
-        object.to_csv('{}/ngly1_statements.csv'.format(path_to_version),
-                          index=False, na_rep='NA')
+        storage.save_csv(object, '{}/ngly1_statements.csv'.format(path_to_import), na_rep='NA')
+        shutil.copyfile('{}/ngly1_statements.csv'.format(path_to_import),
+                        '{}/ngly1_statements.csv'.format(path_to_version))
         # object.fillna('NA').to_csv('{}/ngly1_statements_v{}.csv'.format(path,today), index=False)
         return print("\nFile '{}/ngly1_statements.csv' saved.".format(path_to_import))
     elif file_type == 'concepts':
-        object.to_csv('{}/ngly1_concepts.csv'.format(path_to_import),
-                        index=False, na_rep='NA')
-        object.to_csv('{}/ngly1_concepts.csv'.format(path_to_version),
-                    index=False, na_rep='NA')
+        storage.save_csv(object, '{}/ngly1_concepts.csv'.format(path_to_import), na_rep='NA')
+        shutil.copyfile('{}/ngly1_concepts.csv'.format(path_to_import),
+                        '{}/ngly1_concepts.csv'.format(path_to_version))
         # object.fillna('NA').to_csv('{}/ngly1_concepts_v{}.csv'.format(path, today), index=False)
         return print("\nFile '{}/ngly1_concepts.csv' saved.".format(path_to_import))
     else:
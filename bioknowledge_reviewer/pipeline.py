@@ -0,0 +1,538 @@
+# @name: pipeline.py
+# @description: Module for the incremental build of the review graph with a content-addressed stage cache
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Module for the incremental graph build pipeline"""
+
+import os
+import time
+import json
+import pickle
+import hashlib
+import inspect
+from collections import OrderedDict
+import pandas as pd
+import cache
+import curation
+import monarch
+import transcriptomics
+import regulation
+import graph
+import neo4jlib
+import idmapping
+import storage
+import utils
+
+
+# VARIABLES
+# path to write data
+path = os.getcwd() + '/pipeline'
+
+# stage outputs, stored as pickle files named by the content address of the output (see get_output_key()), and \
+# the stage fingerprints index
+cache_path = path + '/cache'
+
+# Monarch network attributes, see monarch.extract_edges()
+monarch_columns = ['subject_id', 'subject_label', 'relation_id', 'relation_label', 'object_id', 'object_label',
+                   'reference_id_list']
+
+
+# FUNCTIONS
+
+def get_path_key(filepath):
+    """
+    This function returns the content address of a file or a directory, i.e. the SHA-1 digest of the file bytes, \
+    or of the relative paths and the content addresses of all the files in the directory.
+    :param filepath: path to the file or directory string
+    :return: key string, or None if the path does not exist
+    """
+
+    if os.path.isfile(filepath):
+        return cache.get_file_key(filepath)
+    if not os.path.isdir(filepath):
+        return None
+    keys = list()
+    for root, dirs, files in os.walk(filepath):
+        dirs.sort()
+        for filename in sorted(files):
+            file_path = os.path.join(root, filename)
+            keys.append((os.path.relpath(file_path, filepath), cache.get_file_key(file_path)))
+
+    return cache.get_key(keys)
+
+
+def get_value_key(value):
+    """
+    This function returns the content address of a stage argument value. JSON serializable values are keyed by \
+    their JSON serialization, other values, e.g. dataframes, by their pickle.
+    :param value: argument value
+    :return: key string
+    """
+
+    try:
+        data = json.dumps(value, sort_keys=True).encode('utf-8')
+    except TypeError:
+        data = pickle.dumps(value, protocol=4)
+
+    return hashlib.sha1(data).hexdigest()
+
+
+def get_code_key(code):
+    """
+    This function returns the content address of the source code of a stage.
+    :param code: modules, functions or paths to source files list
+    :return: key string
+    """
+
+    keys = list()
+    for item in code:
+        filepath = item if isinstance(item, str) else inspect.getsourcefile(item)
+        keys.append((os.path.basename(filepath), get_path_key(filepath)))
+
+    return cache.get_key(sorted(keys))
+
+
+def get_output_key(result):
+    """
+    This function returns the content address of a stage output, i.e. the SHA-1 digest of a canonical \
+    serialization of it, so the key does not depend on the pickle bytes. Dataframes and series are keyed by their \
+    columns, dtypes and row hashes (or their CSV if they hold lists), JSON serializable values by their JSON \
+    serialization with sorted keys, sets and dictionaries by the sorted keys of their items, lists and tuples by \
+    the keys of their items in order, and other values by their pickle. Row order is part of the key, so stages \
+    must return their rows in a deterministic order.
+    :param result: stage output
+    :return: key string
+    """
+
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        frame = result.to_frame() if isinstance(result, pd.Series) else result
+        try:
+            rows = pd.util.hash_pandas_object(frame, index=True).values.tobytes()
+        except TypeError:
+            rows = frame.to_csv().encode('utf-8')
+        return cache.get_key(type(result).__name__, [str(column) for column in frame.columns],
+                             [str(dtype) for dtype in frame.dtypes], hashlib.sha1(rows).hexdigest())
+    try:
+        return hashlib.sha1(json.dumps(result, sort_keys=True).encode('utf-8')).hexdigest()
+    except (TypeError, ValueError):
+        pass
+    if isinstance(result, (set, frozenset)):
+        return cache.get_key('set', sorted(get_output_key(item) for item in result))
+    if isinstance(result, dict):
+        return cache.get_key('dict', sorted([get_output_key(key), get_output_key(value)]
+                                            for key, value in result.items()))
+    if isinstance(result, (list, tuple)):
+        return cache.get_key('list', [get_output_key(item) for item in result])
+
+    return hashlib.sha1(pickle.dumps(result, protocol=4)).hexdigest()
+
+
+class Output(object):
+    """
+    Reference to the output of an upstream stage, or to an item of it, e.g. Output('regulation', 0) for the edges \
+    of a stage returning (edges, nodes). Stage arguments with references are replaced by the outputs at run time.
+    """
+
+    def __init__(self, stage, item=None):
+        """
+        Constructor
+        :param stage: upstream stage name string
+        :param item: index or key of the item of the output. Default: None, i.e. the whole output.
+        """
+
+        self.stage = stage
+        self.item = item
+
+    def __getitem__(self, item):
+        return Output(self.stage, item)
+
+
+class File(object):
+    """
+    Reference to an input file or directory. The stage argument is the path, and the stage is fingerprinted with \
+    the content of the file or directory.
+    """
+
+    def __init__(self, filepath):
+        """
+        Constructor
+        :param filepath: path to the file or directory string
+        """
+
+        self.path = filepath
+
+
+class Stage(object):
+    """
+    Pipeline stage: a function, its arguments, and the input files and source code that its output depends on.
+    """
+
+    def __init__(self, name, function, args=None, kwargs=None, files=None, code=None, outputs=None):
+        """
+        Constructor
+        :param name: stage name string
+        :param function: function to run
+        :param args: positional arguments list, with Output() and File() references. Default: None.
+        :param kwargs: keyword arguments dictionary, with Output() and File() references. Default: None.
+        :param files: other input files or directories read by the function list. Default: None.
+        :param code: other modules or source files the function depends on list. The module of the function is \
+        always included. Default: None.
+        :param outputs: files written by the function list, the stage is run again if any is missing. Default: None.
+        """
+
+        self.name = name
+        self.function = function
+        self.args = list(args) if args is not None else list()
+        self.kwargs = dict(kwargs) if kwargs is not None else dict()
+        self.files = list(files) if files is not None else list()
+        self.code = [function] + (list(code) if code is not None else list())
+        self.outputs = list(outputs) if outputs is not None else list()
+
+    def get_references(self):
+        """
+        This method returns the upstream stages whose output is an argument of the stage.
+        :return: stage names list
+        """
+
+        values = self.args + list(self.kwargs.values())
+
+        return [value.stage for value in values if isinstance(value, Output)]
+
+
+class Pipeline(object):
+    """
+    Incremental pipeline runner. Every stage is fingerprinted with its source code, its parameters, the content \
+    of its input files and the content of the outputs of its upstream stages. Stage outputs are stored in a \
+    content-addressed cache, and a stage is only executed when no output is cached for its fingerprint. A stage \
+    executed again with the same output does not invalidate its downstream stages.
+    """
+
+    def __init__(self, cache_path=None):
+        """
+        Constructor
+        :param cache_path: path to the stage cache directory string. Default: None, i.e. the 'cache_path' module \
+        variable.
+        """
+
+        self.cache_path = globals()['cache_path'] if cache_path is None else cache_path
+        self.objects_path = self.cache_path + '/objects'
+        if not os.path.isdir(self.objects_path): os.makedirs(self.objects_path)
+        self.index = cache.Cache(self.cache_path + '/stages.sqlite')
+        self.stages = OrderedDict()
+        self.keys = dict()
+        self.results = dict()
+
+    def add_stage(self, name, function, args=None, kwargs=None, files=None, code=None, outputs=None):
+        """
+        This method adds a stage to the pipeline. Stages run in the order they are added, after the stages whose \
+        output they take.
+        :param name: stage name string
+        :param function: function to run
+        :param args: positional arguments list, with Output() and File() references. Default: None.
+        :param kwargs: keyword arguments dictionary, with Output() and File() references. Default: None.
+        :param files: other input files or directories read by the function list. Default: None.
+        :param code: other modules or source files the function depends on list. Default: None.
+        :param outputs: files written by the function list. Default: None.
+        :return: reference to the stage output
+        """
+
+        stage = Stage(name, function, args, kwargs, files, code, outputs)
+        if name in self.stages:
+            raise ValueError('There is already a stage named: {}'.format(name))
+        for reference in stage.get_references():
+            if reference not in self.stages:
+                raise ValueError('Stage "{}" takes the output of an unknown stage: {}'.format(name, reference))
+        self.stages[name] = stage
+
+        return Output(name)
+
+    def get_fingerprint(self, stage):
+        """
+        This method returns the fingerprint of a stage. Upstream stages must have been run.
+        :param stage: stage object
+        :return: fingerprint string
+        """
+
+        def get_key(value):
+            if isinstance(value, Output):
+                return ['output', self.keys[value.stage], value.item]
+            if isinstance(value, File):
+                return ['file', get_path_key(value.path)]
+            return ['value', get_value_key(value)]
+
+        return cache.get_key(stage.name, get_code_key(stage.code),
+                             [get_key(value) for value in stage.args],
+                             sorted([key, get_key(value)] for key, value in stage.kwargs.items()),
+                             [[filepath, get_path_key(filepath)] for filepath in stage.files])
+
+    def _save(self, result):
+        """
+        This method stores a stage output in the cache.
+        :param result: stage output
+        :return: output key string, see the get_output_key() function
+        """
+
+        key = get_output_key(result)
+        filepath = '{}/{}.pkl'.format(self.objects_path, key)
+        if not os.path.exists(filepath):
+            with open(filepath + '.tmp', 'wb') as f:
+                pickle.dump(result, f, protocol=4)
+            os.replace(filepath + '.tmp', filepath)
+
+        return key
+
+    def get(self, name):
+        """
+        This method returns the output of a stage that has been run.
+        :param name: stage name string
+        :return: stage output
+        """
+
+        if name not in self.results:
+            with open('{}/{}.pkl'.format(self.objects_path, self.keys[name]), 'rb') as f:
+                self.results[name] = pickle.load(f)
+
+        return self.results[name]
+
+    def _resolve(self, value):
+        """
+        This method replaces a stage argument reference by its value.
+        :param value: argument value
+        :return: output, path or the value itself
+        """
+
+        if isinstance(value, Output):
+            result = self.get(value.stage)
+            return result if value.item is None else result[value.item]
+        if isinstance(value, File):
+            return value.path
+
+        return value
+
+    def get_upstream(self, targets):
+        """
+        This method returns the stages needed to run some target stages.
+        :param targets: target stage names list
+        :return: stage names set
+        """
+
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name in needed:
+                continue
+            if name not in self.stages:
+                raise ValueError('Unknown stage: {}'.format(name))
+            needed.add(name)
+            pending.extend(self.stages[name].get_references())
+
+        return needed
+
+    def run(self, targets=None, force=None):
+        """
+        This method runs the pipeline, executing only the stages whose fingerprint has no cached output.
+        :param targets: stage names to run list, with the stages they depend on. Default: None, i.e. all stages.
+        :param force: stage names to execute even if their output is cached list. Default: None.
+        :return: stage status dictionary {stage name: 'cached' or 'executed'}
+        """
+
+        print('\nThe function "run()" is running...')
+        needed = self.get_upstream(targets) if targets is not None else set(self.stages)
+        force = set(force) if force is not None else set()
+        status = OrderedDict()
+        for name, stage in self.stages.items():
+            if name not in needed:
+                continue
+            fingerprint = self.get_fingerprint(stage)
+            key = self.index.get(fingerprint) if name not in force else None
+            if (key is not None and os.path.exists('{}/{}.pkl'.format(self.objects_path, key))
+                    and all(os.path.exists(filepath) for filepath in stage.outputs)):
+                if self.keys.get(name) != key:
+                    self.results.pop(name, None)
+                self.keys[name] = key
+                status[name] = 'cached'
+                print('* Stage "{}": cached'.format(name))
+                continue
+
+            t = time.time()
+            args = [self._resolve(value) for value in stage.args]
+            kwargs = {key: self._resolve(value) for key, value in stage.kwargs.items()}
+            result = stage.function(*args, **kwargs)
+            self.keys[name] = self._save(result)
+            self.results[name] = result
+            self.index.set(fingerprint, self.keys[name])
+            status[name] = 'executed'
+            print('* Stage "{}": executed in {:.2f} s'.format(name, time.time() - t))
+
+        print('\n{} stages executed, {} cached.'.format(sum(value == 'executed' for value in status.values()),
+                                                         sum(value == 'cached' for value in status.values())))
+        print('\nFinished run().\n')
+
+        return status
+
+
+# REVIEW GRAPH STAGES
+
+def get_monarch_dataframe(network):
+    """
+    This function returns the Monarch network from the extract_edges() function as a dataframe with the edges \
+    sorted. The network is a set, iterated in an order that changes from one process to the next with the string \
+    hashes, so the outputs built from it would not have the same content address for the same edges.
+    :param network: edges (as tuples) set
+    :return: monarch network dataframe
+    """
+
+    edges = sorted(network, key=lambda edge: [(value is not None, str(value)) for value in edge])
+
+    return pd.DataFrame(edges, columns=monarch_columns)
+
+
+def build_curation(version):
+    """
+    This function builds the curated network from the curated spreadsheets files.
+    :param version: curated network data version string, e.g. 'v20180118'
+    :return: curation graph edges list, curation graph nodes list
+    """
+
+    curation_edges, curation_nodes = curation.read_network(version=version)
+    data_edges = curation.prepare_data_edges(curation_edges)
+    data_nodes = curation.prepare_data_nodes(curation_nodes)
+    curated_network = curation.prepare_curated_edges(data_edges)
+    curated_concepts = curation.prepare_curated_nodes(data_nodes)
+
+    return curation.build_edges(curated_network), curation.build_nodes(curated_concepts)
+
+
+def build_monarch(seed_list):
+    """
+    This function builds the Monarch network of the seed nodes, their first shell of neighbours and their \
+    ortholog-phenotypes.
+    :param seed_list: seed node CURIEs list
+    :return: monarch graph edges, monarch graph nodes
+    """
+
+    neighbours_list = monarch.get_neighbours_list(seed_list)
+    seed_orthopheno_list = monarch.get_orthopheno_list(seed_list)
+    neighbours_orthopheno_list = monarch.get_orthopheno_list(neighbours_list)
+    gene_list = sum([seed_list, neighbours_list, seed_orthopheno_list, neighbours_orthopheno_list], [])
+    monarch_network = monarch.extract_edges(gene_list)
+    monarch.print_network(monarch_network, 'monarch_connections')
+    monarch_network = get_monarch_dataframe(monarch_network)
+
+    return monarch.build_edges(monarch_network), monarch.build_nodes(monarch_network)
+
+
+def build_transcriptomics(csv_path):
+    """
+    This function builds the transcriptomics network from the differential gene expression data.
+    :param csv_path: path to the gene expression CSV file string
+    :return: rna graph edges list, rna graph nodes list
+    """
+
+    data = transcriptomics.read_data(csv_path)
+    clean_data = transcriptomics.clean_data(data)
+    data_edges = transcriptomics.prepare_data_edges(clean_data)
+    rna_network = transcriptomics.prepare_rna_edges(data_edges)
+
+    return transcriptomics.build_edges(rna_network), transcriptomics.build_nodes(rna_network)
+
+
+def build_regulation(gmt_path):
+    """
+    This function builds the regulation network from the tftargets networks and the MSigDB gene sets.
+    :param gmt_path: path to the MSigDB C3 TFT GMT file string
+    :return: regulation graph edges list, regulation graph nodes list
+    """
+
+    regulation.prepare_msigdb_data(gmt_path)
+    data = regulation.load_tf_gene_edges()
+    dicts = regulation.get_gene_id_normalization_dictionaries(data)
+    data_edges = regulation.prepare_data_edges(data, dicts)
+    reg_network = regulation.prepare_regulation_edges(data_edges)
+
+    return regulation.build_edges(reg_network), regulation.build_nodes(reg_network)
+
+
+def build_monarch_connections(graph_nodes_list):
+    """
+    This function builds the Monarch network connecting the graph nodes.
+    :param graph_nodes_list: graph nodes from the graph.graph_nodes() function
+    :return: monarch graph edges, monarch graph nodes
+    """
+
+    monarch_network_graph = monarch.extract_edges(graph_nodes_list)
+    monarch.print_network(monarch_network_graph, 'monarch_connections_graph')
+    monarch_network_graph = get_monarch_dataframe(monarch_network_graph)
+
+    return monarch.build_edges(monarch_network_graph), monarch.build_nodes(monarch_network_graph)
+
+
+def export_neo4j(edges, nodes, neo4j_path):
+    """
+    This function saves the graph edges and nodes as Neo4j import files.
+    :param edges: graph edges dataframe
+    :param nodes: graph nodes dataframe
+    :param neo4j_path: path to the neo4j directory string
+    :return: number of statements, number of concepts
+    """
+
+    statements = neo4jlib.get_statements(utils.get_dataframe(edges))
+    concepts = neo4jlib.get_concepts(utils.get_dataframe(nodes))
+    neo4jlib.save_neo4j_files(statements, neo4j_path, file_type='statements')
+    neo4jlib.save_neo4j_files(concepts, neo4j_path, file_type='concepts')
+
+    return len(statements), len(concepts)
+
+
+def get_review_pipeline(seed_list, curation_version, rna_csv_path, gmt_path, neo4j_path=None):
+    """
+    This function returns the pipeline building the review graph as in the README workflow: curation, Monarch, \
+    transcriptomics and regulation networks, the regulation merge, the Monarch graph connections, the graph edges \
+    and nodes and, if a neo4j directory is given, the Neo4j import files. Monarch stages query the BioLink API, \
+    so their output only changes with the seed nodes or the code unless they are forced. Their edges are sorted, \
+    so a forced Monarch stage retrieving the same edges does not run the stages after it again.
+    :param seed_list: seed node CURIEs list
+    :param curation_version: curated network data version string, e.g. 'v20180118'
+    :param rna_csv_path: path to the gene expression CSV file string
+    :param gmt_path: path to the MSigDB C3 TFT GMT file string
+    :param neo4j_path: path to the neo4j directory string. Default: None, i.e. no Neo4j export stage.
+    :return: pipeline object
+    """
+
+    pipeline = Pipeline()
+    curated = pipeline.add_stage('curation', build_curation, args=[curation_version],
+                                 files=['{}/curation/data/{}'.format(os.getcwd(), curation_version)],
+                                 code=[curation, idmapping, utils, storage])
+    monarch_network = pipeline.add_stage('monarch', build_monarch, args=[seed_list],
+                                         code=[monarch, idmapping, storage])
+    rna = pipeline.add_stage('transcriptomics', build_transcriptomics, args=[File(rna_csv_path)],
+                             code=[transcriptomics, idmapping, storage])
+    reg = pipeline.add_stage('regulation', build_regulation, args=[File(gmt_path)],
+                             files=['{}/regulation/tftargets/data'.format(os.getcwd()),
+                                    '{}/regulation/tftargets/data-raw/TRRUST'.format(os.getcwd())],
+                             code=[regulation, idmapping, cache, storage])
+    merge = pipeline.add_stage('merge', graph.graph_nodes,
+                               kwargs={'curation': curated[0], 'monarch': monarch_network[0],
+                                       'transcriptomics': rna[0], 'regulation': reg[0]},
+                               code=[utils, storage])
+    connections = pipeline.add_stage('monarch_connections', build_monarch_connections, args=[merge[0]],
+                                     code=[monarch, idmapping, storage])
+    edges = pipeline.add_stage('edges', graph.build_edges,
+                               kwargs={'curation': curated[0], 'monarch': connections[0],
+                                       'transcriptomics': rna[0], 'regulation': merge[1]},
+                               code=[utils, storage])
+    nodes = pipeline.add_stage('nodes', graph.build_nodes,
+                               kwargs={'statements': edges, 'curation': curated[1], 'monarch': connections[1],
+                                       'transcriptomics': rna[1], 'regulation': reg[1]},
+                               code=[utils, storage])
+    if neo4j_path is not None:
+        pipeline.add_stage('neo4j', export_neo4j, args=[edges, nodes, neo4j_path], code=[neo4jlib, utils, storage],
+                           outputs=['{}/import/ngly1/ngly1_statements.csv'.format(neo4j_path),
+                                    '{}/import/ngly1/ngly1_concepts.csv'.format(neo4j_path)])
+
+    return pipeline
+
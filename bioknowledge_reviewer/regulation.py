@@ -11,9 +11,11 @@
 import datetime
 import json
 import os
-import gseapy as gs
-from biothings_client import get_client
+import cache
+import idmapping
+import storage
 import gzip
+import numpy as np
 import pandas as pd
 
 # VARIABLES
@@ -27,6 +29,20 @@ if not os.path.isdir(path): os.makedirs(path)
 graph = os.getcwd() + '/graph'
 if not os.path.isdir(graph): os.makedirs(graph)
 
+# compiled raw networks cache, rebuilt when a source file changes: set use_network_cache to False to always parse \
+# the JSON files
+use_network_cache = True
+network_cache_path = path + '/cache'
+
+# compiled networks format version, part of the cache file names: increase it when the compiled layout or the \
+# normalization functions, e.g. normalize_neph(), change, so networks compiled by the previous code are not loaded
+network_cache_version = 1
+
+# individual networks edges attributes
+edges_columns = ['source', 'dataset', 'tf_source_id', 'gene_source_id', 'source_uri', 's_entrez_id', 's_hgnc_id',
+                 's_symbol', 'p_id', 'p_label', 'o_entrez_id', 'o_hgnc_id', 'o_symbol', 'reference_id',
+                 'reference_date']
+
 
 # CHECK NETWORK SCHEMA AND NORMALIZE TO GRAPH SCHEMA
 # TODO: check functions
@@ -150,11 +166,59 @@ def check_msigdb_geneset_name_format(data):
     #return
 
 
-def prepare_msigdb_data(gmt_path):
+def get_geneset_tf(geneset_name):
+    """
+    This function returns the TF symbol of a MSigDB C3:TFT gene set name.
+    :param geneset_name: gene set name string, e.g. 'GATTGGY_NFY_Q6_01'
+    :return: TF symbol string, or None object for 'unknown' (motif without a link to a tf) and unrecognized names
+    """
+
+    gs_name_v = geneset_name.split('_')
+    # remove 'unknown' (motif without a link to a tf)
+    # gene symbols: Ideally, symbols should be no longer than six characters in length.
+    # GCTNWTTGK_UNKNOWN
+    if 'unknown' in gs_name_v[-1].lower():
+        return None
+    # LEN = 4 GATTGGY_NFY_Q6_01
+    elif len(gs_name_v) == 4:
+        return gs_name_v[1]
+    # LEN = 3 two tfids: motif+TFACID or TFACID
+    # GCCATNTTG_YY1_Q6
+    elif len(gs_name_v) == 3 and len(gs_name_v[0]) >= 6:
+        return gs_name_v[1]
+    # AP4_Q6_01
+    elif len(gs_name_v) == 3 and len(gs_name_v[0]) < 6:
+        return gs_name_v[0]
+    # LEN = 2 GFI1_01
+    elif len(gs_name_v) == 2:
+        return gs_name_v[0]
+
+    return None
+
+
+def read_gmt(gmt_path):
+    """
+    This function reads a GMT file line by line, so the gene sets are never all held as text.
+    :param gmt_path: path to the GMT (or gzipped GMT) file string
+    :return: (gene set name, TF symbol or None, reference uri, genes list) records generator
+    """
+
+    opener = gzip.open if gmt_path.endswith('.gz') else open
+    with opener(gmt_path, 'rt') as f:
+        for line in f:
+            fields = line.strip().split('\t')
+            if not fields[0]:
+                continue
+            yield fields[0], get_geneset_tf(fields[0]), fields[1], fields[2:]
+
+
+def prepare_msigdb_data(gmt_path, min_size=1, max_size=10000):
     """
     This function prepares MSigDB raw data for TF-gene integration.
-    It saves the MSigDB raw TF-gene network as JSON file.
+    It saves the MSigDB raw TF-gene network and the TF-gene statement references as JSON files.
     :param gmt_path: path to C3:TFT entrez GMT data file string
+    :param min_size: minimum number of genes of a gene set in the network (integer). Default: 1.
+    :param max_size: maximum number of genes of a gene set in the network (integer). Default: 10000.
     :return: None object
     """
 
@@ -163,59 +227,60 @@ def prepare_msigdb_data(gmt_path):
     path = os.getcwd() + '/regulation/msigdb/out'
     if not os.path.exists(path): os.makedirs(path)
 
-    # load C3:TFT data
-    # gmt_path = '/home/nuria/workspace/ngly1-graph/regulation/msigdb/data/c3.tft.v6.1.entrez.gmt'
-    data = gs.parser.gsea_gmt_parser("{}".format(gmt_path), min_size=1, max_size=10000)
-    print('\n* Number of Transcription Factor Targets (TFT) gene sets: {}'.format(len(data.keys())))
-
-    ## save raw data
-    # TODO: save raw data as gmt (data is of type dict())
-    # data_path = os.getcwd() + '/regulation/msigdb/data'
-    # if not os.path.isdir(data_path): os.makedirs(data_path)
-    # pd.DataFrame(data).to_csv('{}/c3.tft.v6.1.entrez.gmt'.format(data_path), index=False)
-
     ## prepare tf-gene_list dictionary: {symbol: [entrez]}: compile all gene set names into TF symbol
-    # select tf:
+    ## and statement references dictionary: {'tf:gene': 'reference'}
+    # load C3:TFT data in a single pass
+    # gmt_path = '/home/nuria/workspace/ngly1-graph/regulation/msigdb/data/c3.tft.v6.1.entrez.gmt'
+    data = {}
     unknown = list()
     unrecognized = list()
     redundant_tf = list()
     tf_tfbs = {}
     msigdb = {}
-    for geneset_name in data:
-        gs_name_v = geneset_name.split('_')
-        # remove 'unknown' (motif without a link to a tf)
-        # gene symbols: Ideally, symbols should be no longer than six characters in length.
-        # GCTNWTTGK_UNKNOWN
-        if 'unknown' in gs_name_v[-1].lower():
-            unknown.append(geneset_name)
+    # targets of TFs with several gene sets: {tf: {entrez: None}}, i.e. insertion ordered sets until serialization
+    msigdb_merged = {}
+    st2ref = {}
+    for geneset_name, tf, ref_uri, genelist in read_gmt(gmt_path):
+        selected = min_size <= len(genelist) <= max_size
+        if selected:
+            data[geneset_name] = genelist
+        if tf is None:
+            if not selected:
+                continue
+            elif 'unknown' in geneset_name.split('_')[-1].lower():
+                unknown.append(geneset_name)
+            else:
+                unrecognized.append(geneset_name)
             continue
-        # LEN = 4 GATTGGY_NFY_Q6_01
-        elif len(gs_name_v) == 4:
-            tf = gs_name_v[1]
-        # LEN = 3 two tfids: motif+TFACID or TFACID
-        # GCCATNTTG_YY1_Q6
-        elif len(gs_name_v) == 3 and len(gs_name_v[0]) >= 6:
-            tf = gs_name_v[1]
-        # AP4_Q6_01
-        elif len(gs_name_v) == 3 and len(gs_name_v[0]) < 6:
-            tf = gs_name_v[0]
-        # LEN = 2 GFI1_01
-        elif len(gs_name_v) == 2:
-            tf = gs_name_v[0]
-        else:
-            unrecognized.append(geneset_name)
+
+        # save statement references: {'tf:gene': {reference_uri: None}}, i.e. insertion ordered sets
+        for gene in genelist:
+            st2ref.setdefault(tf + ':' + gene, {})[ref_uri] = None
+        if not selected:
             continue
 
         # save tf-genelist
         if not msigdb.get(tf):
-            msigdb[tf] = data[geneset_name]
+            msigdb[tf] = genelist
         else:
-            for gene in data[geneset_name]:
-                msigdb = add_gene(msigdb, tf, gene)
+            if tf not in msigdb_merged:
+                msigdb_merged[tf] = dict.fromkeys(msigdb[tf])
+            msigdb_merged[tf].update(dict.fromkeys(genelist))
             redundant_tf.append(tf)
 
         # save tf-tfbs
         tf_tfbs = format_exp(tf_tfbs, tf, geneset_name)
+    msigdb.update({tf: list(genes) for tf, genes in msigdb_merged.items()})
+    print('\n* Number of Transcription Factor Targets (TFT) gene sets: {}'.format(len(data)))
+
+    ## save raw data
+    # TODO: save raw data as gmt (data is of type dict())
+    # data_path = os.getcwd() + '/regulation/msigdb/data'
+    # if not os.path.isdir(data_path): os.makedirs(data_path)
+    # pd.DataFrame(data).to_csv('{}/c3.tft.v6.1.entrez.gmt'.format(data_path), index=False)
+
+    # convert reference_uri list to str
+    st2ref = {st: '|'.join(refs) for st, refs in st2ref.items()}
 
     # save msigdb raw network data
     with open('{}/tfid_genelist_entrez_msigdb.json'.format(path), 'w') as f:
@@ -224,6 +289,10 @@ def prepare_msigdb_data(gmt_path):
     with open('{}/tf_genelist_entrez_msigdb.json'.format(path), 'w') as f:
         json.dump(msigdb, f, sort_keys=True, indent=2)
 
+    # not indented, millions of statements are encoded much faster
+    with open('{}/tf_gene_reference_msigdb.json'.format(path), 'w') as f:
+        f.write(json.dumps(st2ref, sort_keys=True))
+
     with open('{}/tf_tfid_entrez.json'.format(path), 'w') as f:
         json.dump(tf_tfbs, f, sort_keys=True, indent=2)
 
@@ -243,10 +312,100 @@ def prepare_msigdb_data(gmt_path):
 
 
 ## Prepare regulation data
-def load_tf_gene_edges():
+def normalize_neph(neph2012):
+    """
+    This function merges the neph2012 TF-gene networks of every cell type into one network.
+    :param neph2012: neph2012 raw network dictionary {cell: {tf: genes list}}
+    :return: neph raw network dictionary {tf: genes list}
+    """
+
+    neph_all = dict()
+    for cell in neph2012:
+        for tf, genes in neph2012[cell].items():
+            neph_all = unique_list(neph_all, tf, genes)
+
+    return {key: list(neph_all[key]) for key in neph_all}
+
+
+def save_network_cache(network, filepath):
+    """
+    This function saves a raw network in the compiled networks cache: TF and gene vocabularies as arrays, and \
+    the genes of every TF as integer codes in compressed sparse row (CSR) format.
+    :param network: raw network dictionary {tf: genes list}
+    :param filepath: path to the NPZ file string
+    :return: None object
+    """
+
+    gene2code = dict()
+    indptr = [0]
+    indices = list()
+    for genes in network.values():
+        indices.extend(gene2code.setdefault(gene, len(gene2code)) for gene in genes)
+        indptr.append(len(indices))
+
+    # write to a temporary file first, so an interrupted run does not leave a truncated cache
+    with open(filepath + '.tmp', 'wb') as f:
+        np.savez(f, tfs=np.array(list(network), dtype=str), genes=np.array(list(gene2code), dtype=str),
+                 indptr=np.array(indptr, dtype=np.int64), indices=np.array(indices, dtype=np.int32))
+    os.replace(filepath + '.tmp', filepath)
+
+
+def read_network_cache(filepath):
+    """
+    This function reads a raw network from the compiled networks cache.
+    :param filepath: path to the NPZ file string
+    :return: raw network dictionary {tf: genes list}
+    """
+
+    with np.load(filepath, allow_pickle=False) as data:
+        tfs = data['tfs'].tolist()
+        genes = data['genes'].astype(object)[data['indices']].tolist()
+        indptr = data['indptr'].tolist()
+
+    return {tf: genes[indptr[i]:indptr[i + 1]] for i, tf in enumerate(tfs)}
+
+
+def load_network(filepath, name, normalize=None):
+    """
+    This function loads a raw network JSON file. Networks are compiled into the cache at the \
+    'network_cache_path' module variable, keyed by the 'network_cache_version' module variable and the hash of \
+    the JSON file, so they are only parsed again when the file or the compiled format changes.
+    :param filepath: path to the JSON file string
+    :param name: network name string, e.g. 'tred'
+    :param normalize: function to apply to the parsed JSON data, e.g. normalize_neph(). Default: None.
+    :return: raw network dictionary {tf: genes list}
+    """
+
+    if use_network_cache:
+        if not os.path.isdir(network_cache_path): os.makedirs(network_cache_path)
+        cache_file = '{}/{}_v{}_{}.npz'.format(network_cache_path, name, network_cache_version,
+                                                cache.get_file_key(filepath))
+        if os.path.isfile(cache_file):
+            return read_network_cache(cache_file)
+
+    with open(filepath) as f:
+        network = json.load(f)
+    if normalize is not None:
+        network = normalize(network)
+
+    if use_network_cache:
+        # remove the networks compiled from previous versions of the file or of the compiled format
+        for filename in os.listdir(network_cache_path):
+            if filename.startswith(name + '_') and filename.endswith('.npz'):
+                os.remove('{}/{}'.format(network_cache_path, filename))
+        save_network_cache(network, cache_file)
+        print('* {} network compiled at: {}'.format(name, cache_file))
+
+    return network
+
+
+def load_tf_gene_edges(universe=None):
     """
     This function loads individually each database raw network from JSON files into a dict variable.
-    Each dictionary contains TFs as keys and target genes list as values.
+    Each dictionary contains TFs as keys and target genes list as values. Networks are served from the compiled \
+    networks cache when their JSON files have not changed.
+    :param universe: (symbols, entrez) gene universe tuple from the get_gene_universe() function to restrict the \
+    networks to the edges with a TF or a target gene in the review graph. Default: None, i.e. all edges.
     :return: tred, encode, neph, trrust and msigdb individual raw networks dictionaries (in this order) as tuple
     """
 
@@ -255,26 +414,98 @@ def load_tf_gene_edges():
     #json_tftargets_path = '/home/nuria/workspace/ngly1-graph/regulation/tftargets/data'
     json_tftargets_path = './regulation/tftargets/data'
     json_msigdb_path = os.getcwd() + '/regulation/msigdb/out'
-    tred = json.load(open('{}/tred.json'.format(json_tftargets_path)))
-    encode = json.load(open('{}/encode.json'.format(json_tftargets_path)))
-    neph2012 = json.load(open('{}/neph2012.json'.format(json_tftargets_path)))
-    trrust = json.load(open('{}/trrust.json'.format(json_tftargets_path)))
-    msigdb = json.load(open('{}/tf_genelist_entrez_msigdb.json'.format(json_msigdb_path)))
-
+    tred = load_network('{}/tred.json'.format(json_tftargets_path), 'tred')
+    encode = load_network('{}/encode.json'.format(json_tftargets_path), 'encode')
     # normalize neph2012 data structure
-    neph_all = dict()
-    for cell in neph2012:
-        for tf, genes in neph2012[cell].items():
-            neph_all = unique_list(neph_all, tf, genes)
-    neph = {key: list(neph_all[key]) for key in neph_all}
+    neph = load_network('{}/neph2012.json'.format(json_tftargets_path), 'neph', normalize=normalize_neph)
+    trrust = load_network('{}/trrust.json'.format(json_tftargets_path), 'trrust')
+    msigdb = load_network('{}/tf_genelist_entrez_msigdb.json'.format(json_msigdb_path), 'msigdb')
 
     # prepare data in a tuple
     data = (tred, encode, neph, trrust, msigdb)
+    if universe is not None:
+        data = restrict_tf_gene_edges(data, universe)
     print('\nFinished load_tf_gene_edges().\n')
 
     return data
 
 
+def get_gene_universe(networks):
+    """
+    This function gets the gene universe of the review graph in the ID schemes of the raw networks, i.e. gene \
+    symbols and Entrez IDs. HGNC and Entrez node IDs are mapped to their symbol, aliases and Entrez ID with \
+    BioThings, and node IDs without namespace are taken as symbols.
+    :param networks: graph edges objects list, e.g. [curation_edges, monarch_edges, rna_edges], as lists of \
+    dictionaries or dataframes
+    :return: (symbols, entrez) gene universe tuple of sets, with symbols in upper case
+    """
+
+    print('\nThe function "get_gene_universe()" is running...')
+    # graph node ids
+    nodes = set()
+    for network in networks:
+        df = pd.DataFrame(network) if isinstance(network, list) else network
+        nodes.update(df['subject_id'].dropna().tolist())
+        nodes.update(df['object_id'].dropna().tolist())
+    print('\n* Number of graph nodes: {}'.format(len(nodes)))
+
+    symbols = {node.upper() for node in nodes if ':' not in node}
+    hgnc = [node.split(':')[1] for node in nodes if node.startswith('HGNC:')]
+    entrez = {node.split(':')[1] for node in nodes if node.startswith('NCBIGene:')}
+
+    # query biothings for the symbols, aliases and entrez of the graph genes
+    print('\n* Querying BioThings to map graph genes to gene symbols and Entrez IDs...')
+    hits = idmapping.querymany(hgnc, scopes='HGNC', fields='entrezgene,symbol,alias', size=1) if hgnc else []
+    if entrez:
+        hits += idmapping.querymany(list(entrez), scopes='entrezgene', fields='entrezgene,symbol,alias', size=1)
+    for hit in hits:
+        if hit.get('notfound'):
+            continue
+        if isinstance(hit.get('entrezgene'), (str, int)):
+            entrez.add(str(hit['entrezgene']))
+        if isinstance(hit.get('symbol'), str):
+            symbols.add(hit['symbol'].upper())
+        aliases = hit.get('alias')
+        aliases = [aliases] if isinstance(aliases, str) else aliases if isinstance(aliases, list) else []
+        symbols.update(alias.upper() for alias in aliases)
+    print('* Gene universe: {} symbols and aliases, {} Entrez IDs'.format(len(symbols), len(entrez)))
+    print('\nFinished get_gene_universe().\n')
+
+    return symbols, entrez
+
+
+def restrict_tf_gene_edges(data, universe):
+    """
+    This function restricts the raw networks to the edges with a TF or a target gene in a gene universe, so \
+    only them are normalized and annotated. The graph_nodes() function of the graph module still selects the \
+    exact edges with a node in the graph.
+    :param data: (tred, encode, neph, trrust, msigdb) individual raw networks dictionaries (in this order) as tuple \
+    from the load_tf_gene_edges() function
+    :param universe: (symbols, entrez) gene universe tuple from the get_gene_universe() function
+    :return: tred, encode, neph, trrust and msigdb restricted raw networks dictionaries (in this order) as tuple
+    """
+
+    symbols, entrez = universe
+    restricted = list()
+    for name, network in zip(['tred', 'encode', 'neph', 'trrust', 'msigdb'], data):
+        # trrust genes are symbols, the rest entrez
+        if name == 'trrust':
+            genes_universe = {gene for genes in network.values() for gene in genes if gene.upper() in symbols}
+        else:
+            genes_universe = entrez
+        network_restricted = dict()
+        for tf, genes in network.items():
+            genes = genes if tf.upper() in symbols else [gene for gene in genes if gene in genes_universe]
+            if genes:
+                network_restricted[tf] = genes
+        print('* {} edges restricted to the gene universe: {} of {}'.format(
+            name, sum(len(genes) for genes in network_restricted.values()),
+            sum(len(genes) for genes in network.values())))
+        restricted.append(network_restricted)
+
+    return tuple(restricted)
+
+
 # normalize to entrez, hgnc ids
 def get_gene_id_normalization_dictionaries(data):
     """
@@ -304,8 +535,7 @@ def get_gene_id_normalization_dictionaries(data):
     ## ID dictionaries: symbols2entrez and symbol2hgnc
     # query biothings for symbol2entrez and symbol2hgnc
     print('\n* Querying BioThings to map gene symbols to HGNC and Entrez IDs...')
-    mg = get_client('gene')
-    df = mg.querymany(symbols, scopes='symbol,alias', fields='entrezgene,HGNC', size=1, as_dataframe=True)
+    df = idmapping.querymany(symbols, scopes='symbol,alias', fields='entrezgene,HGNC', size=1, as_dataframe=True)
     #print('symbols to entrez/hgnc: ',df.shape)
 
     # not found
@@ -363,8 +593,7 @@ def get_gene_id_normalization_dictionaries(data):
     ## ID dictionaries: entrez2hgnc, entrez2symbol
     # query biothings for entrez2hgnc, entrez2symbol
     print('\n* Querying BioThings to map Entrez to HGNC IDs and gene symbols...')
-    mg = get_client('gene')
-    df = mg.querymany(entrez, scopes='entrezgene', fields='HGNC,symbol', size=1, as_dataframe=True)
+    df = idmapping.querymany(entrez, scopes='entrezgene', fields='HGNC,symbol', size=1, as_dataframe=True)
     #print('entrez to hgnc/symbol: ', df.shape)
 
     # not found
@@ -411,10 +640,63 @@ def get_gene_id_normalization_dictionaries(data):
 
 
 # save edges
+def get_network_edges(network, dicts, source, dataset, source_uri, reference_id, reference_date, st2ref=None,
+                      gene_ids='entrez'):
+    """
+    This function builds the edges of an individual raw network column by column, mapping the gene ID \
+    dictionaries over the TF and gene arrays.
+    :param network: raw network dictionary {tf symbol: genes list}
+    :param dicts: (symbol2entrez_dict, symbol2hgnc_dict, entrez2hgnc_dict, entrez2symbol_dict) dictionaries tuple \
+    from the get_gene_id_normalization_dictionaries() function
+    :param source: source string, e.g. 'tftargets'
+    :param dataset: dataset string, e.g. 'tred'
+    :param source_uri: source uri string
+    :param reference_id: reference id string of every edge, or None object to take it from st2ref
+    :param reference_date: reference date string yyyy-mm-dd or 'NA'
+    :param st2ref: statement references dictionary {'tf:gene': reference_id}. Default: None.
+    :param gene_ids: genes ID scheme in the network string, 'entrez' or 'symbol'. Default: 'entrez'.
+    :return: edges dataframe
+    """
+
+    symbol2entrez_dict, symbol2hgnc_dict, entrez2hgnc_dict, entrez2symbol_dict = dicts
+    tfs = [tf for tf, genes in network.items() for _ in genes]
+    genes = [str(gene) for genes in network.values() for gene in genes]
+    if gene_ids == 'symbol':
+        o_entrez = [symbol2entrez_dict[gene] for gene in genes]
+        o_hgnc = [symbol2hgnc_dict[gene] for gene in genes]
+        o_symbol = genes
+    else:
+        o_entrez = ['NCBIGene:' + gene for gene in genes]
+        o_hgnc = [entrez2hgnc_dict[entrez] for entrez in o_entrez]
+        o_symbol = [entrez2symbol_dict[entrez] for entrez in o_entrez]
+    if reference_id is None:
+        reference_id = [st2ref[tf + ':' + gene] for tf, gene in zip(tfs, genes)]
+
+    edges = pd.DataFrame({
+        'source': source,
+        'dataset': dataset,
+        'tf_source_id': tfs,
+        'gene_source_id': genes,
+        'source_uri': source_uri,
+        's_entrez_id': [symbol2entrez_dict[tf] for tf in tfs],
+        's_hgnc_id': [symbol2hgnc_dict[tf] for tf in tfs],
+        's_symbol': tfs,
+        'p_id': 'RO:0002434',
+        'p_label': 'interacts with',
+        'o_entrez_id': o_entrez,
+        'o_hgnc_id': o_hgnc,
+        'o_symbol': o_symbol,
+        'reference_id': reference_id,
+        'reference_date': reference_date
+    }, index=pd.RangeIndex(len(tfs)), columns=edges_columns, dtype=str)
+
+    return edges
+
+
 def prepare_data_edges(data,dicts):
     """
     This function prepares each individual regulatory dataset as edges. It normalizes and stores them \
-     separately as tftargets and msigdb edges.
+     separately as tftargets and msigdb edges, which are also saved as CSV files.
     Edges (network) data structure:
 
     | source | dataset | tf_source_id | gene_source_id | source_uri | s_entrez_id | s_hgnc_id | s_symbol | p_id | \
@@ -451,12 +733,6 @@ def prepare_data_edges(data,dicts):
     trrust = data[3]
     msigdb = data[4]
 
-    # gene_id mapping dictionaries
-    symbol2entrez_dict = dicts[0]
-    symbol2hgnc_dict = dicts[1]
-    entrez2hgnc_dict = dicts[2]
-    entrez2symbol_dict = dicts[3]
-
     ## tftargets network
     # REFERENCES: add ref_uri to trrust statements
     # build trrust dict: {'tf:gene': 'PMID:'}
@@ -475,215 +751,44 @@ def prepare_data_edges(data,dicts):
         st2ref[st] = 'PMID:' + ';'.join(st2ref[st])
 
     # build tftargets networks: tred, encode, neph, trrust
+    source = "tftargets"
+    source_uri = "https://github.com/slowkow/tftargets"
+    tftargets = pd.concat([
+        get_network_edges(tred, dicts, source, "tred", source_uri, "PMID:17202159", "2007-01-01"),
+        get_network_edges(encode, dicts, source, "encode_ENCFF001UUQ", source_uri, "ENCODE:ENCFF001UUQ",
+                          "2012-08-28"),
+        get_network_edges(neph, dicts, source, "neph2012", source_uri, "PMID:22959076", "2012-09-14"),
+        # reference_id = "PMID:26066708", reference_date = "2015-06-12"
+        get_network_edges(trrust, dicts, source, "trrust", source_uri, None, "NA", st2ref=st2ref, gene_ids='symbol')
+    ], ignore_index=True)
+
+    # save tftargets network
     tftargets_path = path + '/tftargets'
     if not os.path.isdir(tftargets_path): os.makedirs(tftargets_path)
-    #with open('./tftargets/out/tftargets_edges.csv', 'w') as f:
-    with open('{}/tftargets_edges.csv'.format(tftargets_path), 'w') as f:
-        f.write(
-            "source,dataset,tf_source_id,gene_source_id,source_uri,s_entrez_id,s_hgnc_id,s_symbol,p_id,p_label,\
-            o_entrez_id,o_hgnc_id,o_symbol,reference_id,reference_date\n")
-        source = "tftargets"
-        source_uri = "https://github.com/slowkow/tftargets"
-        p_id = "RO:0002434"
-        p_label = "interacts with"
-        # tred
-        dataset = "tred"
-        reference_id = "PMID:17202159"
-        reference_date = "2007-01-01"
-        for tf in tred:
-            for gene in tred[tf]:
-                f.write(
-                    "{},{},{},{},{},{},{},{},{},{},{},{},{},{},{}\n"
-                        .format(
-                        source,
-                        dataset,
-                        tf,
-                        gene,
-                        source_uri,
-                        symbol2entrez_dict[tf],
-                        symbol2hgnc_dict[tf],
-                        tf,
-                        p_id,
-                        p_label,
-                        "NCBIGene:" + str(gene),
-                        entrez2hgnc_dict["NCBIGene:" + str(gene)],
-                        entrez2symbol_dict["NCBIGene:" + str(gene)],
-                        reference_id,
-                        reference_date
-                    )
-                )
-        # encode
-        dataset = "encode_ENCFF001UUQ"
-        reference_id = "ENCODE:ENCFF001UUQ"
-        reference_date = "2012-08-28"
-        for tf in encode:
-            for gene in encode[tf]:
-                f.write(
-                    "{},{},{},{},{},{},{},{},{},{},{},{},{},{},{}\n"
-                        .format(
-                        source,
-                        dataset,
-                        tf,
-                        gene,
-                        source_uri,
-                        symbol2entrez_dict[tf],
-                        symbol2hgnc_dict[tf],
-                        tf,
-                        p_id,
-                        p_label,
-                        "NCBIGene:" + str(gene),
-                        entrez2hgnc_dict["NCBIGene:" + str(gene)],
-                        entrez2symbol_dict["NCBIGene:" + str(gene)],
-                        reference_id,
-                        reference_date
-                    )
-                )
-        # neph
-        dataset = "neph2012"
-        reference_id = "PMID:22959076"
-        reference_date = "2012-09-14"
-        for tf in neph:
-            for gene in neph[tf]:
-                f.write(
-                    "{},{},{},{},{},{},{},{},{},{},{},{},{},{},{}\n"
-                        .format(
-                        source,
-                        dataset,
-                        tf,
-                        gene,
-                        source_uri,
-                        symbol2entrez_dict[tf],
-                        symbol2hgnc_dict[tf],
-                        tf,
-                        p_id,
-                        p_label,
-                        "NCBIGene:" + str(gene),
-                        entrez2hgnc_dict["NCBIGene:" + str(gene)],
-                        entrez2symbol_dict["NCBIGene:" + str(gene)],
-                        reference_id,
-                        reference_date
-                    )
-                )
-        # trrust
-        dataset = "trrust"
-        # reference_id = "PMID:26066708"
-        reference_date = "NA"  # "2015-06-12"
-        for tf in trrust:
-            for gene in trrust[tf]:
-                reference_id = st2ref[tf + ':' + gene]
-                f.write(
-                    "{},{},{},{},{},{},{},{},{},{},{},{},{},{},{}\n"
-                        .format(
-                        source,
-                        dataset,
-                        tf,
-                        gene,
-                        source_uri,
-                        symbol2entrez_dict[tf],
-                        symbol2hgnc_dict[tf],
-                        tf,
-                        p_id,
-                        p_label,
-                        symbol2entrez_dict[gene],
-                        symbol2hgnc_dict[gene],
-                        gene,
-                        reference_id,
-                        reference_date
-                    )
-                )
+    storage.save_csv(tftargets, '{}/tftargets_edges.csv'.format(tftargets_path))
     print('\nThe tftargets edges are saved at: {}/tftargets_edges.csv\n'.format(tftargets_path))
 
     ## msigdb network
     # REFERENCES: add ref_uri to msigdb statements
-    # build msigdb dict: {'tf:gene': 'reference'}
-    unknown = list()
-    unrecognized = list()
-    st2ref = {}
-    #references_path = '/home/nuria/workspace/ngly1-graph/regulation/msigdb/data'
-    references_path = './regulation/msigdb/data'
-    for line in open("{}/c3.tft.v6.1.entrez.gmt".format(references_path)).readlines():
-        geneset_name = line.strip().split('\t')[0]
-        gs_name_v = geneset_name.split('_')
-        # gene symbols: Ideally, symbols should be no longer than six characters in length.
-        # GCTNWTTGK_UNKNOWN
-        if 'unknown' in gs_name_v[-1].lower():
-            unknown.append(geneset_name)
-            continue
-        # LEN = 4 GATTGGY_NFY_Q6_01
-        elif len(gs_name_v) == 4:
-            tf = gs_name_v[1]
-        # LEN = 3 two tfids: motif+TFACID or TFACID
-        # GCCATNTTG_YY1_Q6
-        elif len(gs_name_v) == 3 and len(gs_name_v[0]) >= 6:
-            tf = gs_name_v[1]
-        # AP4_Q6_01
-        elif len(gs_name_v) == 3 and len(gs_name_v[0]) < 6:
-            tf = gs_name_v[0]
-        # LEN = 2 GFI1_01
-        elif len(gs_name_v) == 2:
-            tf = gs_name_v[0]
-        else:
-            unrecognized.append(geneset_name)
-            continue
-        ref_uri = line.strip().split('\t')[1]
-        genelist = line.strip().split('\t')[2:]
-        for gene in set(genelist):
-            st = tf + ':' + gene
-            add_elem_dictionary(st2ref, st, ref_uri)
+    # load msigdb dict from the prepare_msigdb_data() function: {'tf:gene': 'reference'}
+    references_path = os.getcwd() + '/regulation/msigdb/out'
+    with open('{}/tf_gene_reference_msigdb.json'.format(references_path)) as f:
+        st2ref = json.load(f)
 
-    # convert reference_uri list to str
-    for st in st2ref:
-        if len(st2ref[st]) > 1:
-            st2ref[st] = '|'.join(st2ref[st])
-            # print(st, st2ref[st])
-        else:
-            # st2ref[st] = st2ref[st]
-            for ref in st2ref[st]:
-                st2ref[st] = ref
+    # build msigdb network: c3:tft
+    msigdb = get_network_edges(msigdb, dicts, "msigdb", "c3:tft", "http://software.broadinstitute.org/gsea/msigdb",
+                               None, "NA", st2ref=st2ref)
 
-    # build msigdb network
+    # save msigdb network
     msigdb_path = path + '/msigdb'
     if not os.path.isdir(msigdb_path): os.makedirs(msigdb_path)
-    #with open('./msigdb/out/msigdb_edges.csv', 'w') as f:
-    with open('{}/msigdb_edges.csv'.format(msigdb_path), 'w') as f:
-        f.write(
-            "source,dataset,tf_source_id,gene_source_id,source_uri,s_entrez_id,s_hgnc_id,s_symbol,p_id,p_label,\
-            o_entrez_id,o_hgnc_id,o_symbol,reference_id,reference_date\n")
-        source = "msigdb"
-        source_uri = "http://software.broadinstitute.org/gsea/msigdb"
-        p_id = "RO:0002434"
-        p_label = "interacts with"
-        # c3:tft
-        dataset = "c3:tft"
-        # reference_id = "NA"
-        reference_date = "NA"
-        for tf in msigdb:
-            for gene in msigdb[tf]:
-                reference_id = st2ref[tf + ':' + gene]
-                f.write(
-                    "{},{},{},{},{},{},{},{},{},{},{},{},{},{},{}\n"
-                        .format(
-                        source,
-                        dataset,
-                        tf,
-                        gene,
-                        source_uri,
-                        symbol2entrez_dict[tf],
-                        symbol2hgnc_dict[tf],
-                        tf,
-                        p_id,
-                        p_label,
-                        "NCBIGene:" + str(gene),
-                        entrez2hgnc_dict["NCBIGene:" + str(gene)],
-                        entrez2symbol_dict["NCBIGene:" + str(gene)],
-                        reference_id,
-                        reference_date
-                    )
-                )
+    storage.save_csv(msigdb, '{}/msigdb_edges.csv'.format(msigdb_path))
     print('\nThe MSigDB edges are saved at: {}/msigdb_edges.csv\n'.format(msigdb_path))
 
-    tftargets = pd.read_csv('{}/tftargets/tftargets_edges.csv'.format(path), low_memory=False)
-    msigdb = pd.read_csv('{}/msigdb/msigdb_edges.csv'.format(path))
+    # not available values as null, as they are read from the saved files
+    tftargets = tftargets.replace('NA', np.nan)
+    msigdb = msigdb.replace('NA', np.nan)
+
     data_edges = (tftargets, msigdb)
     print('\nFinished prepare_data_edges().\n')
 
@@ -745,52 +850,57 @@ def build_edges(edges):
         'encode': 'https://www.encodeproject.org/search/?searchTerm='
     }
 
-    edges_l = list()
-    for i, row in edges.iterrows():
-        # property uri: http://purl.obolibrary.org/obo/RO_0002434
-        property_uri = 'NA'
-        if ':' in row['property_id']:
-            property_uri = curie_dct[row['property_id'].split(':')[0].lower()] + row['property_id'].replace(':', '_')
-
-        # reference_uri: https://www.ncbi.nlm.nih.gov/pubmed/25416956
-        # capture nan or None values, i.e. all possible nulls
-        # if (isinstance(row['reference_id'], float) and str(row['reference_id']).lower() == 'nan') or \
-        # row['reference_id'] is None:
-        #    row['reference_id'] = 'NA'
-        if ':' not in str(row['reference_id']):
-            reference_uri = row['source_uri']  # row['reference_id']
-        elif 'http://www.broadinstitute.org/gsea/msigdb/cards/' in str(row['reference_id']):
-            reference_uri = row['reference_id']
+    # property uri: http://purl.obolibrary.org/obo/RO_0002434
+    # resolved once per unique id
+    property_uri_dct = dict()
+    for property_id in edges['property_id'].unique().tolist():
+        property_uri_dct[property_id] = 'NA'
+        if ':' in property_id:
+            property_uri_dct[property_id] = curie_dct[property_id.split(':')[0].lower()] + property_id.replace(':', '_')
+
+    # reference_uri: https://www.ncbi.nlm.nih.gov/pubmed/25416956
+    # resolved once per unique id, null values or ids without namespace take the source uri
+    reference_uri_dct = dict()
+    for reference_id in edges['reference_id'].dropna().unique().tolist():
+        if ':' not in reference_id:
+            continue
+        elif 'http://www.broadinstitute.org/gsea/msigdb/cards/' in reference_id:
+            reference_uri_dct[reference_id] = reference_id
         else:
             try:
-                reference_uri = curie_dct[row['reference_id'].split(':')[0].lower()] + row['reference_id'].split(':')[
-                    1].replace(';', ',')
-                # if 'pmid' in row['reference_id'].lower(): print(reference_uri)
+                reference_uri_dct[reference_id] = curie_dct[reference_id.split(':')[0].lower()] + \
+                                                  reference_id.split(':')[1].replace(';', ',')
             except KeyError:
-                reference_uri = row['reference_id']
-                print('There is a reference curie with and unrecognized namespace:', row['reference_id'])
-        # build list of edges as list of dict, i.e a df, where a dict is an edge
-        edge = dict()
-        edge['subject_id'] = row['subject_id']
-        edge['object_id'] = row['object_id']
-        edge['property_id'] = row['property_id']
-        edge['property_label'] = row['property_label']
-        edge['property_description'] = 'NA'
-        edge['property_uri'] = property_uri
-        edge['reference_uri'] = reference_uri
-        edge['reference_supporting_text'] = 'This edge comes from the {} dataset in "{}" source.'.format(
-            row['dataset'].upper(), row['source'])  # 'NA'
-        edge['reference_date'] = row['reference_date']
-        edges_l.append(edge)
+                reference_uri_dct[reference_id] = reference_id
+                print('There is a reference curie with and unrecognized namespace:', reference_id)
+    reference_uri = edges['reference_id'].map(reference_uri_dct)
+    reference_uri = reference_uri.where(reference_uri.notna(), edges['source_uri'])
+
+    # build the data structure = dataframe of edges, where a row is an edge
+    edges = pd.DataFrame({
+        'subject_id': edges['subject_id'],
+        'object_id': edges['object_id'],
+        'property_id': edges['property_id'],
+        'property_label': edges['property_label'],
+        'property_description': 'NA',
+        'property_uri': edges['property_id'].map(property_uri_dct),
+        'reference_uri': reference_uri,
+        'reference_supporting_text': 'This edge comes from the ' + edges['dataset'].str.upper() + ' dataset in "' +
+                                     edges['source'] + '" source.',
+        'reference_date': edges['reference_date']
+    }).reset_index(drop=True)
+    # list of edges as list of dict, where a dict is an edge
+    attributes = edges.columns.tolist()
+    edges_l = [dict(zip(attributes, edge)) for edge in zip(*(edges[col].tolist() for col in attributes))]
 
     # save edges file
-    pd.DataFrame(edges_l).fillna('NA').to_csv('{}/regulation_edges_v{}.csv'.format(graph,today), index=False)
+    table_path = storage.save_table(edges, '{}/regulation_edges_v{}'.format(graph,today))
 
     # print edges info
-    print('\n* This is the size of the edges file data structure: {}'.format(pd.DataFrame(edges_l).shape))
-    print('* These are the edges attributes: {}'.format(pd.DataFrame(edges_l).columns))
-    print('* This is the first record:\n{}'.format(pd.DataFrame(edges_l).head(1)))
-    print('\nThe regulation network edges are built and saved at: {}/regulation_edges_v{}.csv\n'.format(graph,today))
+    print('\n* This is the size of the edges file data structure: {}'.format(edges.shape))
+    print('* These are the edges attributes: {}'.format(edges.columns))
+    print('* This is the first record:\n{}'.format(edges.head(1)))
+    print('\nThe regulation network edges are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_edges().\n')
 
     return edges_l
@@ -849,8 +959,7 @@ def build_nodes(edges):
 
     # query biothings for retired entrez to symbol
     print('\n* Querying BioThings to map retired Entrez to gene symbols...')
-    mg = get_client('gene')
-    df = mg.querymany(entrez, scopes='entrezgene,retired', fields='symbol', size=1, as_dataframe=True)
+    df = idmapping.querymany(entrez, scopes='entrezgene,retired', fields='symbol', size=1, as_dataframe=True)
 
     # build ncbi2symbol dictionary
     e2s_df = df.reset_index().rename(columns={'query': 'entrez'}).copy()
@@ -876,24 +985,26 @@ def build_nodes(edges):
     # api call
     print('\n* Querying BioThings to retrieve node attributes...')
     symbols = list(set(symbols))
-    mg = get_client('gene')
-    df = mg.querymany(symbols, scopes='symbol,alias', fields='alias,name,summary', size=1, as_dataframe=True)
+    df = idmapping.querymany(symbols, scopes='symbol,alias', fields='alias,name,summary', size=1, as_dataframe=True)
     #print(df.shape)
     #print(len(concept_dct.keys()))
 
+    # index {symbol: [concept ids]}: concepts sharing a symbol are annotated together
+    symbol2concepts_dct = dict()
+    for concept in concept_dct:
+        # 88 concepts without symbol (16992-88=16904 with symbol)
+        if str(concept_dct[concept]['preflabel']) != 'nan':
+            symbol2concepts_dct.setdefault(concept_dct[concept]['preflabel'], []).append(concept)
+
     # dictionaries {id: {name:, alias:, summary:}}
     #print(len(concept_dct))
-    for symbol, row in df.iterrows():
+    for symbol, name, alias, summary in zip(df.index, df['name'], df['alias'], df['summary']):
         # associate concept to symbol
-        for concept in concept_dct:
-            # print(concept, symbol, concept_dct[concept]['preflabel'], row)
-            # 88 concepts without symbol (16992-88=16904 with symbol)
-            if concept_dct[concept]['preflabel'] == symbol:
-                # add attributes
-                # print(concept, symbol, row['name'], row)
-                concept_dct[concept]['name'] = row['name']
-                concept_dct[concept]['synonyms'] = row['alias']
-                concept_dct[concept]['description'] = row['summary']
+        for concept in symbol2concepts_dct.get(symbol, []):
+            # add attributes
+            concept_dct[concept]['name'] = name
+            concept_dct[concept]['synonyms'] = alias
+            concept_dct[concept]['description'] = summary
 
     # build a list of nodes as list of dict, i.e a df, where a dict is a node
     nodes_l = list()
@@ -910,14 +1021,14 @@ def build_nodes(edges):
         nodes_l.append(node)
 
     # save nodes file
-    pd.DataFrame(nodes_l).fillna('NA').to_csv('{}/regulation_nodes_v{}.csv'.format(graph,today), index=False)
+    table_path = storage.save_table(pd.DataFrame(nodes_l), '{}/regulation_nodes_v{}'.format(graph,today))
     #print(len(nodes_l))
 
     # print nodes info
     print('\n* This is the size of the nodes file data structure: {}'.format(pd.DataFrame(nodes_l).shape))
     print('* These are the nodes attributes: {}'.format(pd.DataFrame(nodes_l).columns))
     print('* This is the first record:\n{}'.format(pd.DataFrame(nodes_l).head(1)))
-    print('\nThe regulation network nodes are built and saved at: {}/regulation_nodes_v{}.csv\n'.format(graph,today))
+    print('\nThe regulation network nodes are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_nodes().\n')
 
     return nodes_l
@@ -0,0 +1,267 @@
+# @name: scheduler.py
+# @description: Module for the rate limited and retried scheduling of web service requests
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Module for the request scheduler"""
+
+import time
+import random
+import threading
+import requests
+from biothings_client import get_client as get_biothings_client
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+# VARIABLES
+# scheduler settings per web service, see the Scheduler() constructor. A BioThings request is a querymany() call \
+# of up to idmapping.batch_size query terms, i.e. one POST request.
+services = {
+    'biolink': {'rate': 20.0, 'max_concurrency': 8},
+    'biothings': {'rate': 2.0, 'max_concurrency': 2}
+}
+
+# HTTP status codes of transient errors, retried with backoff
+retry_status = {429, 500, 502, 503, 504}
+
+# exceptions of transient errors, retried with backoff
+retry_exceptions = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+if httpx is not None:
+    retry_exceptions += (httpx.TransportError,)
+
+# shared schedulers: {service: scheduler object}
+_schedulers = dict()
+_schedulers_lock = threading.Lock()
+
+
+class Scheduler(object):
+    """
+    Request scheduler shared by the threads calling a web service. Requests are throttled by a token bucket, \
+    the number of concurrent requests adapts to the observed errors and latency with additive increase and \
+    multiplicative decrease (AIMD), and transient errors are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, rate=10.0, burst=None, max_concurrency=8, min_concurrency=1, target_latency=None,
+                 retries=5, backoff=0.5, max_backoff=60.0):
+        """
+        Constructor
+        :param rate: requests per second (float)
+        :param burst: token bucket size (integer). Default: None, i.e. the rate rounded up.
+        :param max_concurrency: maximum number of concurrent requests (integer). Default: 8.
+        :param min_concurrency: minimum number of concurrent requests (integer). Default: 1.
+        :param target_latency: seconds above which a response slows down the concurrency as an error does \
+        (float). Default: None, i.e. only errors slow down.
+        :param retries: maximum number of retries of a request (integer). Default: 5.
+        :param backoff: backoff base in seconds, doubled at every retry (float). Default: 0.5.
+        :param max_backoff: maximum backoff in seconds (float). Default: 60.0.
+        """
+
+        self.rate = rate
+        self.burst = burst or max(1, int(rate + 0.999))
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.target_latency = target_latency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        # state
+        self.concurrency = float(max_concurrency)
+        self._tokens = float(self.burst)
+        self._refilled = time.time()
+        self._active = 0
+        self._condition = threading.Condition()
+
+        # counters
+        self.started = time.time()
+        self.requests = 0
+        self.successes = 0
+        self.retried = 0
+        self.errors = 0
+        self.latency = 0.0
+
+    def _acquire(self):
+        """
+        This method waits for a concurrency slot and a token of the bucket.
+        :return: None object
+        """
+
+        with self._condition:
+            while self._active >= int(self.concurrency):
+                self._condition.wait()
+            self._active += 1
+            while True:
+                now = time.time()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                self._condition.wait((1 - self._tokens) / self.rate)
+
+    def _release(self, latency, failed):
+        """
+        This method releases a concurrency slot and adapts the concurrency to the outcome of the request.
+        :param latency: request latency in seconds (float)
+        :param failed: whether the request failed with a transient error (boolean)
+        :return: None object
+        """
+
+        with self._condition:
+            self._active -= 1
+            self.requests += 1
+            self.latency += latency
+            slow = self.target_latency is not None and latency > self.target_latency
+            if failed or slow:
+                self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+            else:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self._condition.notify_all()
+
+    def get_backoff(self, attempt, response=None):
+        """
+        This method returns the seconds to wait before retrying a request: a random time up to the exponential \
+        backoff of the attempt ('full jitter'), or the time asked by a 'Retry-After' header.
+        :param attempt: number of the failed attempt, starting at 0 (integer)
+        :param response: failed response object. Default: None.
+        :return: seconds (float)
+        """
+
+        retry_after = None if response is None else getattr(response, 'headers', {}).get('Retry-After')
+        if retry_after is not None:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def call(self, function, *args, **kwargs):
+        """
+        This method calls a request function under the scheduler. Responses with a transient error status and \
+        transient exceptions are retried, after the last retry the response is returned or the exception raised.
+        :param function: request function, e.g. requests.get or a BioThings client method
+        :param args: positional arguments of the function
+        :param kwargs: keyword arguments of the function
+        :return: function result
+        """
+
+        attempt = 0
+        while True:
+            self._acquire()
+            t = time.time()
+            response = None
+            try:
+                response = function(*args, **kwargs)
+            except Exception as error:
+                status = getattr(getattr(error, 'response', None), 'status_code', None)
+                failed = isinstance(error, retry_exceptions) or status in retry_status
+                self._release(time.time() - t, failed)
+                if not failed or attempt >= self.retries:
+                    with self._condition:
+                        self.errors += 1
+                    raise
+                response = getattr(error, 'response', None)
+            else:
+                failed = getattr(response, 'status_code', None) in retry_status
+                self._release(time.time() - t, failed)
+                if not failed:
+                    with self._condition:
+                        self.successes += 1
+                    return response
+                if attempt >= self.retries:
+                    with self._condition:
+                        self.errors += 1
+                    return response
+            with self._condition:
+                self.retried += 1
+            time.sleep(self.get_backoff(attempt, response))
+            attempt += 1
+
+    def stats(self):
+        """
+        This method returns the scheduler counters.
+        :return: counters dictionary: requests (attempts), successes, retries, errors (after the last retry), \
+        throughput (successes per second), mean latency in seconds and current concurrency
+        """
+
+        with self._condition:
+            elapsed = max(time.time() - self.started, 1e-9)
+            return {'requests': self.requests, 'successes': self.successes, 'retries': self.retried,
+                    'errors': self.errors, 'throughput': self.successes / elapsed,
+                    'latency': self.latency / self.requests if self.requests else 0.0,
+                    'concurrency': int(self.concurrency)}
+
+
+class ScheduledClient(object):
+    """
+    BioThings client whose method calls are run under a scheduler. Every call is counted and retried as one \
+    request, so callers should make calls of one HTTP request each, e.g. querymany() of up to 1000 query terms \
+    as in idmapping.querymany().
+    """
+
+    def __init__(self, client, scheduler):
+        """
+        Constructor
+        :param client: BioThings client object
+        :param scheduler: scheduler object
+        """
+
+        self.client = client
+        self.scheduler = scheduler
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        if not callable(attribute):
+            return attribute
+
+        def scheduled(*args, **kwargs):
+            return self.scheduler.call(attribute, *args, **kwargs)
+
+        return scheduled
+
+
+# FUNCTIONS
+
+def get_scheduler(service):
+    """
+    This function returns the scheduler shared by the requests to a web service, creating it with the \
+    'services' settings the first time it is used.
+    :param service: web service name string, e.g. 'biolink' or 'biothings'
+    :return: scheduler object
+    """
+
+    with _schedulers_lock:
+        if service not in _schedulers:
+            _schedulers[service] = Scheduler(**services.get(service, {}))
+
+    return _schedulers[service]
+
+
+def get_client(entity):
+    """
+    This function returns a BioThings client whose requests are scheduled by the 'biothings' scheduler. It is \
+    used as biothings_client.get_client().
+    :param entity: BioThings entity string, e.g. 'gene'
+    :return: scheduled BioThings client object
+    """
+
+    return ScheduledClient(get_biothings_client(entity), get_scheduler('biothings'))
+
+
+def print_stats(service):
+    """
+    This function prints the counters of a web service scheduler.
+    :param service: web service name string
+    :return: None object
+    """
+
+    if service in _schedulers:
+        print('* {} requests: {requests} requests, {retries} retries, {errors} errors, {throughput:.1f} '
+              'requests/s, {latency:.3f} s mean latency, {concurrency} concurrent'
+              .format(service, **_schedulers[service].stats()))
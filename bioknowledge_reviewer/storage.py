@@ -0,0 +1,172 @@
+# @name: storage.py
+# @description: Module for the storage of the network and graph tables
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Module for the storage of the network and graph tables"""
+
+import os
+import pandas as pd
+try:
+    import pyarrow
+    parquet_engine = 'pyarrow'
+except ImportError:
+    try:
+        import fastparquet
+        parquet_engine = 'fastparquet'
+    except ImportError:
+        parquet_engine = None
+
+
+# VARIABLES
+# file format of the tables saved by the build_edges() and build_nodes() functions: 'csv' or 'parquet'. \
+# Parquet is opt-in, it needs pyarrow or fastparquet installed, otherwise tables are saved as CSV.
+table_format = 'csv'
+
+# whether the missing parquet engine message was printed, it is printed once per session
+parquet_warned = False
+
+# save a CSV copy of the tables next to the parquet files
+export_csv = False
+
+# columns with few distinct values repeated along the rows, stored as categoricals
+categorical_columns = ['property_id', 'property_label', 'property_description', 'property_uri',
+                       'reference_supporting_text', 'reference_date', 'semantic_groups', 'g2p_mark']
+
+# file extensions per format
+extensions = {'parquet': ['.parquet', '.pq'], 'csv': ['.csv']}
+
+
+# FUNCTIONS
+
+def get_format(filepath):
+    """
+    This function returns the table format of a file from its extension.
+    :param filepath: path to the file string
+    :return: 'parquet' or 'csv' string. Files with other extensions are read as CSV.
+    """
+
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension in extensions['parquet']:
+        return 'parquet'
+
+    return 'csv'
+
+
+def encode_categories(df, columns=None):
+    """
+    This function converts the repeated text columns of a dataframe to categoricals, where every distinct value \
+    is stored once and the rows hold integer codes.
+    :param df: dataframe
+    :param columns: columns to convert list. Default: None, i.e. the 'categorical_columns' module variable.
+    :return: dataframe with the columns in the dataframe converted to categoricals
+    """
+
+    columns = categorical_columns if columns is None else columns
+    df = df.copy()
+    for column in columns:
+        if column in df.columns and df[column].dtype.kind == 'O' and df[column].dtype.name != 'category':
+            values = df[column]
+            if values.dtype == object:
+                values = values.where(values.isna(), values.astype(str))
+            df[column] = values.astype('category')
+
+    return df
+
+
+def decode_categories(df):
+    """
+    This function converts the categorical columns of a dataframe back to columns of the type of their values.
+    :param df: dataframe
+    :return: dataframe without categorical columns
+    """
+
+    columns = [column for column in df.columns if df[column].dtype.name == 'category']
+    if not columns:
+        return df
+    df = df.copy()
+    for column in columns:
+        categorical = df[column].values
+        df[column] = pd.api.extensions.take(categorical.categories.values, categorical.codes, allow_fill=True)
+
+    return df
+
+
+def save_csv(df, filepath, na_rep='NA'):
+    """
+    This function saves a dataframe as a CSV file with the dataframe to_csv() method. Categorical columns are \
+    converted back to columns of the type of their values first.
+    :param df: dataframe
+    :param filepath: path to the CSV file string
+    :param na_rep: null values representation string. Default: 'NA'.
+    :return: None object
+    """
+
+    decode_categories(df).to_csv(filepath, index=False, na_rep=na_rep)
+
+
+def save_parquet(df, filepath):
+    """
+    This function saves a dataframe as a parquet file with the repeated text columns as categoricals. \
+    Null values are stored as nulls. The other text columns are stored as strings.
+    :param df: dataframe
+    :param filepath: path to the parquet file string
+    :return: None object
+    """
+
+    df = encode_categories(df).reset_index(drop=True)
+    for column in df.columns.tolist():
+        if df[column].dtype == object:
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    df.to_parquet(filepath, engine=parquet_engine)
+
+
+def save_table(df, filepath, na_rep='NA'):
+    """
+    This function saves a table in the format of the 'table_format' module variable, and also as CSV if the \
+    'export_csv' module variable is True.
+    :param df: dataframe
+    :param filepath: path to the file without extension string, e.g. './graph/graph_edges_v2019-06-16'
+    :param na_rep: null values representation in CSV files string. Default: 'NA'.
+    :return: path to the saved file string
+    """
+
+    global parquet_warned
+    file_format = table_format
+    if file_format == 'parquet' and parquet_engine is None:
+        if not parquet_warned:
+            print('Parquet needs pyarrow or fastparquet installed. Tables are saved as CSV.')
+            parquet_warned = True
+        file_format = 'csv'
+
+    csv_path = '{}.csv'.format(filepath)
+    if file_format == 'parquet':
+        table_path = '{}.parquet'.format(filepath)
+        save_parquet(df, table_path)
+        if export_csv:
+            save_csv(df, csv_path, na_rep=na_rep)
+    else:
+        table_path = csv_path
+        save_csv(df, table_path, na_rep=na_rep)
+
+    return table_path
+
+
+def read_table(filepath, categorical=False):
+    """
+    This function reads a table from a parquet or CSV file, depending on its extension.
+    :param filepath: path to the file string
+    :param categorical: whether to keep the categorical columns of parquet files as categoricals (boolean). \
+    Default: False, i.e. they are returned as object columns as read from CSV files.
+    :return: dataframe
+    """
+
+    if get_format(filepath) == 'parquet':
+        if parquet_engine is None:
+            raise ImportError('Reading parquet files needs pyarrow or fastparquet installed: {}'.format(filepath))
+        df = pd.read_parquet(filepath, engine=parquet_engine)
+        return df if categorical else decode_categories(df)
+
+    return pd.read_csv(filepath, low_memory=False)
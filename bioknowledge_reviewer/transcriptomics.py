@@ -9,9 +9,11 @@
 """Module for the transcriptomics data"""
 
 import datetime
+import numpy as np
 import pandas as pd
 import os
-from biothings_client import get_client
+import idmapping
+import storage
 
 # VARIABLES
 today = datetime.date.today()
@@ -227,13 +229,13 @@ def build_edges(edges):
     # save edges file
     path = os.getcwd() + '/graph'
     if not os.path.isdir(path): os.makedirs(path)
-    pd.DataFrame(edges_l).fillna('NA').to_csv('{}/rna_edges_v{}.csv'.format(path,today), index=False)
+    table_path = storage.save_table(pd.DataFrame(edges_l), '{}/rna_edges_v{}'.format(path,today))
 
     # print edges info
     print('\n* This is the size of the edges file data structure: {}'.format(pd.DataFrame(edges_l).shape))
     print('* These are the edges attributes: {}'.format(pd.DataFrame(edges_l).columns))
     print('* This is the first record:\n{}'.format(pd.DataFrame(edges_l).head(1)))
-    print('\nThe transcriptomics network edges are built and saved at: {}/rna_edges_v{}.csv\n'.format(path,today))
+    print('\nThe transcriptomics network edges are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_edges().\n')
 
     return edges_l
@@ -250,69 +252,52 @@ def build_nodes(edges):
     # retrieve node attributes from biothings and build dictionary
     # from biothings we retrieve: name (new attribute for short description), alias (synonyms), summary (description).
     # symbols in this case come from the original source. otherwise are gonna be retrieved from biothings as well.
-    # build concept dict: {id:symbol}
-    concept_dct = dict()
-    for i, row in edges.iterrows():
-        # node for subject
-        concept_dct[row['subject_id']] = {'preflabel': row['subject_label']}
-        # node for object
-        concept_dct[row['object_id']] = {'preflabel': row['object_label']}
-    print('* Total number of nodes: {}'.format(len(concept_dct.keys())))
+    # build concepts: unique ids in order of first appearance, subject before object, labelled by the last one
+    concepts = pd.DataFrame({
+        'id': np.column_stack((edges['subject_id'].to_numpy(dtype=object),
+                               edges['object_id'].to_numpy(dtype=object))).ravel(),
+        'preflabel': np.column_stack((edges['subject_label'].to_numpy(dtype=object),
+                                      edges['object_label'].to_numpy(dtype=object))).ravel()
+    })
+    id2label = concepts.drop_duplicates('id', keep='last').set_index('id').preflabel
+    concepts = pd.DataFrame({'id': pd.unique(concepts.id)})
+    concepts['preflabel'] = id2label.reindex(concepts.id).to_numpy(dtype=object)
+    print('* Total number of nodes: {}'.format(len(concepts)))
 
     # biothings api + dictionaries
     # input list for api: since by id we have flybase, hgnc/entrez or ensembl, i am gonna use symbol
-    symbols = list()
-    for idx, symbol in concept_dct.items():
-        # id = key.split(':')[1] if ':' in key else key
-        symbols.append(symbol['preflabel'])
-
-    #print(symbols[0:5])
-    #len(symbols)
+    symbols = concepts.preflabel.tolist()
 
     # api call
-    mg = get_client('gene')
-    df = mg.querymany(symbols, scopes='symbol,alias', fields='alias,name,summary', size=1, as_dataframe=True)
-    #df.head(2)
-    #print(df.shape)
-    #print(len(concept_dct.keys()))
-
-    # dictionaries {id: {name:, alias:, summary:}}
-    i = 0
-    #print(len(concept_dct))
-    for symbol, row in df.iterrows():
-        # associate concept to symbol
-        for concept in concept_dct:
-            if concept_dct[concept]['preflabel'] == symbol:
-                i += 1
-                # add attributes
-                concept_dct[concept]['name'] = row['name']
-                concept_dct[concept]['synonyms'] = row['alias']
-                concept_dct[concept]['description'] = row['summary']
+    df = idmapping.querymany(symbols, scopes='symbol,alias', fields='alias,name,summary', size=1, as_dataframe=True)
+
+    # annotation frame {symbol: name, alias, summary} joined to concepts by preflabel
+    annotation = (df.reindex(columns=['name', 'alias', 'summary'])
+                  .rename(columns={'alias': 'synonyms', 'summary': 'description'})
+                  .reset_index()
+                  .drop_duplicates('query', keep='last')
+                  .astype(object))
+    nodes = concepts.merge(annotation, how='left', left_on='preflabel', right_on='query', sort=False)
+    nodes['semantic_groups'] = 'GENE'
+    nodes['synonyms'] = [
+        '|'.join(list(synonyms)) if isinstance(synonyms, list) else synonyms for synonyms in nodes.synonyms
+    ]
+    nodes = nodes[['id', 'semantic_groups', 'preflabel', 'name', 'synonyms', 'description']]
 
     # build a list of nodes as list of dict, i.e a df, where a dict is a node
-    nodes_l = list()
-    for concept in concept_dct:
-        # node for subject
-        node = dict()
-        node['id'] = concept
-        node['semantic_groups'] = 'GENE'
-        node['preflabel'] = concept_dct[concept]['preflabel']
-        node['name'] = concept_dct[concept]['name']
-        node['synonyms'] = '|'.join(list(concept_dct[concept]['synonyms'])) if isinstance(
-            concept_dct[concept]['synonyms'], list) else concept_dct[concept]['synonyms']
-        node['description'] = concept_dct[concept]['description']
-        nodes_l.append(node)
+    attributes = nodes.columns.tolist()
+    nodes_l = [dict(zip(attributes, node)) for node in zip(*(nodes[col].tolist() for col in attributes))]
 
     # save nodes file
     path = os.getcwd() + '/graph'
     if not os.path.isdir(path): os.makedirs(path)
-    pd.DataFrame(nodes_l).fillna('NA').to_csv('{}/rna_nodes_v{}.csv'.format(path,today), index=False)
+    table_path = storage.save_table(nodes, '{}/rna_nodes_v{}'.format(path,today))
 
     # print nodes info
-    print('\n* This is the size of the nodes file data structure: {}'.format(pd.DataFrame(nodes_l).shape))
-    print('* These are the nodes attributes: {}'.format(pd.DataFrame(nodes_l).columns))
-    print('* This is the first record:\n{}'.format(pd.DataFrame(nodes_l).head(1)))
-    print('\nThe transcriptomics network nodes are built and saved at: {}/rna_nodes_v{}.csv\n'.format(path,today))
+    print('\n* This is the size of the nodes file data structure: {}'.format(nodes.shape))
+    print('* These are the nodes attributes: {}'.format(nodes.columns))
+    print('* This is the first record:\n{}'.format(nodes.head(1)))
+    print('\nThe transcriptomics network nodes are built and saved at: {}\n'.format(table_path))
     print('\nFinished build_nodes().\n')
 
     return nodes_l
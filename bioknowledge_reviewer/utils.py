@@ -11,6 +11,7 @@
 
 import datetime
 import pandas as pd
+import storage
 
 # VARIABLES
 today = datetime.date.today()
@@ -35,16 +36,17 @@ def get_dataframe(object):
 
 def get_dataframe_from_file(filename):
     """
-    This function opens a file and returns a dataframe.
-    :param filename: CSV path_to_file_name string
+    This function opens a file and returns a dataframe. The file format is taken from the file extension: \
+    '.parquet' or '.pq' files are read as parquet, other files as CSV.
+    :param filename: CSV or parquet path_to_file_name string
     :return: dataframe
     """
 
     try:
-        df = pd.read_csv('{}'.format(filename), low_memory=False)
+        df = storage.read_table('{}'.format(filename))
     except OSError:
         print('cannot open: ', filename)
-        print('Please, provide the correct file path and file name and the file in CSV format.')
+        print('Please, provide the correct file path and file name and the file in CSV or parquet format.')
         raise
     else:
         return df
@@ -0,0 +1,38 @@
+# @name: conftest.py
+# @description: Fixtures of the test suite
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Fixtures of the test suite"""
+
+import os
+import sys
+import tempfile
+import pytest
+
+# library modules are imported by name, as in the notebooks, and set their data paths from the working directory \
+# when they are imported, so the tests run in a temporary directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bioknowledge_reviewer'))
+os.chdir(tempfile.mkdtemp())
+
+
+@pytest.fixture
+def biolink(monkeypatch):
+    """
+    This fixture starts the local BioLink stand-in on a synthetic graph and points the monarch module to it, \
+    without the BioLink responses cache. The monarch and scheduler settings are restored afterwards.
+    :return: BioLink stand-in server object
+    """
+
+    import monarch
+    import scheduler
+    import biolink_server
+
+    with biolink_server.BioLinkServer() as server:
+        monkeypatch.setattr(monarch, 'biolink', server.url)
+        monkeypatch.setattr(monarch, 'use_cache', False)
+        monkeypatch.setitem(scheduler.services, 'biolink', {'rate': 10000.0, 'max_concurrency': 16})
+        monkeypatch.setattr(scheduler, '_schedulers', dict())
+        yield server
@@ -0,0 +1,39 @@
+# @name: test_monarch.py
+# @description: Tests of the monarch module against the local BioLink stand-in
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Tests of the monarch module"""
+
+import io
+import contextlib
+
+# seed nodes of the synthetic graph
+seed_list = ['HGNC:{}'.format(i) for i in range(1, 21)]
+
+
+def fetch(workers):
+    """
+    This function retrieves the neighbours of the seeds and the connections of their first shell.
+    :param workers: number of concurrent workers (integer)
+    :return: neighbours set, neighbour edges set, connection edges set
+    """
+
+    import monarch
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        neighbours, relations = monarch.get_neighbours(seed_list, workers=workers)
+        connections = monarch.get_connections(neighbours, workers=workers)
+
+    return neighbours, relations, connections
+
+
+def test_concurrent_fetch_matches_sequential(biolink):
+    neighbours, relations, connections = fetch(workers=1)
+    requests = biolink.requests
+
+    assert relations and connections
+    assert fetch(workers=8) == (neighbours, relations, connections)
+    assert biolink.requests == 2 * requests
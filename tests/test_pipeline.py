@@ -0,0 +1,52 @@
+# @name: test_pipeline.py
+# @description: Tests of the incremental graph build pipeline
+# @version: 1.0
+# @date: 18-10-2026
+# @author: Núria Queralt Rosinach
+# @email: nuriaqr@scripps.edu
+
+"""Tests of the pipeline module"""
+
+import os
+import sys
+import subprocess
+import pytest
+
+# the pipeline module imports the curation module, which reads the curated spreadsheets with gsheets
+pytest.importorskip('gsheets')
+
+# prints the output key of the Monarch edges built from a network set, iterated in the order of the string hashes
+monarch_output_key = '''
+import io
+import contextlib
+import monarch
+import pipeline
+
+network = set()
+for i in range(1, 51):
+    network.add(('HGNC:{}'.format(i), 'GENE{}'.format(i), 'RO:0002434', 'interacts with',
+                 'HGNC:{}'.format(100 + i % 7), None, 'PMID:{}|PMID:{}'.format(i, i + 1)))
+with contextlib.redirect_stdout(io.StringIO()):
+    edges = monarch.build_edges(pipeline.get_monarch_dataframe(network))
+print(pipeline.get_output_key(edges))
+'''
+
+
+def test_output_key_is_canonical():
+    import pandas as pd
+    import pipeline
+
+    df = pd.DataFrame({'id': ['HGNC:1', 'HGNC:2'], 'synonyms': [['A', 'B'], None]})
+
+    assert pipeline.get_output_key({'b': {1, 2}, 'a': df}) == pipeline.get_output_key({'a': df.copy(), 'b': {2, 1}})
+    assert pipeline.get_output_key(df) != pipeline.get_output_key(df.iloc[::-1])
+
+
+def test_monarch_output_key_does_not_depend_on_string_hashes(tmpdir):
+    keys = set()
+    for seed in ['1', '2', '3']:
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output([sys.executable, '-c', monarch_output_key], cwd=str(tmpdir), env=env)
+        keys.add(output.decode('utf-8').strip())
+
+    assert len(keys) == 1